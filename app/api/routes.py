@@ -4,11 +4,18 @@ FastAPI Routes
 Defines REST API endpoints for moderating AI behavior using the AbstractAISystem.
 Handles user input and returns explainable decisions.
 """
-from typing import Optional
+from typing import List, Optional
 from enum import Enum
-from fastapi import APIRouter, Request
+import hmac
+import os
+import tempfile
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
+
+from app.core.log_export import export_parquet, filter_entries, iter_csv
 
 moderate_route = APIRouter()
 
@@ -37,35 +44,145 @@ class FeedbackExample(BaseModel):
     label: LabelEnum
 
 
+def _request_finished(request: Request):
+    """Let a request-bounded profiling session count this request."""
+    profiler = getattr(request.app.state, "profiler", None)
+    if profiler is not None:
+        profiler.request_finished()
+
+
+def _is_admin(token: Optional[str]) -> bool:
+    """Check an X-Admin-Token header against ASIMOV_ADMIN_TOKEN (admin routes are off when unset)."""
+    expected = os.getenv("ASIMOV_ADMIN_TOKEN")
+    return bool(expected) and token is not None and hmac.compare_digest(token, expected)
+
+
 @moderate_route.post("/moderate")
-def moderate(query: UserQuery, request: Request):
+async def moderate(query: UserQuery, request: Request):
     """
     Handle moderation requests by passing user input through the AI moderation system.
+    Concurrent requests are micro-batched at the reflector stage.
 
     :param query: JSON input with user query, environment, and role.
     :return: A dictionary containing the AI response.
     """
     ai_agent = request.app.state.ai
-    result = ai_agent.process_input(
+    result = await ai_agent.aprocess_input(
         query.input, query.environment, query.user_role)
+    _request_finished(request)
     return {"response": result}
 
 
+@moderate_route.post("/moderate/batch")
+def moderate_batch(queries: List[UserQuery], request: Request):
+    """
+    Handle a list of moderation requests in one call so the reflector can judge them as a batch.
+
+    :param queries: JSON array of user queries, each with input, environment, and role.
+    :return: A dictionary containing one AI response per query, in input order.
+    """
+    ai_agent = request.app.state.ai
+    results = ai_agent.process_batch(
+        [(query.input, query.environment, query.user_role) for query in queries])
+    _request_finished(request)
+    return {"responses": results}
+
+
 @moderate_route.post("/feedback")
 def submit_feedback(feedback: FeedbackExample, request: Request):
     """
     Accept feedback data to improve the TrainableEthicalReflector.
+    Retraining is queued to the background worker when one is configured.
     """
     reflector = getattr(request.app.state.ai, "reflector", None)
+    retrainer = getattr(request.app.state.ai, "retrainer", None)
     if reflector and hasattr(reflector, "learn"):
-        reflector.learn(feedback.prompt, feedback.label)
-        import json
-        from pathlib import Path
-        labels_file = Path("tools/cli/labels.jsonl")
-        labels_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(labels_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(
-                {"prompt": feedback.prompt, "label": feedback.label}) + "\n")
+        if retrainer:
+            retrainer.submit(feedback.prompt, feedback.label.value)
+        else:
+            reflector.learn(feedback.prompt, feedback.label)
+        request.app.state.label_log.append(
+            {"prompt": feedback.prompt, "label": feedback.label.value})
         return JSONResponse(status_code=200, content={"status": "Feedback recorded"})
 
     return JSONResponse(status_code=400, content={"error": "Reflector not available"})
+
+
+@moderate_route.get("/logs/export")
+async def export_logs(request: Request, fmt: str = Query("csv", alias="format"),
+                      start: Optional[str] = None, end: Optional[str] = None,
+                      permissible: Optional[bool] = None, environment: Optional[str] = None,
+                      user_role: Optional[str] = None, x_admin_token: Optional[str] = Header(None)):
+    """
+    Stream logged moderation decisions as CSV, or build a Parquet file off the event loop.
+    The export contains raw user inputs, so it requires the X-Admin-Token header.
+
+    :param fmt: "csv" (streamed) or "parquet" (requires pyarrow).
+    :param start: Earliest ISO timestamp (inclusive).
+    :param end: Latest ISO timestamp (exclusive).
+    :param permissible: Only approved (true) or blocked (false) decisions.
+    :param environment: Only decisions from this environment.
+    :param user_role: Only decisions for this user role.
+    """
+    if not _is_admin(x_admin_token):
+        return JSONResponse(status_code=403, content={"error": "Forbidden"})
+    if fmt not in ("csv", "parquet"):
+        return JSONResponse(status_code=400, content={"error": f"Unsupported format: {fmt}"})
+    # Flushing the log sink waits on its writer thread, so keep it off the event loop.
+    logged = await run_in_threadpool(request.app.state.ai.logger.iter_entries)
+    try:
+        entries = filter_entries(
+            logged, start=start, end=end,
+            permissible=permissible, environment=environment, user_role=user_role)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+    if fmt == "csv":
+        return StreamingResponse(
+            iter_csv(entries), media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="moderation_log.csv"'})
+    fd, path = tempfile.mkstemp(suffix=".parquet")
+    os.close(fd)
+    try:
+        await run_in_threadpool(export_parquet, entries, path)
+    except ImportError as e:
+        os.remove(path)
+        return JSONResponse(status_code=501, content={"error": str(e)})
+    return FileResponse(path, filename="moderation_log.parquet",
+                        media_type="application/vnd.apache.parquet",
+                        background=BackgroundTask(os.remove, path))
+
+
+@moderate_route.get("/metrics")
+def metrics(request: Request):
+    """
+    Expose per-stage latency histograms and block counters in Prometheus text format.
+    """
+    return PlainTextResponse(request.app.state.ai.metrics.render(),
+                             media_type="text/plain; version=0.0.4")
+
+
+@moderate_route.post("/admin/profile")
+def start_profile(request: Request, seconds: float = 30.0, requests: Optional[int] = None,
+                  x_admin_token: Optional[str] = Header(None)):
+    """
+    Start the sampling profiler on this worker for `seconds` or the next `requests`
+    moderation requests. Requires the X-Admin-Token header.
+    """
+    if not _is_admin(x_admin_token):
+        return JSONResponse(status_code=403, content={"error": "Forbidden"})
+    profiler = request.app.state.profiler
+    if not profiler.start(seconds=seconds, requests=requests):
+        return JSONResponse(status_code=409, content={"error": "Profiling already active",
+                                                      **profiler.status()})
+    return profiler.status()
+
+
+@moderate_route.get("/admin/profile")
+def profile_status(request: Request, x_admin_token: Optional[str] = Header(None)):
+    """
+    Report whether profiling is active and where the last collapsed-stack file was written.
+    """
+    if not _is_admin(x_admin_token):
+        return JSONResponse(status_code=403, content={"error": "Forbidden"})
+    return request.app.state.profiler.status()
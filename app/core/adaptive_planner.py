@@ -6,18 +6,28 @@ Supports two modes of dynamic plan generation:
 - LLM-based planning via OpenAI (stub-ready)
 """
 from typing import List, Dict
+from functools import lru_cache
 import random
 import os
 
-try:
-    import openai
-    from dotenv import load_dotenv
+
+@lru_cache(maxsize=None)
+def load_openai():
+    """
+    Import and configure the OpenAI client on first use of LLM mode.
+
+    :return: The openai module, or None if openai/python-dotenv are not installed.
+    """
+    try:
+        import openai
+        from dotenv import load_dotenv
+    except ImportError:
+        return None
     load_dotenv()
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    if OPENAI_API_KEY:
-        openai.api_key = OPENAI_API_KEY
-except ImportError:
-    openai = None
+    api_key = os.getenv("OPENAI_API_KEY")
+    if api_key:
+        openai.api_key = api_key
+    return openai
 
 
 class AdaptivePlanner:
@@ -47,7 +57,7 @@ class AdaptivePlanner:
         :param context: Execution context with user/environmental info.
         :return: A list of step strings.
         """
-        if self.mode == "llm" and openai:
+        if self.mode == "llm" and load_openai():
             return self.llm_plan(goal, context)
         return self.probabilistic_plan(goal, context)
 
@@ -85,6 +95,7 @@ Given this goal: "{goal}"
 and this context: {context},
 Generate a 3-step plan to ethically and effectively achieve the goal.
 """
+        openai = load_openai()
         try:
             response = openai.chat.completions.create(
                 model="gpt-3.5-turbo",
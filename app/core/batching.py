@@ -0,0 +1,104 @@
+"""
+ReflectorBatcher
+----------------
+Coalesces concurrent reflector calls into micro-batches. Requests that arrive within a short
+window (or until the batch is full) are judged with one batched inference call, and each
+caller receives its own verdict.
+"""
+from typing import Any, Callable, Dict, List, Tuple
+from collections import deque
+import asyncio
+import os
+
+BatchJudge = Callable[[List[str], List[Dict[str, Any]]], List[Tuple[bool, str]]]
+
+
+class ReflectorBatcher:
+    """
+    Gathers (prompt, context) pairs from concurrent coroutines and runs them through a batch
+    judging function in a worker thread, so model inference cost is shared across requests.
+    """
+
+    def __init__(self, judge_batch: BatchJudge, max_batch_size: int = 32, window_ms: float = 5.0):
+        """
+        :param judge_batch: Callable taking (prompts, contexts) and returning one verdict per prompt.
+        :param max_batch_size: Flush immediately once this many requests are waiting.
+        :param window_ms: Maximum time the first request in a batch waits for company.
+        """
+        self.judge_batch = judge_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = max(0.0, window_ms) / 1000.0
+        self.recent_batch_sizes = deque(maxlen=256)
+        self._pending: List[Tuple[str, Dict[str, Any], asyncio.Future]] = []
+        self._loop = None
+        self._timer = None
+        self._tasks = set()
+
+    @classmethod
+    def from_env(cls, judge_batch: BatchJudge) -> "ReflectorBatcher":
+        """
+        Build a batcher configured by MODERATION_BATCH_MAX_SIZE and MODERATION_BATCH_WINDOW_MS.
+        """
+        return cls(
+            judge_batch,
+            max_batch_size=int(os.getenv("MODERATION_BATCH_MAX_SIZE", "32")),
+            window_ms=float(os.getenv("MODERATION_BATCH_WINDOW_MS", "5")),
+        )
+
+    async def judge(self, prompt: str, context: Dict[str, Any]) -> Tuple[bool, str]:
+        """
+        Queue a prompt for the next batch and wait for its verdict.
+
+        :param prompt: The user input string.
+        :param context: Context dictionary for the prompt.
+        :return: Tuple (aligned, reason) for this prompt only.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A new event loop (e.g. a fresh test client) cannot await futures of the old one.
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+
+        future = loop.create_future()
+        self._pending.append((prompt, context, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        """Hand the pending requests to a background task and start a new batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = self._loop.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, Dict[str, Any], asyncio.Future]]):
+        """Judge one batch in the default executor and resolve each caller's future."""
+        prompts = [prompt for prompt, _, _ in batch]
+        contexts = [context for _, context, _ in batch]
+        self.recent_batch_sizes.append(len(batch))
+        try:
+            verdicts = await asyncio.get_running_loop().run_in_executor(
+                None, self.judge_batch, prompts, contexts)
+            verdicts = list(verdicts)
+            if len(verdicts) != len(batch):
+                raise RuntimeError(
+                    f"judge_batch returned {len(verdicts)} verdicts for {len(batch)} prompts")
+        except Exception as e:  # pylint: disable=broad-except
+            print(f"[ReflectorBatcher] Batch of {len(batch)} failed: {e}")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, future), verdict in zip(batch, verdicts):
+            if not future.done():
+                future.set_result(verdict)
@@ -0,0 +1,178 @@
+"""
+DecisionCache
+-------------
+Bounded LRU cache with per-entry TTL for moderation decisions. Callers build keys that include
+a version stamp of everything the decision depends on (rules, reflector model, planner scores),
+so a rule change or retrain makes old entries unreachable instead of stale. Identical
+concurrent lookups are collapsed into a single computation ("single flight"), for both
+threaded and asyncio callers.
+"""
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from collections import OrderedDict
+import asyncio
+import os
+import threading
+import time
+
+
+class _Flight:
+    """A computation in progress that other threads can wait on."""
+
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class DecisionCache:
+    """
+    Thread-safe LRU + TTL cache with single-flight computation of missing entries.
+    Cached values must not be None.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 300.0):
+        """
+        :param max_entries: Maximum number of cached decisions.
+        :param ttl_seconds: Lifetime of an entry; 0 or less disables expiry.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._ainflight: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["DecisionCache"]:
+        """
+        Build a cache configured by DECISION_CACHE_SIZE and DECISION_CACHE_TTL_SECONDS.
+        Returns None (caching disabled) when the size is 0.
+        """
+        max_entries = int(os.getenv("DECISION_CACHE_SIZE", "4096"))
+        if max_entries <= 0:
+            return None
+        return cls(max_entries, float(os.getenv("DECISION_CACHE_TTL_SECONDS", "300")))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and coalesced-request counters and current size."""
+        return {"hits": self.hits, "misses": self.misses,
+                "coalesced": self.coalesced, "entries": len(self._entries)}
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value for `key`, or None if absent or expired."""
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entries beyond max_entries."""
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for `key`, computing and caching it on a miss.
+        Concurrent callers with the same key wait for one computation and share its result.
+
+        :param key: Cache key.
+        :param compute: Zero-argument function producing the value.
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            self.put(key, flight.value)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    async def aget_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Asynchronous variant of get_or_compute for coroutine computations.
+
+        :param key: Cache key.
+        :param compute: Zero-argument coroutine function producing the value.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            future = self._ainflight.get(key)
+            leader = future is None or future.get_loop() is not loop
+            if leader:
+                future = self._ainflight[key] = loop.create_future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return await asyncio.shield(future)
+
+        try:
+            value = await compute()
+            self.put(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            with self._lock:
+                if self._ainflight.get(key) is future:
+                    del self._ainflight[key]
+
+    def _lookup(self, key: Hashable) -> Any:
+        """Return a live entry and mark it recently used. Caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
@@ -0,0 +1,276 @@
+"""
+EmbeddingCache
+--------------
+Bounded LRU cache of sentence embeddings keyed by a hash of the model name and the prompt, with
+an optional SQLite tier on disk that survives restarts. Repeated prompts skip the transformer
+forward pass; only cache misses are encoded, in a single batch.
+New embeddings reach the disk tier through a background writer that commits them in batches,
+so the request path never waits on SQLite; the tier is capped and drops its oldest entries.
+"""
+from typing import Callable, Dict, List, Optional, Sequence
+from collections import OrderedDict
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Thread-safe two-tier (memory, then disk) cache of prompt embeddings.
+    """
+
+    def __init__(self, model_name: str, max_entries: int = 10000, disk_path: Optional[str] = None,
+                 disk_max_entries: int = 100000, write_delay_ms: float = 200.0):
+        """
+        :param model_name: Name of the encoding model; part of every key so models never mix.
+        :param max_entries: Maximum number of embeddings held in memory.
+        :param disk_path: Optional SQLite file used as a persistent second tier.
+        :param disk_max_entries: Maximum number of embeddings kept on disk; the oldest are
+                                 deleted first.
+        :param write_delay_ms: Maximum time a new embedding waits before being committed to disk.
+        """
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.disk_max_entries = max(1, disk_max_entries)
+        self.write_delay = max(0.0, write_delay_ms) / 1000.0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_writes = 0
+        self.disk_evictions = 0
+        self.write_errors = 0
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._pending: Dict[str, bytes] = {}
+        self._enqueued = 0
+        self._done = 0
+        self._first_pending_at = 0.0
+        self._flush_requested = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = None
+        self._disk_entries = 0
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+            self._disk_entries = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            self._evict()
+            self._db.commit()
+            atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls, model_name: str) -> "EmbeddingCache":
+        """
+        Build a cache configured by EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_PATH and
+        EMBEDDING_CACHE_DISK_SIZE.
+        """
+        return cls(model_name,
+                   max_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", "10000")),
+                   disk_path=os.getenv("EMBEDDING_CACHE_PATH") or None,
+                   disk_max_entries=int(os.getenv("EMBEDDING_CACHE_DISK_SIZE", "100000")))
+
+    def key(self, prompt: str) -> str:
+        """Cache key of a prompt for this cache's model."""
+        return hashlib.blake2b(
+            f"{self.model_name}\0{prompt}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters, disk-tier counters and current sizes."""
+        return {"hits": self.hits, "disk_hits": self.disk_hits,
+                "misses": self.misses, "entries": len(self._entries),
+                "disk_entries": self._disk_entries, "disk_writes": self.disk_writes,
+                "disk_evictions": self.disk_evictions, "write_errors": self.write_errors}
+
+    def encode(self, prompts: Sequence[str],
+               encoder: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Return embeddings for `prompts`, calling `encoder` once for the distinct misses.
+
+        :param prompts: Texts to embed.
+        :param encoder: Function mapping a list of texts to an (n, dim) array.
+        :return: Array of shape (len(prompts), dim), in input order.
+        """
+        keys = [self.key(p) for p in prompts]
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for k in keys:
+                if k in self._entries and k not in found:
+                    self._entries.move_to_end(k)
+                    found[k] = self._entries[k]
+
+        missing = list(dict.fromkeys(k for k in keys if k not in found))
+        if missing and self._db is not None:
+            loaded = self._load(missing)
+            found.update(loaded)
+            self._remember(loaded)
+            missing = [k for k in missing if k not in loaded]
+
+        missing_set = set(missing)
+        if missing:
+            texts = {k: p for k, p in zip(keys, prompts) if k in missing_set}
+            vectors = np.asarray(encoder([texts[k] for k in missing]), dtype=np.float32)
+            computed = dict(zip(missing, vectors))
+            found.update(computed)
+            self._remember(computed)
+            self._store(computed)
+
+        misses = sum(1 for k in keys if k in missing_set)
+        with self._lock:
+            self.misses += misses
+            self.hits += len(keys) - misses
+        return np.stack([found[k] for k in keys]) if keys else np.empty((0, 0), dtype=np.float32)
+
+    def clear(self):
+        """Drop the in-memory tier (the disk tier is kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Commit every embedding queued for the disk tier so far.
+
+        :param timeout: Maximum seconds to wait.
+        :return: True if the queue was drained (failed batches are dropped, not retried).
+        """
+        with self._cond:
+            target = self._enqueued
+            if self._done >= target:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._done >= target, timeout)
+
+    def close(self):
+        """Commit pending embeddings, stop the writer thread and close the disk tier."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        if self._db is not None:
+            atexit.unregister(self.close)
+            with self._db_lock:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, vectors: Dict[str, np.ndarray]):
+        with self._lock:
+            for k, vector in vectors.items():
+                self._entries[k] = vector
+                self._entries.move_to_end(k)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        loaded = {}
+        with self._cond:
+            # Embeddings still waiting for the writer are served from its queue.
+            for k in keys:
+                if k in self._pending:
+                    loaded[k] = np.frombuffer(self._pending[k], dtype=np.float32)
+        keys = [k for k in keys if k not in loaded]
+        with self._db_lock:
+            if self._db is None:
+                return loaded
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk).fetchall()
+                for k, blob in rows:
+                    loaded[k] = np.frombuffer(blob, dtype=np.float32)
+        with self._lock:
+            self.disk_hits += len(loaded)
+        return loaded
+
+    def _store(self, vectors: Dict[str, np.ndarray]):
+        """Queue new embeddings for the background writer."""
+        if self._db is None:
+            return
+        with self._cond:
+            if self._closed:
+                return
+            if not self._pending:
+                self._first_pending_at = time.monotonic()
+            for k, v in vectors.items():
+                if k not in self._pending:
+                    self._pending[k] = v.astype(np.float32).tobytes()
+                    self._enqueued += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="embedding-cache-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                while self._pending and not self._closed and not self._flush_requested:
+                    remaining = self._first_pending_at + self.write_delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = list(self._pending.items())
+                self._flush_requested = False
+                closing = self._closed
+
+            if batch:
+                try:
+                    self._write(batch)
+                except sqlite3.Error as e:
+                    # A lost batch only costs a re-encode later; never block the request path.
+                    print("[EmbeddingCache] Failed to write batch:", e)
+                    with self._cond:
+                        self.write_errors += 1
+                with self._cond:
+                    for k, _ in batch:
+                        del self._pending[k]
+                    self._done += len(batch)
+                    self._cond.notify_all()
+            if closing:
+                return
+
+    def _write(self, batch: List):
+        """Insert one batch, trim the tier to its cap and commit once."""
+        with self._db_lock:
+            if self._db is None:
+                return
+            try:
+                before = self._db.total_changes
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO embeddings (key, vector) VALUES (?, ?)", batch)
+                added = self._db.total_changes - before
+                self._disk_entries += added
+                self._evict()
+                self._db.commit()
+            except sqlite3.Error:
+                self._db.rollback()
+                self._disk_entries = self._db.execute(
+                    "SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                raise
+            self.disk_writes += added
+
+    def _evict(self):
+        """Delete the oldest rows past disk_max_entries (caller holds _db_lock or owns _db)."""
+        excess = self._disk_entries - self.disk_max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM embeddings WHERE rowid IN "
+                "(SELECT rowid FROM embeddings ORDER BY rowid LIMIT ?)", (excess,))
+            self._disk_entries -= excess
+            self.disk_evictions += excess
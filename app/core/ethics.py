@@ -5,64 +5,290 @@ EthicsEngine
 Defines a dynamic rule-based ethical filtering engine.
 Rules can be loaded from or persisted to a JSON file and are applied to user input
 in combination with context to determine whether an action is ethically permissible.
+
+Rules in the file are declarative and never executed as code:
+
+    {"description": "Only permit surveillance in secure_lab",
+     "keywords": ["surveillance"],
+     "when": {"user": ["guest"]},                # optional: applies only in these contexts
+     "unless": {"environment": ["secure_lab"]}}  # optional: exempt in these contexts
+
+A rule is violated when the goal contains any of its keywords (case-insensitive), every "when"
+condition holds and no "unless" condition holds. Conditions compare a context field (e.g.
+"user", "environment") against a list of allowed values. Rules without keywords are
+context-only and need a "when" condition. Rules are compiled at load time, and the file is
+re-read when its modification time changes, so edits take effect without a restart. Entries in
+the legacy {"description", "code": "<lambda>"} format fall back to the built-in definition of
+the same description.
+
+Rules are dispatched through a RuleIndex: one automaton scan of the goal finds the keywords
+present, and only the rules they trigger, plus context-only rules indexed by environment and
+role, are evaluated. Rule-check cost follows the number of matches, not the size of the rule set.
 """
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, Callable, FrozenSet, NamedTuple, Optional
 import json
+import os
+import time
+
+from app.core.prompt import TextLike, goal_of
+from app.core.text_match import KeywordAutomaton
+
+RuleFn = Callable[[str, Dict[str, Any]], bool]
+Conditions = Tuple[Tuple[str, FrozenSet], ...]
+
+# Context fields that context-only rules are indexed by.
+INDEXED_CONTEXT = ("environment", "user")
+
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {"description": "Do not cause harm", "keywords": ["harm"]},
+    {"description": "Do not deceive", "keywords": ["deceive"]},
+    {"description": "Respect autonomy", "keywords": ["manipulate"]},
+    {"description": "Only permit surveillance in secure_lab", "keywords": ["surveillance"],
+     "unless": {"environment": ["secure_lab"]}},
+    {"description": "Only allow admin to override filters", "keywords": ["override"],
+     "unless": {"user": ["admin"]}},
+]
+
+RULE_FIELDS = ("description", "keywords", "when", "unless")
+# Condition values are compared with context values, so they must be hashable scalars.
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+def _conditions(spec: Dict[str, Any], field: str) -> Conditions:
+    conditions = spec.get(field) or {}
+    if not isinstance(conditions, dict):
+        raise ValueError(f"'{field}' must map context fields to lists of values")
+    compiled = []
+    for key, values in conditions.items():
+        if isinstance(values, str):
+            values = [values]
+        if not isinstance(values, list) or not all(isinstance(v, SCALAR_TYPES) for v in values):
+            raise ValueError(f"'{field}.{key}' must be a string or a list of strings")
+        compiled.append((key, frozenset(values)))
+    return tuple(compiled)
+
+
+class CompiledRule(NamedTuple):
+    """A validated declarative rule: trigger keywords plus context conditions."""
+    description: str
+    keywords: Tuple[str, ...]
+    when: Conditions
+    unless: Conditions
+
+    def applies(self, ctx: Dict[str, Any]) -> bool:
+        """Whether the context conditions make a triggered rule a violation."""
+        if any(ctx.get(key) not in values for key, values in self.when):
+            return False
+        return not any(ctx.get(key) in values for key, values in self.unless)
+
+
+def parse_rule(spec: Dict[str, Any]) -> CompiledRule:
+    """
+    Validate a declarative rule definition.
+
+    :param spec: Rule definition (see module docstring).
+    :raises ValueError: If the definition is malformed.
+    """
+    unknown = set(spec) - set(RULE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown rule fields: {sorted(unknown)}")
+    if not isinstance(spec.get("description"), str) or not spec["description"]:
+        raise ValueError("Rule needs a non-empty 'description'")
+    keywords = spec.get("keywords", [])
+    if not isinstance(keywords, list) or not all(isinstance(k, str) and k for k in keywords):
+        raise ValueError(f"Rule '{spec['description']}' needs 'keywords' as a list of strings")
+    when = _conditions(spec, "when")
+    if not keywords and not when:
+        raise ValueError(f"Rule '{spec['description']}' needs 'keywords' or a 'when' condition")
+    return CompiledRule(spec["description"], tuple(k.lower() for k in keywords),
+                        when, _conditions(spec, "unless"))
+
+
+def compile_rule(spec: Dict[str, Any]) -> RuleFn:
+    """
+    Compile a declarative rule into a standalone predicate that returns True when the goal
+    is permissible. The engine itself evaluates rules through a RuleIndex.
+
+    :raises ValueError: If the definition is malformed.
+    """
+    rule = parse_rule(spec)
+
+    def rule_fn(goal: str, ctx: Dict[str, Any]) -> bool:
+        text = goal.lower()
+        if rule.keywords and not any(keyword in text for keyword in rule.keywords):
+            return True
+        return not rule.applies(ctx)
+
+    return rule_fn
+
+
+class RuleIndex:
+    """
+    Immutable dispatch structure over a rule set. Keyword rules are reached through one
+    automaton scan of the goal; context-only rules through their environment / role values.
+    Opaque callable rules (added via add_rule) are always evaluated.
+    """
+
+    def __init__(self, entries: List[Tuple[str, RuleFn, Optional[CompiledRule]]]):
+        """
+        :param entries: (description, predicate, compiled rule or None for opaque predicates).
+        """
+        self.entries = list(entries)
+        self.rules: List[Tuple[str, RuleFn]] = [(desc, fn) for desc, fn, _ in self.entries]
+        self._compiled = [compiled for _, _, compiled in self.entries]
+        self._by_term: Dict[str, List[int]] = {}
+        self._by_context: Dict[Tuple[str, Any], List[int]] = {}
+        self._always: List[int] = []
+        for i, compiled in enumerate(self._compiled):
+            if compiled is None:
+                self._always.append(i)
+            elif compiled.keywords:
+                for keyword in compiled.keywords:
+                    self._by_term.setdefault(keyword, []).append(i)
+            else:
+                condition = next(((key, values) for key, values in compiled.when
+                                  if key in INDEXED_CONTEXT), None)
+                if condition is None:
+                    self._always.append(i)
+                else:
+                    for value in condition[1]:
+                        self._by_context.setdefault((condition[0], value), []).append(i)
+        self.automaton = KeywordAutomaton(self._by_term)
+
+    def violated(self, goal: str, ctx: Dict[str, Any], goal_lower: str = None) -> List[str]:
+        """Descriptions of the violated rules, in rule order."""
+        candidates = set(self._always)
+        if self._by_term:
+            for term in self.automaton.find(goal.lower() if goal_lower is None else goal_lower):
+                candidates.update(self._by_term[term])
+        if self._by_context:
+            for key in INDEXED_CONTEXT:
+                value = ctx.get(key)
+                if isinstance(value, str):
+                    candidates.update(self._by_context.get((key, value), ()))
+        violations = []
+        for i in sorted(candidates):
+            description, rule_fn, compiled = self.entries[i]
+            if compiled is not None:
+                if compiled.applies(ctx):
+                    violations.append(description)
+            elif not rule_fn(goal, ctx):
+                violations.append(description)
+        return violations
+
 
 class EthicsEngine:
     """
     EthicsEngine manages a list of ethical rules that determine whether AI actions are permissible
     in a given context. Rules are evaluated dynamically and can be updated or persisted to file.
     """
-    def __init__(self, rule_file: str = "ethical_rules.json"):
-        """Initialize the ethics engine with an optional rules file."""
+    def __init__(self, rule_file: str = "ethical_rules.json", reload_interval: float = None):
+        """
+        Initialize the ethics engine with an optional rules file.
+
+        :param rule_file: Path of the declarative rule file.
+        :param reload_interval: Minimum seconds between checks of the file's modification time.
+                                Defaults to RULES_RELOAD_SECONDS (2); 0 disables hot reload.
+        """
         self.rule_file = rule_file
+        if reload_interval is None:
+            reload_interval = float(os.getenv("RULES_RELOAD_SECONDS", "2"))
+        self.reload_interval = reload_interval
         self.blocked_keywords = ["harm", "manipulate", "deceive", "exploit", "violate"]
-        self.ethical_rules: List[Tuple[str, Any]] = []
+        self.rule_index = RuleIndex([])
+        self.rule_specs: Dict[str, Dict[str, Any]] = {}
+        self.version = 0  # bumped whenever the rule set changes
+        self._mtime = None
+        self._next_check = 0.0
         self.load_rules()
 
-    def load_rules(self):
-        """Load ethical rules from the JSON file, or initialize with default rules if file is invalid."""
+    @property
+    def ethical_rules(self) -> List[Tuple[str, RuleFn]]:
+        """(description, predicate) pairs of the current rule set, in rule order."""
+        return self.rule_index.rules
+
+    def load_rules(self) -> bool:
+        """
+        Load and compile the rules in the JSON file. A missing file is initialized with the
+        default rules; an invalid file is reported and the current rules are kept.
+
+        :return: True if the rule set was replaced.
+        """
         try:
-            with open(self.rule_file, "r", encoding="utf-8"):
-                print("[EthicsEngine] Rule file found, but skipping dynamic code loading for safety.")
-                # For security, skip function reloading — just print descriptions
-                self.load_default_rules()
-                print("[EthicsEngine] Default functions reloaded to match rule descriptions.")
-        except (FileNotFoundError, json.JSONDecodeError):
+            mtime = os.stat(self.rule_file).st_mtime_ns
+            with open(self.rule_file, "r", encoding="utf-8") as f:
+                specs = json.load(f)
+            index, rule_specs = self._compile(specs)
+        except FileNotFoundError:
             print("[EthicsEngine] No valid rules file found. Initializing with defaults.")
             self.load_default_rules()
             self.save_rules()
+            return True
+        except (OSError, TypeError, ValueError) as e:  # JSONDecodeError is a ValueError
+            print(f"[EthicsEngine] Invalid rules file {self.rule_file}: {e}. Keeping current rules.")
+            if not self.ethical_rules:
+                self.load_default_rules()
+            return False
+
+        # Swap in the complete rule set at once so concurrent checks never see a partial one.
+        self.rule_index, self.rule_specs = index, rule_specs
+        self._mtime = mtime
+        self.version += 1
+        print(f"[EthicsEngine] Loaded {len(index.rules)} rules from {self.rule_file}.")
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """Reload the rule file if its modification time changed since it was last read or written."""
+        try:
+            mtime = os.stat(self.rule_file).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        return self.load_rules()
+
+    def current_version(self) -> int:
+        """
+        Version of the rule set, after reloading the rule file if it changed. The file is
+        checked at most every reload_interval seconds; use this rather than `version` when the
+        result keys cached decisions.
+        """
+        if self.reload_interval > 0 and time.monotonic() >= self._next_check:
+            self._next_check = time.monotonic() + self.reload_interval
+            self.reload_if_changed()
+        return self.version
 
     def load_default_rules(self):
         """Load default ethical rules into the system."""
-        self.ethical_rules = [
-            ("Do not cause harm", lambda goal, ctx: "harm" not in goal.lower()),
-            ("Do not deceive", lambda goal, ctx: "deceive" not in goal.lower()),
-            ("Respect autonomy", lambda goal, ctx: "manipulate" not in goal.lower()),
-            ("Only permit surveillance in secure_lab",
-             lambda goal, ctx: not ("surveillance" in goal.lower() and ctx.get("environment") != "secure_lab")),
-            ("Only allow admin to override filters",
-             lambda goal, ctx: not ("override" in goal.lower() and ctx.get("user") != "admin")),
-        ]
+        self.rule_index, self.rule_specs = self._compile(DEFAULT_RULES)
+        self.version += 1
 
     def save_rules(self):
         """Save current ethical rules to a JSON file."""
         serializable = [
-            {"description": desc, "code": "<lambda>"} for desc, rule in self.ethical_rules
+            self.rule_specs.get(desc) or {"description": desc, "code": "<lambda>"}
+            for desc, rule in self.ethical_rules
         ]
         with open(self.rule_file, "w", encoding="utf-8") as f:
             json.dump(serializable, f, indent=2)
+        self._mtime = os.stat(self.rule_file).st_mtime_ns  # our own write is not a change
         print("[EthicsEngine] Rules saved to file.")
 
-    def is_action_permissible(self, goal: str, context: Dict[str, Any]) -> Tuple[bool, str]:
+    def is_action_permissible(self, goal: TextLike, context: Dict[str, Any]) -> Tuple[bool, str]:
         """Check whether a goal is ethically permissible in a given context based on loaded rules."""
-        violations: List[str] = []
+        return self.verdict(self.violated_rules(goal, context))
 
-        for description, rule_fn in self.ethical_rules:
-            if not rule_fn(goal, context):
-                violations.append(description)
+    def violated_rules(self, goal: TextLike, context: Dict[str, Any]) -> List[str]:
+        """
+        Descriptions of the rules a goal violates in the given context, in rule order.
+        A Prompt supplies its precomputed lowercased goal.
+        """
+        self.current_version()
+        goal, goal_lower = goal_of(goal)
+        return self.rule_index.violated(goal, context, goal_lower)
 
+    def verdict(self, violations: List[str]) -> Tuple[bool, str]:
+        """Turn a list of violated rule descriptions into (permissible, explanation)."""
         if violations:
             explanation = "; ".join(violations)
             print(f"[EthicsEngine] Violations detected: {violations}")
@@ -71,8 +297,21 @@ class EthicsEngine:
         return True, "All ethical checks passed."
 
     def add_rule(self, description: str, rule_fn):
-        """Add a new ethical rule to the system and persist it."""
-        self.ethical_rules.append((description, rule_fn))
+        """
+        Add a new ethical rule to the system and persist it.
+
+        :param description: Human-readable rule description.
+        :param rule_fn: Predicate (goal, context) -> permissible, or a declarative rule definition
+                        (dict without "description"). Only declarative rules survive a reload.
+        """
+        compiled = None
+        if isinstance(rule_fn, dict):
+            spec = {"description": description, **rule_fn}
+            compiled = parse_rule(spec)
+            rule_fn = compile_rule(spec)
+            self.rule_specs = {**self.rule_specs, description: spec}
+        self.rule_index = RuleIndex(self.rule_index.entries + [(description, rule_fn, compiled)])
+        self.version += 1
         print(f"[EthicsEngine] Rule added: {description}")
         self.save_rules()
 
@@ -81,3 +320,23 @@ class EthicsEngine:
         print("\n[EthicsEngine] Current Ethical Rules:")
         for i, (desc, _) in enumerate(self.ethical_rules, 1):
             print(f"  {i}. {desc}")
+
+    @staticmethod
+    def _compile(specs: Any) -> Tuple[RuleIndex, Dict[str, Dict[str, Any]]]:
+        """Compile rule definitions, resolving legacy entries against the defaults."""
+        if not isinstance(specs, list):
+            raise ValueError("Rule file must contain a list of rules")
+        defaults = {spec["description"]: spec for spec in DEFAULT_RULES}
+        entries, rule_specs = [], {}
+        for spec in specs:
+            if not isinstance(spec, dict):
+                raise ValueError(f"Rule must be an object, got {spec!r}")
+            if "code" in spec:
+                legacy: Optional[Dict[str, Any]] = defaults.get(spec.get("description"))
+                if legacy is None:
+                    print(f"[EthicsEngine] Skipping non-declarative rule: {spec.get('description')}")
+                    continue
+                spec = legacy
+            entries.append((spec["description"], compile_rule(spec), parse_rule(spec)))
+            rule_specs[spec["description"]] = spec
+        return RuleIndex(entries), rule_specs
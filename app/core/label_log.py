@@ -0,0 +1,189 @@
+"""
+LabelLog
+--------
+A single-writer, group-commit append log for labeled feedback (JSONL).
+Callers enqueue records in memory; a background writer thread appends them in batches,
+flushing when a batch is full or a short delay has passed. Each batch is written with one
+append under an exclusive file lock, so several processes can share the same log without
+interleaving partial lines.
+"""
+from typing import Any, Dict, List
+import atexit
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+FSYNC_POLICIES = ("always", "interval", "never")
+
+
+class LabelLog:
+    """
+    Buffered JSONL append log with group commit, a configurable fsync policy and
+    cross-process file locking.
+    """
+
+    def __init__(self, path: str, max_batch: int = 64, max_delay_ms: float = 50.0,
+                 fsync: str = "interval", fsync_interval: float = 1.0):
+        """
+        :param path: Path of the JSONL file to append to.
+        :param max_batch: Write as soon as this many records are queued.
+        :param max_delay_ms: Maximum time a record waits in memory before being written.
+        :param fsync: "always" (after every batch), "interval" (at most every
+                      fsync_interval seconds) or "never" (leave it to the OS).
+        :param fsync_interval: Seconds between fsyncs for the "interval" policy.
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self.path = str(path)
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max(0.0, max_delay_ms) / 1000.0
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.batches_written = 0
+        self.records_written = 0
+        self.write_errors = 0
+        self.records_dropped = 0
+        self._buffer: List[str] = []
+        self._enqueued = 0
+        self._first_pending_at = 0.0
+        self._flush_requested = False
+        self._closed = False
+        self._last_fsync = time.monotonic()
+        self._cond = threading.Condition()
+        self._thread = None
+        atexit.register(self.close)
+
+    def append(self, record: Dict[str, Any]):
+        """
+        Queue one record for the next group commit.
+
+        :param record: JSON-serializable dictionary, e.g. {"prompt": ..., "label": ...}.
+        """
+        line = json.dumps(record) + "\n"
+        with self._cond:
+            if self._closed:
+                raise ValueError("LabelLog is closed")
+            if not self._buffer:
+                self._first_pending_at = time.monotonic()
+            self._buffer.append(line)
+            self._enqueued += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="label-log-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Write everything queued so far and wait for it to reach the file.
+
+        A batch whose write fails stays queued and is retried with backoff, so this returns
+        False on timeout while the file cannot be written.
+
+        :param timeout: Maximum seconds to wait.
+        :return: True if all queued records were written.
+        """
+        with self._cond:
+            target = self._enqueued
+            if self.records_written >= target:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            self._cond.wait_for(
+                lambda: self.records_written + self.records_dropped >= target, timeout)
+            return self.records_written >= target
+
+    def close(self):
+        """
+        Flush pending records, sync the file and stop the writer thread. Records that still
+        cannot be written are dropped and counted in records_dropped.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        atexit.unregister(self.close)
+
+    def _run(self):
+        failures = 0
+        retry_at = 0.0
+        while True:
+            with self._cond:
+                while not self._buffer and not self._closed:
+                    self._cond.wait()
+                while (self._buffer and not self._closed and not self._flush_requested
+                       and len(self._buffer) < self.max_batch):
+                    remaining = self._first_pending_at + self.max_delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                while failures and not self._closed:
+                    remaining = retry_at - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._buffer = self._buffer, []
+                self._flush_requested = False
+                closing = self._closed
+
+            if batch:
+                try:
+                    self._write(batch, force_sync=closing)
+                except OSError as e:
+                    print("[LabelLog] Failed to write batch:", e)
+                    failures += 1
+                    retry_at = time.monotonic() + min(0.05 * 2 ** failures, 5.0)
+                    with self._cond:
+                        self.write_errors += 1
+                        if closing:
+                            self.records_dropped += len(batch)
+                            print(f"[LabelLog] Dropped {len(batch)} records on close")
+                        else:
+                            # Retry first, keeping the records in order.
+                            self._buffer[:0] = batch
+                        self._cond.notify_all()
+                else:
+                    failures = 0
+                    with self._cond:
+                        self.records_written += len(batch)
+                        self.batches_written += 1
+                        self._cond.notify_all()
+            if closing:
+                return
+
+    def _write(self, lines: List[str], force_sync: bool = False):
+        """Append one batch with a single write under an exclusive lock."""
+        data = "".join(lines).encode("utf-8")
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            size = os.fstat(fd).st_size
+            if size and os.pread(fd, 1, size - 1) != b"\n":
+                # Never glue a record onto a line left unterminated by another writer.
+                data = b"\n" + data
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            now = time.monotonic()
+            if (self.fsync == "always"
+                    or (force_sync and self.fsync != "never")
+                    or (self.fsync == "interval" and now - self._last_fsync >= self.fsync_interval)):
+                os.fsync(fd)
+                self._last_fsync = now
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
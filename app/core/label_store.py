@@ -0,0 +1,319 @@
+"""
+LabelStore
+----------
+A compact, memory-mapped on-disk store of labeled prompts for the TrainableEthicalReflector.
+Prompts are deduplicated, labels are kept in a 1-byte column and a hash index supports
+constant-time lookup by prompt. Opening a store only maps the file, so startup time and
+resident memory do not grow with the size of the corpus.
+
+File layout (little-endian):
+    header   magic (8 bytes), row count, hash table size, prompt blob size (uint64 each)
+    offsets  uint64[count + 1]   start of each prompt in the blob
+    hashes   uint64[count]       64-bit hash of each prompt
+    table    int64[table_size]   open-addressing index: slot -> row, -1 when empty
+    labels   uint8[count]        index into LABEL_CLASSES
+    blob     UTF-8 prompt text
+
+Converters to and from the JSONL label format are provided, and the module can be run as
+`python -m app.core.label_store to-store|to-jsonl SRC DST`.
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from collections.abc import Sequence as SequenceABC
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+LABEL_CLASSES = ["safe", "unsafe"]
+STORE_SUFFIX = ".lstore"
+_MAGIC = b"ASLSTOR1"
+_HEADER = struct.Struct("<8sQQQ")
+
+
+def prompt_hash(prompt: str) -> int:
+    """Stable 64-bit hash of a prompt, used by the store's index."""
+    return int.from_bytes(
+        hashlib.blake2b(prompt.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class LabelStore:
+    """
+    Read-only, memory-mapped view of a label store file.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: Path of a file written by write_label_store.
+        """
+        self.path = str(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._load()
+        except BaseException:
+            self.close()
+            raise
+
+    def _load(self):
+        """Validate the header and map the column arrays; raises ValueError if malformed."""
+        import numpy as np
+
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError(f"{self.path} is not a label store")
+        magic, count, table_size, blob_size = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{self.path} is not a label store")
+
+        pos = _HEADER.size
+        self._offsets = np.frombuffer(self._mmap, dtype="<u8", count=count + 1, offset=pos)
+        pos += 8 * (count + 1)
+        self._hashes = np.frombuffer(self._mmap, dtype="<u8", count=count, offset=pos)
+        pos += 8 * count
+        self._table = np.frombuffer(self._mmap, dtype="<i8", count=table_size, offset=pos)
+        pos += 8 * table_size
+        self.label_codes = np.frombuffer(self._mmap, dtype=np.uint8, count=count, offset=pos)
+        self._blob_start = pos + count
+        self._count = count
+        if self._blob_start + blob_size != len(self._mmap) or int(self._offsets[-1]) != blob_size:
+            raise ValueError(f"{self.path} is truncated or corrupt: expected a "
+                             f"{blob_size}-byte prompt blob")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __reduce__(self):
+        # Pickle by path so worker processes map the same file instead of copying it.
+        return (LabelStore, (self.path,))
+
+    def prompt(self, index: int) -> str:
+        """Decode the prompt stored at a row index."""
+        start = self._blob_start + int(self._offsets[index])
+        end = self._blob_start + int(self._offsets[index + 1])
+        return self._mmap[start:end].decode("utf-8")
+
+    def label(self, index: int) -> str:
+        """Return the label stored at a row index."""
+        return LABEL_CLASSES[self.label_codes[index]]
+
+    @property
+    def prompts(self) -> "PromptColumn":
+        """Lazy sequence view over all prompts."""
+        return PromptColumn(self)
+
+    def labels(self) -> "numpy.ndarray":
+        """All labels as a NumPy string array, built from the 1-byte label column."""
+        import numpy as np
+
+        return np.asarray(LABEL_CLASSES)[self.label_codes]
+
+    def lookup(self, prompt: str) -> Optional[str]:
+        """
+        Find the label of a prompt through the hash index.
+
+        :param prompt: Exact prompt text.
+        :return: The stored label, or None if the prompt is not in the store.
+        """
+        table_size = len(self._table)
+        if not table_size:
+            return None
+        h = prompt_hash(prompt)
+        slot = h & (table_size - 1)
+        while True:
+            row = int(self._table[slot])
+            if row < 0:
+                return None
+            if int(self._hashes[row]) == h and self.prompt(row) == prompt:
+                return self.label(row)
+            slot = (slot + 1) & (table_size - 1)
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        for i in range(self._count):
+            yield self.prompt(i), self.label(i)
+
+    def close(self):
+        """
+        Release the memory map. If a caller still holds the label_codes array, the map stays
+        open until that array is garbage-collected.
+        """
+        self._offsets = self._hashes = self._table = self.label_codes = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+
+class PromptColumn(SequenceABC):
+    """Sequence view that decodes prompts from a LabelStore on access."""
+
+    def __init__(self, store: LabelStore):
+        self.store = store
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.store.prompt(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.store.prompt(index)
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self.store)):
+            yield self.store.prompt(i)
+
+
+class ChainedSequence(SequenceABC):
+    """Read-only concatenation of sequences, e.g. a store's prompts followed by new examples."""
+
+    def __init__(self, *parts: Sequence):
+        self.parts = parts
+
+    def __len__(self) -> int:
+        return sum(len(part) for part in self.parts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        for part in self.parts:
+            if index < len(part):
+                return part[index]
+            index -= len(part)
+        raise IndexError(index)
+
+    def __iter__(self):
+        for part in self.parts:
+            yield from part
+
+
+def write_label_store(path: str, records: Iterable[Tuple[str, str]]) -> int:
+    """
+    Write labeled prompts to a new store, replacing any existing file atomically.
+    Duplicate prompts keep their last label; records with unknown labels are skipped.
+
+    :param path: Destination file.
+    :param records: Iterable of (prompt, label) pairs.
+    :return: Number of unique prompts written.
+    """
+    import numpy as np
+
+    codes = {label: i for i, label in enumerate(LABEL_CLASSES)}
+    rows: Dict[str, int] = {}
+    for prompt, label in records:
+        if prompt and label in codes:
+            rows.pop(prompt, None)
+            rows[prompt] = codes[label]
+
+    count = len(rows)
+    table_size = 1
+    while table_size < 2 * count:
+        table_size <<= 1
+    if not count:
+        table_size = 0
+
+    encoded = [prompt.encode("utf-8") for prompt in rows]
+    offsets = np.zeros(count + 1, dtype="<u8")
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    hashes = np.fromiter((prompt_hash(p) for p in rows), dtype="<u8", count=count)
+    table = np.full(table_size, -1, dtype="<i8")
+    for row, h in enumerate(hashes):
+        slot = int(h) & (table_size - 1)
+        while table[slot] >= 0:
+            slot = (slot + 1) & (table_size - 1)
+        table[slot] = row
+    labels = np.fromiter(rows.values(), dtype=np.uint8, count=count)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, count, table_size, int(offsets[-1])))
+        f.write(offsets.tobytes())
+        f.write(hashes.tobytes())
+        f.write(table.tobytes())
+        f.write(labels.tobytes())
+        for b in encoded:
+            f.write(b)
+    os.replace(tmp_path, path)
+    return count
+
+
+def preferred_label_path(jsonl_path: str) -> str:
+    """
+    The label store next to a JSONL label file (same name with STORE_SUFFIX) if it exists and
+    is at least as recent as the JSONL file, otherwise the JSONL file itself.
+    """
+    store_path = os.path.splitext(jsonl_path)[0] + STORE_SUFFIX
+    try:
+        store_mtime = os.stat(store_path).st_mtime_ns
+    except OSError:
+        return jsonl_path
+    try:
+        if os.stat(jsonl_path).st_mtime_ns > store_mtime:
+            print(f"[LabelStore] {store_path} is older than {jsonl_path}; loading the JSONL file.")
+            return jsonl_path
+    except OSError:
+        pass
+    return store_path
+
+
+def iter_jsonl_labels(path: str) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (prompt, label) pairs from a JSONL label file.
+    Tolerates several objects on one line and skips malformed entries.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            pos = 0
+            while pos < len(line):
+                try:
+                    item, pos = decoder.raw_decode(line, pos)
+                except json.JSONDecodeError as e:
+                    print("[LabelStore] Skipping malformed line:", e)
+                    break
+                while pos < len(line) and line[pos].isspace():
+                    pos += 1
+                if isinstance(item, dict):
+                    yield item.get("prompt"), item.get("label")
+
+
+def jsonl_to_store(src: str, dst: str) -> int:
+    """Convert a JSONL label file into a label store. Returns the number of rows written."""
+    count = write_label_store(dst, iter_jsonl_labels(src))
+    print(f"[LabelStore] Wrote {count} unique labeled prompts to {dst}")
+    return count
+
+
+def store_to_jsonl(src: str, dst: str) -> int:
+    """Convert a label store back into JSONL. Returns the number of rows written."""
+    store = LabelStore(src)
+    try:
+        with open(dst, "w", encoding="utf-8") as f:
+            for prompt, label in store:
+                f.write(json.dumps({"prompt": prompt, "label": label}) + "\n")
+        return len(store)
+    finally:
+        store.close()
+
+
+def main(argv: List[str] = None):
+    """Command-line entry point for converting between JSONL and label stores."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Convert between labels.jsonl and a label store.")
+    parser.add_argument("command", choices=["to-store", "to-jsonl"])
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    args = parser.parse_args(argv)
+    if args.command == "to-store":
+        jsonl_to_store(args.src, args.dst)
+    else:
+        store_to_jsonl(args.src, args.dst)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
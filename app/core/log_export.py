@@ -0,0 +1,188 @@
+"""
+Log Export
+----------
+Streaming export of persisted moderation decisions. Entries are read lazily from the JSONL
+(optionally gzip-compressed) files written by JsonlLogSink, filtered by time range, verdict,
+environment and role, and flattened so that context fields become columns; context fields
+without a column of their own are kept, JSON-encoded, in "context.extra". Output is CSV,
+written row by row, or Parquet (requires the optional `pyarrow` package), written one row
+group per chunk. Memory use is bounded by the chunk size, not by the size of the log.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import csv
+import datetime
+import gzip
+import io
+import json
+
+BASE_COLUMNS = ["timestamp", "user_input", "goal", "permissible", "explanation"]
+CONTEXT_COLUMNS = ["context.user", "context.environment", "context.time", "context.input_keywords",
+                   "context.extra"]
+COLUMNS = BASE_COLUMNS + CONTEXT_COLUMNS
+
+
+def parse_time(value) -> Optional[datetime.datetime]:
+    """
+    Parse a datetime or ISO 8601 string into an aware UTC datetime.
+    Naive values (as written by ModerationLogger) are taken to be local time.
+
+    :raises ValueError: If the string is not a valid ISO timestamp.
+    """
+    if value is None:
+        return None
+    if not isinstance(value, datetime.datetime):
+        if not isinstance(value, str):
+            raise ValueError(f"Invalid timestamp: {value!r}")
+        value = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value.astimezone(datetime.timezone.utc)
+
+
+def read_log_files(paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield log entries from JSONL or JSONL.gz files, one line at a time.
+    Malformed lines and a truncated final gzip block (file still being written) are skipped.
+    """
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        try:
+            with opener(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+        except (EOFError, gzip.BadGzipFile) as e:
+            print(f"[LogExport] Stopped reading {path}: {e}")
+
+
+def filter_entries(entries: Iterable[Dict[str, Any]], start=None, end=None,
+                   permissible: Optional[bool] = None, environment: Optional[str] = None,
+                   user_role: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily filter log entries.
+
+    :param start: Earliest timestamp (inclusive), as datetime or ISO string.
+    :param end: Latest timestamp (exclusive), as datetime or ISO string.
+    :param permissible: Keep only approved (True) or blocked (False) decisions.
+    :param environment: Keep only this context environment.
+    :param user_role: Keep only this context user role.
+    :raises ValueError: If start or end is not a valid timestamp (raised on call, not on iteration).
+    """
+    start, end = parse_time(start), parse_time(end)
+    return _filter(entries, start, end, permissible, environment, user_role)
+
+
+def _filter(entries, start, end, permissible, environment, user_role):
+    for entry in entries:
+        context = entry.get("context") or {}
+        if permissible is not None and entry.get("permissible") != permissible:
+            continue
+        if environment is not None and context.get("environment") != environment:
+            continue
+        if user_role is not None and context.get("user") != user_role:
+            continue
+        if start is not None or end is not None:
+            try:
+                timestamp = parse_time(entry.get("timestamp"))
+            except ValueError:
+                continue
+            if timestamp is None or (start and timestamp < start) or (end and timestamp >= end):
+                continue
+        yield entry
+
+
+def flatten_entry(entry: Dict[str, Any], columns: List[str] = None) -> Dict[str, Any]:
+    """
+    Flatten an entry's context into "context.<field>" columns.
+    List values are joined with spaces; other nested values are JSON-encoded. Context fields
+    without a column in `columns` are collected into "context.extra" as a JSON object.
+    """
+    known = set(columns or COLUMNS)
+    row = {key: value for key, value in entry.items() if key != "context"}
+    extra = {}
+    for key, value in (entry.get("context") or {}).items():
+        column = f"context.{key}"
+        if column not in known:
+            extra[key] = value
+            continue
+        if isinstance(value, list) and all(isinstance(v, str) for v in value):
+            value = " ".join(value)
+        elif isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        row[column] = value
+    if extra:
+        row["context.extra"] = json.dumps(extra, default=str)
+    return row
+
+
+def iter_csv(entries: Iterable[Dict[str, Any]], columns: List[str] = None) -> Iterator[str]:
+    """Yield CSV text (header first, then one chunk per row) for streaming responses."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns or COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    for entry in entries:
+        writer.writerow(flatten_entry(entry, columns))
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_csv(entries: Iterable[Dict[str, Any]], filename: str, columns: List[str] = None) -> int:
+    """
+    Stream entries to a CSV file.
+
+    :return: Number of rows written.
+    """
+    count = 0
+    with open(filename, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns or COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for entry in entries:
+            writer.writerow(flatten_entry(entry, columns))
+            count += 1
+    print(f"[LogExport] Exported {count} decisions to {filename}")
+    return count
+
+
+def export_parquet(entries: Iterable[Dict[str, Any]], filename: str,
+                   columns: List[str] = None, chunk_size: int = 10000) -> int:
+    """
+    Stream entries to a Parquet file, one row group per chunk. Requires `pyarrow`.
+
+    :return: Number of rows written.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet export requires the optional 'pyarrow' package.") from e
+
+    columns = columns or COLUMNS
+    schema = pa.schema([
+        (name, pa.bool_() if name == "permissible" else pa.string()) for name in columns])
+    count = 0
+    with pq.ParquetWriter(filename, schema) as writer:
+        chunk = []
+        for entry in entries:
+            chunk.append(flatten_entry(entry, columns))
+            if len(chunk) >= chunk_size:
+                writer.write_table(_to_table(pa, schema, chunk))
+                count += len(chunk)
+                chunk = []
+        if chunk or not count:
+            writer.write_table(_to_table(pa, schema, chunk))
+            count += len(chunk)
+    print(f"[LogExport] Exported {count} decisions to {filename}")
+    return count
+
+
+def _to_table(pa, schema, rows: List[Dict[str, Any]]):
+    arrays = {}
+    for field in schema:
+        values = [row.get(field.name) for row in rows]
+        if field.type == pa.string():
+            values = [None if v is None else str(v) for v in values]
+        arrays[field.name] = pa.array(values, type=field.type)
+    return pa.table(arrays, schema=schema)
@@ -0,0 +1,212 @@
+"""
+JsonlLogSink
+------------
+Asynchronous structured sink for moderation decisions. Producers append entries to a deque
+(append/popleft are atomic, so the request path takes no lock) and a background thread drains
+it into JSONL files that rotate by size and/or age and can be gzip-compressed. When the queue
+is full, entries are either dropped (and counted) or the producer blocks, depending on policy.
+Entries in a batch that cannot be written are dropped and counted as well.
+"""
+from typing import Any, Dict, List
+from collections import deque
+import atexit
+import datetime
+import gzip
+import json
+import os
+import threading
+import time
+
+POLICIES = ("drop", "block")
+
+
+class JsonlLogSink:
+    """
+    Background writer of log entries into rotated JSONL files.
+    """
+
+    def __init__(self, directory: str, prefix: str = "moderation", max_bytes: int = 50 * 1024 * 1024,
+                 rotate_seconds: float = None, compress: bool = False, max_queue: int = 10000,
+                 policy: str = "drop", flush_interval: float = 0.2):
+        """
+        :param directory: Directory for log files; created if missing.
+        :param prefix: File name prefix.
+        :param max_bytes: Rotate once the current file has this many uncompressed bytes.
+        :param rotate_seconds: Also rotate files older than this; None disables time rotation.
+        :param compress: Write gzip-compressed files (.jsonl.gz).
+        :param max_queue: Maximum number of queued entries.
+        :param policy: "drop" new entries or "block" the producer when the queue is full.
+        :param flush_interval: Seconds the writer waits between drains when idle.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, got {policy!r}")
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.compress = compress
+        self.max_queue = max_queue
+        self.policy = policy
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._queue = deque()
+        self._wakeup = threading.Event()
+        self._space = threading.Condition()
+        self._closed = False
+        self._busy = False
+        self._file = None
+        self._file_bytes = 0
+        self._file_opened = 0.0
+        self._sequence = 0
+        self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a sink from MODERATION_LOG_DIR and related settings, or return None when
+        MODERATION_LOG_DIR is not set.
+        """
+        directory = os.getenv("MODERATION_LOG_DIR")
+        if not directory:
+            return None
+        rotate_seconds = os.getenv("MODERATION_LOG_ROTATE_SECONDS")
+        return cls(directory,
+                   max_bytes=int(float(os.getenv("MODERATION_LOG_MAX_MB", "50")) * 1024 * 1024),
+                   rotate_seconds=float(rotate_seconds) if rotate_seconds else None,
+                   compress=os.getenv("MODERATION_LOG_COMPRESS", "0").lower() in ("1", "true", "yes"),
+                   policy=os.getenv("MODERATION_LOG_QUEUE_POLICY", "drop"))
+
+    def emit(self, entry: Dict[str, Any]) -> bool:
+        """
+        Queue an entry for writing.
+
+        :param entry: JSON-serializable mapping (non-serializable values are written as str).
+        :return: False if the entry was dropped because the queue was full.
+        """
+        if self._closed:
+            raise ValueError("Log sink is closed")
+        if len(self._queue) >= self.max_queue:
+            if self.policy == "drop":
+                self.dropped += 1
+                return False
+            self._wakeup.set()
+            with self._space:
+                self._space.wait_for(
+                    lambda: len(self._queue) < self.max_queue or self._closed)
+            if self._closed:
+                raise ValueError("Log sink is closed")
+        self._queue.append(entry)
+        if len(self._queue) >= 256:
+            self._wakeup.set()
+        return True
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait until every queued entry has been written.
+
+        :return: False on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue or self._busy:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            self._wakeup.set()
+            time.sleep(0.005)
+        return True
+
+    def files(self) -> List[str]:
+        """Paths of this sink's log files, oldest first."""
+        names = sorted(name for name in os.listdir(self.directory)
+                       if name.startswith(f"{self.prefix}-") and ".jsonl" in name)
+        return [os.path.join(self.directory, name) for name in names]
+
+    def close(self):
+        """Write pending entries and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        with self._space:
+            self._space.notify_all()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._busy = True
+            try:
+                self._drain()
+            except OSError as e:
+                print("[LogSink] Write failed:", e)
+            finally:
+                self._busy = False
+            if self._closed and not self._queue:
+                if self._file:
+                    self._file.close()
+                    self._file = None
+                return
+
+    def _drain(self):
+        lines = []
+        while self._queue:
+            lines.append(json.dumps(self._queue.popleft(), default=str) + "\n")
+            if len(lines) >= 1024:
+                self._write(lines)
+                lines = []
+        if lines:
+            self._write(lines)
+
+    def _write(self, lines: List[str]):
+        """Write one batch; a batch that fails is dropped and counted, and the file reopened."""
+        with self._space:
+            self._space.notify_all()
+        try:
+            for line in lines:
+                if self._should_rotate():
+                    self._rotate()
+                self._file.write(line)
+                self._file_bytes += len(line.encode("utf-8"))
+            self._file.flush()
+        except OSError as e:
+            self.dropped += len(lines)
+            print(f"[LogSink] Write failed, dropped {len(lines)} entries:", e)
+            if self._file:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None
+            return
+        self.written += len(lines)
+
+    def _should_rotate(self) -> bool:
+        if self._file is None or self._file_bytes >= self.max_bytes:
+            return True
+        return (self.rotate_seconds is not None
+                and time.monotonic() - self._file_opened >= self.rotate_seconds)
+
+    def _rotate(self):
+        if self._file:
+            self._file.close()
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        # Exclusive create: workers sharing the directory never truncate each other's files.
+        while True:
+            self._sequence += 1
+            path = os.path.join(self.directory, f"{self.prefix}-{stamp}-{self._sequence:04d}{suffix}")
+            try:
+                if self.compress:
+                    self._file = gzip.open(path, "xt", encoding="utf-8")
+                else:
+                    self._file = open(path, "x", encoding="utf-8")
+                break
+            except FileExistsError:
+                continue
+        self._file_bytes = 0
+        self._file_opened = time.monotonic()
@@ -3,11 +3,17 @@ ModerationLogger
 ----------------
 Logs decisions made by the AbstractAISystem including inputs, ethical outcomes, context, and explanations.
 Supports exporting to CSV and visualizing feedback trends.
+Decisions can also be streamed to a JsonlLogSink; the logger then keeps only a bounded tail
+in memory and no longer prints each entry, and exports stream from the persisted files.
 """
-from typing import List, Dict
+from typing import Dict, Iterator, Optional
+from collections import deque
 import datetime
 import csv
-import matplotlib.pyplot as plt
+import os
+
+from app.core.log_export import export_csv, export_parquet, filter_entries, read_log_files
+from app.core.log_sink import JsonlLogSink
 
 
 class ModerationLogger:
@@ -15,9 +21,24 @@ class ModerationLogger:
     Stores and outputs a history of moderation decisions for auditing, debugging, or visualization.
     """
 
-    def __init__(self):
-        """Initialize an empty decision log."""
-        self.log: List[Dict[str, any]] = []
+    def __init__(self, sink: Optional[JsonlLogSink] = None, tail_size: Optional[int] = None):
+        """
+        Initialize an empty decision log.
+
+        :param sink: Optional asynchronous sink that persists every decision.
+        :param tail_size: Number of recent decisions kept in memory. Unbounded when omitted and
+                          no sink is set; defaults to 1000 with a sink.
+        """
+        self.sink = sink
+        if tail_size is None and sink is not None:
+            tail_size = 1000
+        self.log = deque(maxlen=tail_size) if tail_size else []
+
+    @classmethod
+    def from_env(cls) -> "ModerationLogger":
+        """Build a logger with a JsonlLogSink when MODERATION_LOG_DIR is set."""
+        tail_size = os.getenv("MODERATION_LOG_TAIL")
+        return cls(sink=JsonlLogSink.from_env(), tail_size=int(tail_size) if tail_size else None)
 
     def log_decision(self, user_input: str, goal: str, context: Dict[str, any], permissible: bool, explanation: str):
         """
@@ -38,7 +59,10 @@ class ModerationLogger:
             "explanation": explanation
         }
         self.log.append(entry)
-        print(f"[Logger] Decision logged: {entry}")
+        if self.sink is not None:
+            self.sink.emit(entry)
+        else:
+            print(f"[Logger] Decision logged: {entry}")
 
     def export_to_csv(self, filename: str = "moderation_log.csv"):
         """
@@ -56,6 +80,34 @@ class ModerationLogger:
             writer.writerows(self.log)
         print(f"[Logger] Exported log to {filename}")
 
+    def iter_entries(self) -> Iterator[Dict[str, any]]:
+        """
+        Iterate over logged decisions: the sink's persisted files when a sink is configured
+        (queued entries are written first, waiting at most 5 seconds), otherwise the in-memory log.
+        """
+        if self.sink is not None:
+            if not self.sink.flush(timeout=5.0):
+                print("[Logger] Log sink did not flush in time; recent decisions may be missing.")
+            return read_log_files(self.sink.files())
+        return iter(list(self.log))
+
+    def export(self, filename: str, fmt: str = "csv", **filters) -> int:
+        """
+        Stream logged decisions to a CSV or Parquet file without loading them all in memory.
+        Context fields are flattened into "context.<field>" columns.
+
+        :param filename: Name of the output file.
+        :param fmt: "csv" or "parquet" (requires pyarrow).
+        :param filters: start, end, permissible, environment, user_role (see filter_entries).
+        :return: Number of exported decisions.
+        """
+        entries = filter_entries(self.iter_entries(), **filters)
+        if fmt == "parquet":
+            return export_parquet(entries, filename)
+        if fmt == "csv":
+            return export_csv(entries, filename)
+        raise ValueError(f"Unsupported export format: {fmt}")
+
     def plot_feedback_histogram(self, memory):
         """
         Plot a histogram of feedback values from the memory module.
@@ -68,6 +120,8 @@ class ModerationLogger:
             print("[Logger] No feedback data available to plot.")
             return
 
+        import matplotlib.pyplot as plt  # deferred: only needed for plotting
+
         plt.hist(feedback_values, bins=3, edgecolor='black')
         plt.title("Distribution of Feedback Scores")
         plt.xlabel("Feedback")
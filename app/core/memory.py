@@ -3,27 +3,83 @@ ReflectionMemory
 ----------------
 Stores the interaction history of the AI system including goals, contexts, plans, and feedback.
 It reflects on outcomes and can dynamically add new ethical rules in response to negative feedback.
+History is a fixed-capacity ring buffer of compact records; per-rule negative-feedback counts
+are maintained incrementally as records enter and leave it.
 """
-from typing import List, Dict
+from typing import Any, Deque, Dict, List, Optional
+from collections import Counter, deque
 import datetime
+import time
 
 from app.core.rule_adaptation import RuleAdaptationEngine
 
 
+class Reflection:
+    """
+    A single remembered interaction. Supports read-only dict-style access
+    (entry["feedback"], "violated_rules" in entry) for existing consumers.
+    """
+
+    __slots__ = ("goal", "context", "plan", "feedback", "created", "violated_rules")
+
+    def __init__(self, goal: str, context: Dict[str, Any], plan: str, feedback: int,
+                 violated_rules: Optional[List[str]] = None):
+        self.goal = goal
+        self.context = context
+        self.plan = plan
+        self.feedback = feedback
+        self.created = time.time()
+        self.violated_rules = violated_rules
+
+    @property
+    def timestamp(self) -> str:
+        """Creation time as an ISO 8601 string."""
+        return datetime.datetime.fromtimestamp(self.created).isoformat()
+
+    def __getitem__(self, key: str):
+        if key not in self:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        if key == "violated_rules":
+            return self.violated_rules is not None
+        return key in ("goal", "context", "plan", "feedback", "timestamp")
+
+    def get(self, key: str, default=None):
+        """Dict-style get."""
+        return self[key] if key in self else default
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dictionary form of the record."""
+        return {key: self[key] for key in
+                ("goal", "context", "plan", "feedback", "timestamp", "violated_rules") if key in self}
+
+
 class ReflectionMemory:
     """
     A memory system that logs past decisions and reflections, allowing the system to learn
     from outcomes and adjust its ethical behavior dynamically.
     """
 
-    def __init__(self, ethics_engine):
+    def __init__(self, ethics_engine, capacity: int = 10000, rule_stats=None):
         """
         Initialize the memory with a reference to the ethics engine so it can modify rules.
 
         :param ethics_engine: An instance of the EthicsEngine to add rules to.
+        :param capacity: Maximum number of remembered interactions; the oldest are dropped first.
+        :param rule_stats: Optional StreamingRuleStats fed with negative feedback. When set, rule
+                           reviews are left to a background RuleAdaptationEngine timer.
         """
-        self.history: List[Dict[str, any]] = []
+        self._records: Deque[Reflection] = deque(maxlen=capacity)
+        self.negative_rule_counts: Counter = Counter()
         self.ethics_engine = ethics_engine
+        self.rule_stats = rule_stats
+
+    @property
+    def history(self) -> Deque[Reflection]:
+        """Remembered interactions, oldest first."""
+        return self._records
 
     def reflect_on_interaction(self, goal: str, context: Dict[str, any], plan: str, feedback: int, reflector=None):
         """
@@ -35,25 +91,36 @@ class ReflectionMemory:
         :param plan: The planned response or action.
         :param feedback: An integer representing how effective or ethical the plan was (-1 to 1).
         """
-        reflection = {
-            "goal": goal,
-            "context": context,
-            "plan": plan,
-            "feedback": feedback,
-            "timestamp": datetime.datetime.now().isoformat()
-        }
+        violated_rules = None
         if not context.get("permissible", True):
-            reflection["violated_rules"] = context.get("violated_rules", [])
+            violated_rules = context.get("violated_rules", [])
+        reflection = Reflection(goal, context, plan, feedback, violated_rules)
 
-        self.history.append(reflection)
+        if len(self._records) == self._records.maxlen:
+            self._count(self._records[0], -1)
+        self._records.append(reflection)
+        self._count(reflection, +1)
 
         # 🔁 Trigger automatic adaptation
         if reflector and hasattr(reflector, "learn_from_feedback"):
             reflector.learn_from_feedback(
                 goal.replace("Goal based on: ", ""), feedback)
 
-        # Log suggested rule reviews for developer
-        adapter = RuleAdaptationEngine(self)
-        suggested = adapter.suggest_rule_review()
-        if suggested:
-            print(f"[Memory] Rules suggested for review: {suggested}")
+        if feedback < 0 and violated_rules:
+            if self.rule_stats is not None:
+                # Reviews run on the RuleAdaptationEngine background timer
+                self.rule_stats.record(
+                    violated_rules, context.get("environment"), context.get("user"))
+            else:
+                # Log suggested rule reviews for developer
+                suggested = RuleAdaptationEngine(self).suggest_rule_review()
+                if suggested:
+                    print(f"[Memory] Rules suggested for review: {suggested}")
+
+    def _count(self, reflection: Reflection, delta: int):
+        """Apply a record's negative feedback to the per-rule counters."""
+        if reflection.feedback < 0 and reflection.violated_rules:
+            for rule in reflection.violated_rules:
+                self.negative_rule_counts[rule] += delta
+                if self.negative_rule_counts[rule] <= 0:
+                    del self.negative_rule_counts[rule]
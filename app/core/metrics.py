@@ -0,0 +1,124 @@
+"""
+MetricsRegistry
+---------------
+Low-overhead, in-process metrics for the moderation pipeline: per-stage latency histograms,
+per-stage block counters, per-rule block counters and a decision counter. Rendered in the
+Prometheus text exposition format for the GET /metrics endpoint.
+"""
+from typing import Callable, Dict, Iterable, List, Tuple
+from bisect import bisect_left
+from collections import Counter
+import threading
+import time
+
+# Upper bounds in seconds; the pipeline stages range from microseconds to a model call.
+LATENCY_BUCKETS = (
+    0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram."""
+
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Record one observation. Caller serializes access."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        """Cumulative bucket counts, ending with the +Inf bucket."""
+        out, running = [], 0
+        for count in self.counts:
+            running += count
+            out.append(running)
+        return out
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """
+    Thread-safe collection of pipeline metrics.
+    """
+
+    def __init__(self, prefix: str = "asimov"):
+        """
+        :param prefix: Name prefix for every exported metric.
+        """
+        self.prefix = prefix
+        self.stage_latency: Dict[str, Histogram] = {}
+        self.stage_blocks: Counter = Counter()
+        self.rule_blocks: Counter = Counter()
+        self.decisions: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        """Record the latency of one stage execution."""
+        with self._lock:
+            histogram = self.stage_latency.get(stage)
+            if histogram is None:
+                histogram = self.stage_latency[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def timed(self, stage: str, fn: Callable, *args):
+        """Call fn(*args), record its latency under `stage` and return its result."""
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def block(self, stage: str, rules: Iterable[str] = ()):
+        """Count a request blocked at `stage`, optionally attributing it to rules."""
+        with self._lock:
+            self.stage_blocks[stage] += 1
+            for rule in rules:
+                self.rule_blocks[(stage, rule)] += 1
+
+    def decision(self, approved: bool):
+        """Count a served decision by verdict."""
+        with self._lock:
+            self.decisions["approved" if approved else "blocked"] += 1
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        p = self.prefix
+        with self._lock:
+            lines = [f"# HELP {p}_stage_latency_seconds Latency of each moderation pipeline stage.",
+                     f"# TYPE {p}_stage_latency_seconds histogram"]
+            for stage, histogram in sorted(self.stage_latency.items()):
+                stage_label = f'stage="{_label(stage)}"'
+                bounds = [repr(b) for b in histogram.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, histogram.cumulative()):
+                    lines.append(f'{p}_stage_latency_seconds_bucket{{{stage_label},le="{bound}"}} {count}')
+                lines.append(f"{p}_stage_latency_seconds_sum{{{stage_label}}} {histogram.total!r}")
+                lines.append(f"{p}_stage_latency_seconds_count{{{stage_label}}} {histogram.count}")
+
+            lines += [f"# HELP {p}_stage_blocks_total Requests blocked at each pipeline stage.",
+                      f"# TYPE {p}_stage_blocks_total counter"]
+            for stage, count in sorted(self.stage_blocks.items()):
+                lines.append(f'{p}_stage_blocks_total{{stage="{_label(stage)}"}} {count}')
+
+            lines += [f"# HELP {p}_rule_blocks_total Requests blocked by each rule or principle.",
+                      f"# TYPE {p}_rule_blocks_total counter"]
+            for (stage, rule), count in sorted(self.rule_blocks.items()):
+                lines.append(
+                    f'{p}_rule_blocks_total{{stage="{_label(stage)}",rule="{_label(rule)}"}} {count}')
+
+            lines += [f"# HELP {p}_decisions_total Served moderation decisions by verdict.",
+                      f"# TYPE {p}_decisions_total counter"]
+            for verdict, count in sorted(self.decisions.items()):
+                lines.append(f'{p}_decisions_total{{verdict="{verdict}"}} {count}')
+        return "\n".join(lines) + "\n"
@@ -7,6 +7,8 @@ Filters unsafe or unauthorized behaviors even if they pass ethical rule checks.
 """
 from typing import Dict
 
+from app.core.prompt import TextLike, goal_of
+
 
 class MetaMonitor:
     """
@@ -16,24 +18,25 @@ class MetaMonitor:
     alignment.
     """
 
-    def verify_plan(self, plan: str, goal: str, context: Dict[str, any]) -> bool:
+    def verify_plan(self, plan: str, goal: TextLike, context: Dict[str, any]) -> bool:
         """
         Determine whether the proposed plan is valid within long-term system constraints.
 
         :param plan: The textual plan to verify.
-        :param goal: The interpreted goal that the plan addresses.
+        :param goal: The interpreted goal that the plan addresses, or a Prompt carrying it.
         :param context: Dictionary describing user identity, role, and environment.
         :return: True if plan passes all checks; False otherwise.
         """
-        if "violate values" in plan.lower():
+        plan_lower = plan.lower()
+        if "violate values" in plan_lower:
             print("[MetaMonitor] Plan rejected due to values violation.")
             return False
 
-        if "override" in goal.lower() and context.get("user") != "admin":
+        if "override" in goal_of(goal)[1] and context.get("user") != "admin":
             print("[MetaMonitor] Plan rejected due to unauthorized override attempt.")
             return False
 
-        if "surveillance" in plan.lower() and context.get("environment") not in ["secure_lab", "training_sim"]:
+        if "surveillance" in plan_lower and context.get("environment") not in ["secure_lab", "training_sim"]:
             print(
                 "[MetaMonitor] Plan rejected due to inappropriate surveillance context.")
             return False
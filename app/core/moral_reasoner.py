@@ -3,42 +3,106 @@ MoralReasoner
 -------------
 A prototype rule-based ethical reasoning engine that infers the permissibility of actions
 based on structured interpretations of user goals or intents.
+
+Axioms form a decision table of (keyword, allowed, rationale) rows in priority order. The table
+is deduplicated and compiled into a keyword automaton, so an intent is matched in one pass and
+the verdict of the highest-priority matching axiom is returned, however many axioms are loaded.
+Large axiom sets can be loaded from a JSON file of {"keyword", "allowed", "rationale"} objects.
 """
-from typing import Tuple, Dict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import json
+import os
+
+from app.core.prompt import TextLike, goal_of
+from app.core.text_match import KeywordAutomaton
+
+
+class Axiom(NamedTuple):
+    """One decision-table row: intents containing `keyword` get verdict `allowed`."""
+    keyword: str
+    allowed: bool
+    rationale: str
+
+
+DEFAULT_AXIOMS: List[Axiom] = [
+    Axiom("deceive", False, "Deception is unethical"),
+    Axiom("harm", False, "Causing harm is impermissible"),
+    Axiom("manipulate", False, "Manipulation undermines autonomy"),
+    Axiom("exploit", False, "Exploitation is not ethically acceptable"),
+    Axiom("surveil", False, "Surveillance requires informed consent"),
+    Axiom("respect", True, "Respecting others supports autonomy"),
+    Axiom("help", True, "Helping actions are generally permissible"),
+    Axiom("educate", True, "Educational support is encouraged"),
+    Axiom("inform", True, "Providing truthful information supports transparency"),
+    Axiom("override", False, "Overrides require strict role validation"),
+]
+
+NO_MATCH = (True, "No ethical violations detected in intent.")
+
+
+def load_axioms(path: str) -> List[Axiom]:
+    """
+    Read axioms from a JSON file containing a list of {"keyword", "allowed", "rationale"}.
+
+    :raises ValueError: If an entry is malformed.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    if not isinstance(entries, list):
+        raise ValueError(f"{path} must contain a list of axioms")
+    axioms = []
+    for entry in entries:
+        if (not isinstance(entry, dict) or not isinstance(entry.get("keyword"), str)
+                or not entry["keyword"] or not isinstance(entry.get("allowed"), bool)
+                or not isinstance(entry.get("rationale"), str)):
+            raise ValueError(f"Invalid axiom in {path}: {entry!r}")
+        axioms.append(Axiom(entry["keyword"], entry["allowed"], entry["rationale"]))
+    return axioms
+
 
 class MoralReasoner:
     """
     Performs deontic-style reasoning to determine whether a proposed action is ethically permissible.
     """
-    def __init__(self):
-        self.ethical_axioms = [
-            (lambda s: "deceive" in s, False, "Deception is unethical"),
-            (lambda s: "harm" in s, False, "Causing harm is impermissible"),
-            (lambda s: "manipulate" in s, False, "Manipulation undermines autonomy"),
-            (lambda s: "exploit" in s, False, "Exploitation is not ethically acceptable"),
-            (lambda s: "surveil" in s, False, "Surveillance requires informed consent"),
-            (lambda s: "respect" in s, True, "Respecting others supports autonomy"),
-            (lambda s: "help" in s, True, "Helping actions are generally permissible"),
-            (lambda s: "educate" in s, True, "Educational support is encouraged"),
-            (lambda s: "inform" in s, True, "Providing truthful information supports transparency"),
-            (lambda s: "override" in s, False, "Overrides require strict role validation"),
-            (lambda s: "deceive" in s, False, "Deception is unethical"),
-            (lambda s: "harm" in s, False, "Causing harm is impermissible"),
-            (lambda s: "respect" in s, True, "Respecting others supports autonomy"),
-            (lambda s: "help" in s, True, "Helping actions are generally permissible"),
-            (lambda s: "override" in s, False, "Overrides require strict role validation"),
-        ]
-
-    def judge_action(self, intent: str, context: Dict) -> Tuple[bool, str]:  # pylint: disable=unused-argument
+    def __init__(self, axioms: Optional[Iterable[Axiom]] = None):
+        """
+        :param axioms: Decision-table rows, highest priority first. Defaults to DEFAULT_AXIOMS.
+        """
+        self.ethical_axioms: List[Axiom] = []
+        self._priority: Dict[str, int] = {}
+        seen = set()
+        for axiom in DEFAULT_AXIOMS if axioms is None else axioms:
+            keyword = axiom.keyword.lower()
+            if keyword in seen:
+                continue  # a later row with the same keyword can never win
+            seen.add(keyword)
+            self._priority[keyword] = len(self.ethical_axioms)
+            self.ethical_axioms.append(Axiom(keyword, axiom.allowed, axiom.rationale))
+        self._automaton = KeywordAutomaton(self._priority)
+
+    @classmethod
+    def from_file(cls, path: str) -> "MoralReasoner":
+        """Build a reasoner from an axiom file (see load_axioms)."""
+        axioms = load_axioms(path)
+        print(f"[MoralReasoner] Loaded {len(axioms)} axioms from {path}")
+        return cls(axioms)
+
+    @classmethod
+    def from_env(cls) -> "MoralReasoner":
+        """Load the axiom file named by MORAL_AXIOMS_FILE, or use the default axioms."""
+        path = os.getenv("MORAL_AXIOMS_FILE")
+        return cls.from_file(path) if path else cls()
+
+    def judge_action(self, intent: TextLike, context: Dict[str, Any]) -> Tuple[bool, str]:  # pylint: disable=unused-argument
         """
         Check ethical permissibility of a parsed action or goal.
 
-        :param intent: A simplified or parsed intent from the user prompt.
+        :param intent: A simplified or parsed intent from the user prompt, or a Prompt whose goal is used.
         :param context: Optional context (e.g., user role, environment).
         :return: Tuple (permissible: bool, explanation: str)
         """
-        for keyword_check, allowed, rationale in self.ethical_axioms:
-            for keyword_check, allowed, rationale in self.ethical_axioms:
-                if keyword_check(intent.lower()):
-                    return (allowed, rationale)
-            return True, "No ethical violations detected in intent."
+        matches = self._automaton.find(goal_of(intent)[1])
+        if not matches:
+            return NO_MATCH
+        _, allowed, rationale = self.ethical_axioms[min(self._priority[k] for k in matches)]
+        return allowed, rationale
@@ -0,0 +1,164 @@
+"""
+SamplingProfiler
+----------------
+On-demand wall-clock sampling profiler for a running worker. A background thread snapshots
+the stacks of all other threads (sys._current_frames) at a fixed interval and aggregates them
+as collapsed stacks ("frame;frame;frame count"), the input format of flamegraph.pl and
+speedscope. Profiling runs for T seconds or for the next N moderation requests, whichever
+ends first, and can be started from an admin route or a signal.
+"""
+from typing import Dict, Optional
+from collections import Counter
+import datetime
+import os
+import signal
+import sys
+import threading
+import time
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _notify(fd: int):
+    try:
+        os.write(fd, b"\0")
+    except OSError:
+        pass  # pipe full: a start is already pending
+
+
+class SamplingProfiler:
+    """
+    Collects collapsed stacks from live traffic and writes them to a file when done.
+    """
+
+    def __init__(self, output_dir: str = "profiles", interval: float = 0.005):
+        """
+        :param output_dir: Directory for .collapsed output files.
+        :param interval: Seconds between stack samples.
+        """
+        self.output_dir = output_dir
+        self.interval = interval
+        self.last_output: Optional[str] = None
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._remaining_requests = None
+        self._deadline = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        """Whether a profiling session is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float = 30.0, requests: int = None) -> bool:
+        """
+        Start a profiling session.
+
+        :param seconds: Maximum session length.
+        :param requests: Also stop after this many finished requests (see request_finished).
+        :return: False if a session is already running.
+        """
+        with self._lock:
+            if self.active:
+                return False
+            self._stacks = Counter()
+            self._samples = 0
+            self._remaining_requests = requests
+            self._deadline = time.monotonic() + seconds
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+        print(f"[Profiler] Sampling for up to {seconds:g}s"
+              + (f" or {requests} requests" if requests else ""))
+        return True
+
+    def request_finished(self):
+        """Count one served request; ends a request-bounded session when it reaches zero."""
+        if self._remaining_requests is None or not self.active:
+            return
+        with self._lock:
+            if self._remaining_requests is not None:
+                self._remaining_requests -= 1
+                if self._remaining_requests <= 0:
+                    self._stop.set()
+
+    def stop(self, timeout: float = 5.0) -> Optional[str]:
+        """
+        End the running session and wait for its output file.
+
+        :return: Path of the written collapsed-stack file, if any.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.last_output
+
+    def status(self) -> Dict:
+        """Current session state and the last output file."""
+        return {"active": self.active, "samples": self._samples,
+                "remaining_requests": self._remaining_requests, "last_output": self.last_output}
+
+    def install_signal_handler(self, signum: int = getattr(signal, "SIGUSR2", None),
+                               seconds: float = 30.0) -> bool:
+        """
+        Start a session of `seconds` when the process receives `signum` (SIGUSR2 by default).
+
+        The handler only writes a byte to a pipe; a helper thread reads it and calls start().
+        Signal handlers run on the main thread between bytecodes, possibly while it holds
+        the profiler lock, so taking that lock in the handler could deadlock.
+
+        :return: False when signals are unavailable (e.g. not on the main thread or on Windows).
+        """
+        if signum is None:
+            return False
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(write_fd, False)
+        try:
+            signal.signal(signum, lambda *_: _notify(write_fd))
+        except ValueError:
+            os.close(read_fd)
+            os.close(write_fd)
+            return False
+        threading.Thread(target=self._watch_signal, args=(read_fd, seconds),
+                         name="profiler-signal", daemon=True).start()
+        return True
+
+    def _watch_signal(self, read_fd: int, seconds: float):
+        while os.read(read_fd, 64):
+            self.start(seconds)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            if time.monotonic() >= self._deadline:
+                break
+            for thread_id, frame in sys._current_frames().items():  # pylint: disable=protected-access
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack.append(f"thread:{names.get(thread_id, thread_id)}")
+                self._stacks[";".join(reversed(stack))] += 1
+            self._samples += 1
+        self.last_output = self._write()
+        self._remaining_requests = None
+
+    def _write(self) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.output_dir, f"profile-{stamp}-{os.getpid()}.collapsed")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self._stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"[Profiler] Wrote {self._samples} samples to {path}")
+        return path
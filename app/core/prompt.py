@@ -0,0 +1,93 @@
+"""
+Prompt
+------
+Immutable, pre-processed view of one moderation request, created once per request and shared
+by every pipeline stage. It carries the raw and lowercased input, its tokens, the derived goal
+and context, and lazily computed artifacts (the adversarial normalization forms and model
+feature vectors), so stages stop re-lowercasing and re-splitting the same strings.
+
+Stages accept either a plain string or a Prompt; text_of / lower_of / goal_of cover both.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+
+class Prompt:
+    """
+    A user input with its derived forms. Attributes cannot be reassigned.
+    """
+
+    __slots__ = ("text", "lower", "tokens", "token_set", "goal", "goal_lower", "context",
+                 "_features")
+
+    def __init__(self, text: str, goal: Optional[str] = None,
+                 context: Optional[Dict[str, Any]] = None):
+        """
+        :param text: Raw user input.
+        :param goal: Parsed goal; defaults to the input itself.
+        :param context: Request context (user, environment, ...). Shared, treat as read-only.
+        """
+        lower = text.lower()
+        tokens = tuple(lower.split())
+        self._init(text, lower, tokens, goal, context)
+
+    def _init(self, text: str, lower: str, tokens: Tuple[str, ...], goal: Optional[str],
+              context: Optional[Dict[str, Any]]):
+        setattr_ = object.__setattr__
+        setattr_(self, "text", text)
+        setattr_(self, "lower", lower)
+        setattr_(self, "tokens", tokens)
+        setattr_(self, "token_set", frozenset(tokens))
+        setattr_(self, "goal", text if goal is None else goal)
+        setattr_(self, "goal_lower", lower if goal is None else goal.lower())
+        setattr_(self, "context", {} if context is None else context)
+        setattr_(self, "_features", {})
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Prompt is immutable; cannot set {name!r}")
+
+    def __repr__(self) -> str:
+        return f"Prompt({self.text!r})"
+
+    def with_context(self, goal: str, context: Dict[str, Any]) -> "Prompt":
+        """A copy bound to a goal and context, reusing the already computed text forms."""
+        prompt = object.__new__(Prompt)
+        prompt._init(self.text, self.lower, self.tokens, goal, context)  # pylint: disable=protected-access
+        return prompt
+
+    def features(self, key: Any, compute: Callable[[str], Any]) -> Any:
+        """
+        Feature vector of the input for one extractor, computed on first use and then reused.
+
+        :param key: Identifies the extractor (e.g. model name, or the adversarial normalizer),
+                    so vectors of different models do not mix.
+        :param compute: Maps the raw text to its feature vector.
+        """
+        features = self._features
+        if key not in features:
+            features[key] = compute(self.text)
+        return features[key]
+
+    def cached_features(self, key: Any) -> Optional[Any]:
+        """The feature vector for `key` if it was already computed, else None."""
+        return self._features.get(key)
+
+
+TextLike = Union[str, Prompt]
+
+
+def text_of(value: TextLike) -> str:
+    """Raw text of a string or Prompt."""
+    return value.text if isinstance(value, Prompt) else value
+
+
+def lower_of(value: TextLike) -> str:
+    """Lowercased text of a string or Prompt."""
+    return value.lower if isinstance(value, Prompt) else value.lower()
+
+
+def goal_of(value: TextLike) -> Tuple[str, str]:
+    """(goal, lowercased goal) of a Prompt, or of a string taken as the goal itself."""
+    if isinstance(value, Prompt):
+        return value.goal, value.goal_lower
+    return value, value.lower()
+
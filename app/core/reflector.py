@@ -4,7 +4,9 @@ EthicalReflector
 Simulates internal ethical reasoning by evaluating prompts against hardcoded ethical values.
 Acts as a conceptual stand-in for future embedding- or model-based ethical judgment.
 """
-from typing import Tuple, Dict
+from typing import Tuple, Dict, List
+
+from app.core.prompt import TextLike, lower_of
 
 
 class EthicalReflector:
@@ -13,10 +15,12 @@ class EthicalReflector:
     based on internalized ethical principles.
     """
 
+    accepts_prompt = True  # judge() takes a shared Prompt as well as a string
+
     def __init__(self):
         self.violations = ["harm", "manipulate", "deceive", "override"]
 
-    def judge(self, prompt: str, context: Dict) -> Tuple[bool, str]:  # pylint: disable=unused-argument
+    def judge(self, prompt: TextLike, context: Dict) -> Tuple[bool, str]:  # pylint: disable=unused-argument
         """
         Evaluate whether a prompt conforms to internalized ethics.
 
@@ -24,9 +28,19 @@ class EthicalReflector:
         :param context: Optional environmental/user metadata.
         :return: (permissible, explanation)
         """
-        lower = prompt.lower()
+        lower = lower_of(prompt)
         for word in self.violations:
             if word in lower:
                 return False, f"Internal ethics reject use of '{word}'."
 
         return True, "Prompt aligns with internal ethical guidance."
+
+    def judge_batch(self, prompts: List[TextLike], contexts: List[Dict]) -> List[Tuple[bool, str]]:
+        """
+        Evaluate several prompts; equivalent to calling judge() on each.
+
+        :param prompts: User-submitted prompts.
+        :param contexts: Metadata for each prompt.
+        :return: List of (permissible, explanation) tuples.
+        """
+        return [self.judge(prompt, context) for prompt, context in zip(prompts, contexts)]
@@ -0,0 +1,118 @@
+"""
+RetrainingWorker
+----------------
+Moves TrainableEthicalReflector retraining off the request path. Feedback labels are queued,
+a background thread drains them, fits a new pipeline (in a separate process by default so the
+fit does not hold the GIL) and publishes it to the reflector with an atomic reference swap.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import queue
+import threading
+
+from app.core.trainable_reflector import MIN_TRAINING_EXAMPLES, fit_pipeline
+
+
+class RetrainingWorker:
+    """
+    Background worker that applies queued feedback to a TrainableEthicalReflector.
+    Labels submitted while a fit is running are coalesced into the next fit.
+    """
+
+    def __init__(self, reflector, use_process: bool = True):
+        """
+        :param reflector: The TrainableEthicalReflector to retrain and publish to.
+        :param use_process: Fit in a child process instead of the worker thread.
+        """
+        self.reflector = reflector
+        self.use_process = use_process
+        self._executor = None
+        self._queue = queue.Queue()
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name="reflector-retrainer", daemon=True)
+        self._thread.start()
+
+    def submit(self, prompt: str, label: str):
+        """
+        Queue a labeled example for the next retraining round and return immediately.
+
+        :param prompt: The text input.
+        :param label: "safe" or "unsafe"
+        """
+        with self._idle:
+            self._pending += 1
+        self._queue.put((prompt, label))
+
+    def wait_until_idle(self, timeout: float = None) -> bool:
+        """
+        Block until every submitted label has been applied.
+
+        :param timeout: Maximum seconds to wait.
+        :return: True if the worker is idle, False on timeout.
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def shutdown(self):
+        """Stop the worker thread and its fitting process."""
+        self._queue.put(None)
+        self._thread.join()
+        if self._executor:
+            self._executor.shutdown()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            try:
+                self._apply(batch)
+            except Exception as e:  # pylint: disable=broad-except
+                print("[Retrainer] Retraining failed:", e)
+            with self._idle:
+                self._pending -= len(batch)
+                self._idle.notify_all()
+            if stop:
+                return
+
+    def _apply(self, batch):
+        """Apply one drained batch of labels to the reflector."""
+        reflector = self.reflector
+        if reflector.online:
+            reflector.learn_batch([prompt for prompt, _ in batch], [label for _, label in batch])
+            return
+
+        for prompt, label in batch:
+            reflector.examples.append(prompt)
+            reflector.labels.append(label)
+        examples, labels = reflector.training_data()
+        if len(examples) < MIN_TRAINING_EXAMPLES:
+            return
+
+        if self.use_process:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+            model, label_encoder = self._executor.submit(
+                fit_pipeline, examples, labels).result()
+        else:
+            model, label_encoder = fit_pipeline(examples, labels)
+        reflector.publish(model, label_encoder)
+        reflector.updates_since_refit = 0
+        reflector.trained = True
+        print(f"[Retrainer] Published model version {reflector.version} "
+              f"trained on {len(examples)} examples.")
@@ -3,9 +3,118 @@ RuleAdaptationEngine
 --------------------
 Scans feedback in ReflectionMemory to identify underperforming ethical rules.
 Flags rules that are frequently associated with negative user feedback.
+Uses the memory's incrementally maintained counters when available, so a review costs
+O(rules) instead of a scan over the whole history.
+
+StreamingRuleStats keeps sliding-window and exponentially decayed negative-feedback counts per
+(rule, environment, role). Combined with RuleAdaptationEngine.start(), suggestions are computed
+on a background timer instead of on every interaction, with memory bounded by the number of
+recently active keys and window buckets rather than by traffic: keys whose decayed count has
+faded out are evicted as part of the window expiry on every update and review.
 """
-from typing import List, Tuple
-from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from collections import Counter, deque
+import math
+import threading
+import time
+
+StatsKey = Tuple[str, str, str]
+
+# Decayed counts below this are forgotten.
+MIN_DECAYED_COUNT = 1e-3
+
+
+class StreamingRuleStats:
+    """
+    Thread-safe streaming counters of negative feedback per (rule, environment, role).
+    """
+
+    def __init__(self, window_seconds: float = 3600.0, bucket_seconds: float = 60.0,
+                 half_life_seconds: float = 1800.0):
+        """
+        :param window_seconds: Length of the sliding window used for windowed counts.
+        :param bucket_seconds: Granularity of the window; events expire one bucket at a time.
+        :param half_life_seconds: Half-life of the exponentially decayed counts.
+        """
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.half_life_seconds = half_life_seconds
+        self._buckets = deque()  # (bucket index, Counter of StatsKey)
+        self._window = Counter()
+        self._decayed: Dict[StatsKey, Tuple[float, float]] = {}  # key -> (value, updated at)
+        self._next_prune = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, rules: Iterable[str], environment: str = None, user_role: str = None,
+               now: float = None):
+        """
+        Count one negative-feedback event against each violated rule.
+
+        :param rules: Descriptions of the violated rules.
+        :param environment: Environment of the interaction.
+        :param user_role: Role of the user.
+        :param now: Event time (seconds since the epoch); defaults to the current time.
+        """
+        now = time.time() if now is None else now
+        bucket = int(now // self.bucket_seconds)
+        with self._lock:
+            self._expire(now)
+            if not self._buckets or self._buckets[-1][0] != bucket:
+                self._buckets.append((bucket, Counter()))
+            counts = self._buckets[-1][1]
+            for rule in rules:
+                key = (rule, environment, user_role)
+                counts[key] += 1
+                self._window[key] += 1
+                self._decayed[key] = (self._decay(key, now) + 1.0, now)
+
+    def window_counts(self, now: float = None) -> Counter:
+        """Negative-feedback events per rule within the sliding window."""
+        with self._lock:
+            self._expire(time.time() if now is None else now)
+            totals = Counter()
+            for (rule, _, _), count in self._window.items():
+                totals[rule] += count
+            return totals
+
+    def decayed_counts(self, by: str = "rule", now: float = None) -> Dict:
+        """
+        Exponentially decayed event counts.
+
+        :param by: "rule" to aggregate per rule, or "key" for per (rule, environment, role).
+        :param now: Evaluation time; defaults to the current time.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            totals: Dict = Counter()
+            for key in list(self._decayed):
+                value = self._decay(key, now)
+                if value < MIN_DECAYED_COUNT:
+                    del self._decayed[key]
+                    continue
+                totals[key[0] if by == "rule" else key] += value
+            return dict(totals)
+
+    def _decay(self, key: StatsKey, now: float) -> float:
+        value, updated = self._decayed.get(key, (0.0, now))
+        return value * math.pow(0.5, max(0.0, now - updated) / self.half_life_seconds)
+
+    def _expire(self, now: float):
+        """
+        Drop buckets that fell out of the window and, at most once per bucket, decayed counts
+        that have faded out. Caller holds the lock.
+        """
+        oldest = int((now - self.window_seconds) // self.bucket_seconds)
+        while self._buckets and self._buckets[0][0] <= oldest:
+            _, counts = self._buckets.popleft()
+            self._window.subtract(counts)
+            for key in counts:
+                if self._window[key] <= 0:
+                    del self._window[key]
+        if now >= self._next_prune:
+            self._next_prune = now + self.bucket_seconds
+            for key in [k for k in self._decayed if self._decay(k, now) < MIN_DECAYED_COUNT]:
+                del self._decayed[key]
 
 
 class RuleAdaptationEngine:
@@ -13,8 +122,16 @@ class RuleAdaptationEngine:
     Analyzes reflection memory to identify ethical rules frequently associated with negative feedback.
     Suggests rules for review based on configurable thresholds.
     """
-    def __init__(self, memory):
+    def __init__(self, memory, stats: Optional[StreamingRuleStats] = None):
+        """
+        :param memory: ReflectionMemory (or any object with a history) to analyze.
+        :param stats: Optional streaming statistics; when set, reviews use its sliding window.
+        """
         self.memory = memory
+        self.stats = stats
+        self.latest_suggestions: List[str] = []
+        self._timer_stop = None
+        self._timer_thread = None
 
     def analyze_feedback(self) -> List[Tuple[str, int]]:
         """
@@ -22,6 +139,13 @@ class RuleAdaptationEngine:
 
         :return: A list of (rule description, violation count) tuples sorted by frequency.
         """
+        if self.stats is not None:
+            return self.stats.window_counts().most_common()
+
+        counts = getattr(self.memory, "negative_rule_counts", None)
+        if counts is not None:
+            return counts.most_common()
+
         rule_counter = Counter()
         for entry in self.memory.history:
             if entry["feedback"] < 0 and "violated_rules" in entry:
@@ -38,3 +162,32 @@ class RuleAdaptationEngine:
         """
         stats = self.analyze_feedback()
         return [rule for rule, count in stats if count >= threshold]
+
+    def start(self, interval_seconds: float = 60.0, threshold: int = 3):
+        """
+        Recompute suggestions on a background timer; results are kept in latest_suggestions.
+
+        :param interval_seconds: Seconds between reviews.
+        :param threshold: Threshold passed to suggest_rule_review.
+        """
+        if self._timer_stop is not None:
+            return
+        self._timer_stop = threading.Event()
+
+        def run(stop: threading.Event):
+            while not stop.wait(interval_seconds):
+                suggested = self.suggest_rule_review(threshold)
+                if suggested and suggested != self.latest_suggestions:
+                    print(f"[RuleAdaptation] Rules suggested for review: {suggested}")
+                self.latest_suggestions = suggested
+
+        self._timer_thread = threading.Thread(target=run, args=(self._timer_stop,),
+                                              name="rule-review", daemon=True)
+        self._timer_thread.start()
+
+    def stop(self):
+        """Stop the background review timer and wait for a review in progress to finish."""
+        if self._timer_stop is not None:
+            self._timer_stop.set()
+            self._timer_thread.join()
+            self._timer_stop = self._timer_thread = None
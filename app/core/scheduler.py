@@ -0,0 +1,169 @@
+"""
+StageScheduler
+--------------
+Cost-aware ordering of the independent verdict stages of the moderation pipeline (adversarial
+check, reflector, moral reasoner, ethics rules). Each stage's mean cost and block rate are
+tracked, and stages run in ascending cost / block-rate order, so cheap checks that often
+reject run before model inference.
+
+Which block explains a decision is governed by the precedence mode:
+- "strict" (default): the block from the stage earliest in the precedence list wins, exactly
+  as in the fixed pipeline. After a block, only higher-precedence stages still run.
+- "first_block": the first stage to block in execution order wins and ends evaluation, which
+  saves the most work at the cost of explanations depending on the learned order.
+
+With an executor, selected stages (the model-backed reflector) are offloaded to a thread pool
+and run concurrently with the inline cheap checks; once a block settles the verdict, offloaded
+stages that can no longer change it are cancelled, or ignored if already running.
+"""
+from typing import Callable, Collection, Dict, List, NamedTuple, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+import threading
+import time
+
+PRECEDENCE_MODES = ("strict", "first_block")
+
+
+class StageOutcome(NamedTuple):
+    """Verdict of one stage: whether it passed, the explanation if it blocked, and the rules involved."""
+    ok: bool
+    detail: str = ""
+    rules: Tuple[str, ...] = ()
+
+
+class StageStats:
+    """Exponentially weighted cost and smoothed block rate of one stage."""
+
+    __slots__ = ("runs", "blocks", "mean_cost")
+
+    def __init__(self):
+        self.runs = 0
+        self.blocks = 0
+        self.mean_cost = 0.0
+
+    @property
+    def block_rate(self) -> float:
+        """Laplace-smoothed probability that the stage blocks."""
+        return (self.blocks + 1) / (self.runs + 2)
+
+
+class StageScheduler:
+    """
+    Orders and runs verdict stages, learning from their observed cost and block rate.
+    """
+
+    def __init__(self, precedence: List[str], mode: str = "strict", warmup_runs: int = 20,
+                 smoothing: float = 0.05):
+        """
+        :param precedence: Stage names, highest explanation precedence first.
+        :param mode: "strict" or "first_block" (see module docstring).
+        :param warmup_runs: Runs per stage before the learned order replaces precedence order.
+        :param smoothing: Weight of each new cost sample in the moving average.
+        """
+        if mode not in PRECEDENCE_MODES:
+            raise ValueError(f"mode must be one of {PRECEDENCE_MODES}, got {mode!r}")
+        self.precedence = list(precedence)
+        self.mode = mode
+        self.warmup_runs = warmup_runs
+        self.smoothing = smoothing
+        self.rank = {name: i for i, name in enumerate(self.precedence)}
+        self.stats: Dict[str, StageStats] = {name: StageStats() for name in self.precedence}
+        self._lock = threading.Lock()
+
+    def order(self, names) -> List[str]:
+        """Execution order for the given stages: precedence order during warmup, then cost / block rate."""
+        names = sorted(names, key=self.rank.__getitem__)
+        if any(self.stats[name].runs < self.warmup_runs for name in names):
+            return names
+        return sorted(names, key=lambda n: self.stats[n].mean_cost / self.stats[n].block_rate)
+
+    def record(self, name: str, seconds: float, blocked: bool):
+        """Update a stage's cost and block statistics."""
+        with self._lock:
+            stats = self.stats[name]
+            if stats.runs == 0:
+                stats.mean_cost = seconds
+            else:
+                stats.mean_cost += self.smoothing * (seconds - stats.mean_cost)
+            stats.runs += 1
+            stats.blocks += blocked
+
+    def settled_without(self, blocked: Optional[str], missing: str) -> bool:
+        """Whether a block at `blocked` is final even though stage `missing` has not run."""
+        if blocked is None:
+            return False
+        return self.mode == "first_block" or self.rank[blocked] < self.rank[missing]
+
+    def run(self, stages: Dict[str, Callable[[], StageOutcome]],
+            known: Optional[Dict[str, StageOutcome]] = None, metrics=None,
+            executor: Optional[Executor] = None,
+            offload: Collection[str] = ()) -> Tuple[Optional[str], Dict[str, StageOutcome]]:
+        """
+        Run stages until the verdict is settled.
+
+        :param stages: Stage name -> zero-argument callable returning a StageOutcome.
+        :param known: Outcomes already computed elsewhere (e.g. a batched reflector call).
+        :param metrics: Optional MetricsRegistry that receives each stage's latency.
+        :param executor: Optional executor for concurrent evaluation of `offload` stages.
+        :param offload: Names of stages to submit to the executor instead of running inline.
+        :return: (name of the stage whose block decides the verdict, or None if all passed;
+                  outcomes of every stage that ran, including known ones).
+        """
+        outcomes = dict(known or {})
+        blocked = self._winner(outcomes)
+        pending = [name for name in stages if name not in outcomes]
+        if blocked is not None:
+            pending = [name for name in pending if self._needed(name, blocked)]
+
+        futures = {}
+        if executor is not None:
+            for name in self.order(n for n in pending if n in offload):
+                futures[executor.submit(self._timed, stages[name])] = name
+
+        for name in self.order(n for n in pending if n not in futures.values()):
+            if not self._needed(name, blocked):
+                continue
+            outcome, elapsed = self._timed(stages[name])
+            blocked = self._settle(name, outcome, elapsed, outcomes, blocked, metrics)
+
+        while futures:
+            for future, name in list(futures.items()):
+                if not self._needed(name, blocked):
+                    future.cancel()  # no-op if already running; its result is ignored
+                    del futures[future]
+            if not futures:
+                break
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = futures.pop(future)
+                if self._needed(name, blocked):
+                    outcome, elapsed = future.result()
+                    blocked = self._settle(name, outcome, elapsed, outcomes, blocked, metrics)
+        return blocked, outcomes
+
+    def _needed(self, name: str, blocked: Optional[str]) -> bool:
+        """Whether stage `name` can still change a verdict currently decided by `blocked`."""
+        if blocked is None:
+            return True
+        return self.mode == "strict" and self.rank[name] < self.rank[blocked]
+
+    @staticmethod
+    def _timed(stage: Callable[[], StageOutcome]) -> Tuple[StageOutcome, float]:
+        start = time.perf_counter()
+        outcome = stage()
+        return outcome, time.perf_counter() - start
+
+    def _settle(self, name: str, outcome: StageOutcome, elapsed: float,
+                outcomes: Dict[str, StageOutcome], blocked: Optional[str], metrics) -> Optional[str]:
+        """Record a finished stage and return the stage that now decides the verdict."""
+        self.record(name, elapsed, not outcome.ok)
+        if metrics is not None:
+            metrics.observe(name, elapsed)
+        outcomes[name] = outcome
+        if not outcome.ok and (blocked is None or self.rank[name] < self.rank[blocked]):
+            return name
+        return blocked
+
+    def _winner(self, outcomes: Dict[str, StageOutcome]) -> Optional[str]:
+        blocked = [name for name, outcome in outcomes.items() if not outcome.ok]
+        return min(blocked, key=self.rank.__getitem__) if blocked else None
@@ -2,10 +2,19 @@
 SemanticEthicalReflector
 ------------------------
 Uses sentence embeddings to judge ethical alignment of prompts by comparing them
-against a set of ideal ethical behavior descriptors.
+against a set of ideal ethical behavior descriptors. Example embeddings are kept in a
+VectorIndex, so learning a new example costs a single encode, and prompt embeddings are
+memoized in an EmbeddingCache and on the request's Prompt, so other stages can reuse them.
 """
 from typing import Tuple, Dict, List
-from sentence_transformers import SentenceTransformer, util
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from app.core.embedding_cache import EmbeddingCache
+from app.core.prompt import Prompt, TextLike
+from app.core.vector_index import VectorIndex
+
+MODEL_NAME = "all-MiniLM-L6-v2"
 
 
 class SemanticEthicalReflector:
@@ -13,9 +22,20 @@ class SemanticEthicalReflector:
     Uses sentence-transformers to detect semantic deviation from ethical norms.
     """
 
-    def __init__(self, threshold: float = 0.6):
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+    accepts_prompt = True  # judge() takes a shared Prompt as well as a string
+
+    def __init__(self, threshold: float = 0.6, index_dtype: str = "float32",
+                 cluster_threshold: int = 20000, embedding_cache: EmbeddingCache = None):
+        """
+        :param threshold: Minimum similarity to any ethical example for a prompt to pass.
+        :param index_dtype: Storage type of example embeddings: "float32", "float16" or "int8".
+        :param cluster_threshold: Example count at which the index switches to clustered search.
+        :param embedding_cache: Cache of prompt embeddings; configured from the environment if omitted.
+        """
+        self.model = SentenceTransformer(MODEL_NAME)
+        self.embedding_cache = embedding_cache or EmbeddingCache.from_env(MODEL_NAME)
         self.threshold = threshold
+        self.version = 0  # bumped whenever a new example is learned
 
         self.ethical_examples = [
             "assist respectfully",
@@ -26,37 +46,72 @@ class SemanticEthicalReflector:
             "support documentation",
             "explain protocols"
         ]
-        self.ideal_vectors = self.model.encode(
-            self.ethical_examples, convert_to_tensor=True)
+        self._known_examples = set(self.ethical_examples)
+        self.index = VectorIndex(dtype=index_dtype, cluster_threshold=cluster_threshold)
+        self.index.add(self.encode_examples(self.ethical_examples))
 
     def encode_examples(self, examples: List[str]):
         """
-        Encode a list of ethical examples into sentence embeddings 
+        Encode a list of texts into normalized sentence embeddings (NumPy array).
+        Cached texts are not re-encoded.
+        """
+        return self.embedding_cache.encode(list(examples), self._encode_uncached)
+
+    def embed(self, prompts: List[TextLike]):
+        """
+        Embeddings of prompts in input order. A Prompt's embedding is computed once and stored
+        on it as its feature vector for this model.
         """
-        return self.model.encode(examples, convert_to_tensor=True)
+        vectors = [p.cached_features(MODEL_NAME) if isinstance(p, Prompt) else None for p in prompts]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            texts = [p.text if isinstance(p, Prompt) else p for p in (prompts[i] for i in missing)]
+            for i, vector in zip(missing, self.encode_examples(texts)):
+                vectors[i] = vector
+                if isinstance(prompts[i], Prompt):
+                    prompts[i].features(MODEL_NAME, lambda _text, known=vector: known)
+        return np.stack(vectors) if vectors else np.empty((0, self.index.dim or 0), dtype=np.float32)
+
+    def _encode_uncached(self, texts: List[str]):
+        return self.model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
     
-    def judge(self, prompt: str, context: Dict) -> Tuple[bool, str]:  # pylint: disable=unused-argument
+    def judge(self, prompt: TextLike, context: Dict) -> Tuple[bool, str]:
         """
         Evaluate whether a prompt semantically aligns with internal ethical expectations.
 
-        :param prompt: The user input string.
+        :param prompt: The user input string or Prompt.
         :param context: Optional metadata (currently unused).
         :return: Tuple (permissible, explanation)
         """
-        query_vec = self.model.encode(prompt, convert_to_tensor=True)
-        similarities = util.cos_sim(query_vec, self.ideal_vectors)
-        max_score = similarities.max().item()
+        return self.judge_batch([prompt], [context])[0]
 
-        if max_score < self.threshold:
-            return False, f"Semantic misalignment (max score={max_score:.2f}) with ethical intent."
+    def judge_batch(self, prompts: List[TextLike], contexts: List[Dict]) -> List[Tuple[bool, str]]:  # pylint: disable=unused-argument
+        """
+        Evaluate several prompts with a single batched encode and similarity computation.
+
+        :param prompts: User input strings or Prompts.
+        :param contexts: Optional metadata for each prompt (currently unused).
+        :return: List of (permissible, explanation) tuples, in input order.
+        """
+        max_scores = self.index.max_scores(self.embed(prompts)).tolist()
 
-        return True, f"Semantic similarity acceptable (max score={max_score:.2f})."
+        verdicts = []
+        for max_score in max_scores:
+            if max_score < self.threshold:
+                verdicts.append(
+                    (False, f"Semantic misalignment (max score={max_score:.2f}) with ethical intent."))
+            else:
+                verdicts.append(
+                    (True, f"Semantic similarity acceptable (max score={max_score:.2f})."))
+        return verdicts
 
     def learn_from_feedback(self, prompt: str, feedback: int):
         """
-        Learn from user feedback by updating the list of ethical examples.
+        Learn from user feedback by appending the prompt's embedding to the example index.
         """
-        if feedback > 0 and prompt not in self.ethical_examples:
+        if feedback > 0 and prompt not in self._known_examples:
+            self.index.add(self.encode_examples([prompt]))
             self.ethical_examples.append(prompt)
-            self.ideal_vectors = self.encode_examples(self.ethical_examples)
-            print(f"[Reflector] Learned new ethical example: {prompt}")
\ No newline at end of file
+            self._known_examples.add(prompt)
+            self.version += 1
+            print(f"[Reflector] Learned new ethical example: {prompt}")
@@ -8,16 +8,58 @@ The central orchestrator that coordinates moderation logic, including:
 - Meta-cognitive checks
 - Execution and explanation
 """
-from typing import Any, Dict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
+import os
+import time
 from app.core.ethics import EthicsEngine
 from app.core.planner import BehaviourPlanner
 from app.core.adaptive_planner import AdaptivePlanner
 from app.core.monitor import MetaMonitor
 from app.core.memory import ReflectionMemory
+from app.core.rule_adaptation import RuleAdaptationEngine, StreamingRuleStats
 from app.core.logger import ModerationLogger
 from app.core.reflector import EthicalReflector
 from app.core.trainable_reflector import TrainableEthicalReflector
+from app.core.label_store import preferred_label_path
 from app.core.moral_reasoner import MoralReasoner
+from app.core.adversarial import AdversarialDetector
+from app.core.batching import ReflectorBatcher
+from app.core.retraining import RetrainingWorker
+from app.core.decision_cache import DecisionCache
+from app.core.metrics import MetricsRegistry
+from app.core.scheduler import StageOutcome, StageScheduler
+from app.core.prompt import Prompt, TextLike
+
+# Independent verdict stages, highest explanation precedence first.
+VERDICT_STAGES = ["adversarial", "reflector", "moral_reasoner", "ethics"]
+
+
+class LogEntry(NamedTuple):
+    """An ethics decision to write to the moderation log (the user input is added on commit)."""
+    goal: str
+    context: Dict[str, Any]
+    permissible: bool
+    explanation: str
+
+
+class Reflection(NamedTuple):
+    """An executed plan to feed back to the planner and reflection memory."""
+    goal: str
+    context: Dict[str, Any]
+    plan: str
+
+
+class Decision(NamedTuple):
+    """
+    Outcome of one pass through the moderation pipeline, plus the side effects to apply
+    each time it is served (so cached decisions still reach the audit log and memory).
+    """
+    response: str
+    log_entry: Optional[LogEntry] = None
+    reflection: Optional[Reflection] = None
 
 
 class AbstractAISystem:
@@ -25,84 +67,339 @@ class AbstractAISystem:
     Main AI agent system coordinating ethics, planning, monitoring, logging, and memory.
     """
 
-    def __init__(self, reflector: EthicalReflector = None, use_adaptive_planner: bool = False):
+    def __init__(self, reflector: EthicalReflector = None, use_adaptive_planner: bool = False,
+                 background_retraining: bool = False, decision_cache: bool = True,
+                 streaming_rule_stats: bool = False, stage_precedence: str = None,
+                 concurrent_stages: bool = None):
+        """
+        :param reflector: Internal ethical reflector; a TrainableEthicalReflector by default.
+        :param use_adaptive_planner: Use the AdaptivePlanner instead of the BehaviourPlanner.
+        :param background_retraining: Apply reflector feedback in a RetrainingWorker.
+        :param decision_cache: Cache decisions for repeated queries (see DecisionCache).
+                               Always bypassed while a non-deterministic planner is active.
+        :param streaming_rule_stats: Track rule feedback in time-windowed, decayed counters and
+                                     review rules on a background timer (RULE_REVIEW_INTERVAL_SECONDS).
+        :param stage_precedence: "strict" (default) keeps the fixed explanation precedence of the
+                                 verdict stages; "first_block" reports whichever stage blocks
+                                 first in the cost-aware order. Defaults to STAGE_PRECEDENCE.
+        :param concurrent_stages: Run the reflector in a thread pool while the cheap verdict
+                                  stages run inline, so latency is the slowest stage rather than
+                                  the sum. Defaults to CONCURRENT_STAGES.
+        """
         self.ethics_engine = EthicsEngine()
         self.planner = AdaptivePlanner() if use_adaptive_planner else BehaviourPlanner()
         self.meta_monitor = MetaMonitor()
-        self.logger = ModerationLogger()
-        self.memory = ReflectionMemory(self.ethics_engine)
+        self.logger = ModerationLogger.from_env()
+        self.rule_stats = StreamingRuleStats() if streaming_rule_stats else None
+        self.memory = ReflectionMemory(self.ethics_engine, rule_stats=self.rule_stats)
+        self.rule_adapter = RuleAdaptationEngine(self.memory, stats=self.rule_stats)
+        if self.rule_stats is not None:
+            self.rule_adapter.start(float(os.getenv("RULE_REVIEW_INTERVAL_SECONDS", "60")))
         self.reflector = reflector or TrainableEthicalReflector(
-            autoload_path="tools/cli/labels.jsonl")
-        self.moral_reasoner = MoralReasoner()
+            autoload_path=preferred_label_path("tools/cli/labels.jsonl"),
+            snapshot_path="tools/cli/reflector_snapshot.joblib")
+        self.moral_reasoner = MoralReasoner.from_env()
+        self.adversarial_detector = AdversarialDetector.from_env()
+        self.batcher = ReflectorBatcher.from_env(self.reflect_batch)
+        self.retrainer = (
+            RetrainingWorker(self.reflector)
+            if background_retraining and isinstance(self.reflector, TrainableEthicalReflector)
+            else None
+        )
+        self.decision_cache = DecisionCache.from_env() if decision_cache else None
+        self.metrics = MetricsRegistry()
+        self.scheduler = StageScheduler(
+            VERDICT_STAGES, mode=stage_precedence or os.getenv("STAGE_PRECEDENCE", "strict"))
+        if concurrent_stages is None:
+            concurrent_stages = os.getenv("CONCURRENT_STAGES", "0").lower() in ("1", "true", "yes")
+        self.stage_executor = (
+            ThreadPoolExecutor(max_workers=int(os.getenv("STAGE_WORKERS", "4")),
+                               thread_name_prefix="verdict-stage")
+            if concurrent_stages else None
+        )
 
-    def detect_adversarial_prompt(self, prompt: str) -> bool:
+    def close(self):
+        """
+        Stop background work: apply queued feedback and stop the RetrainingWorker (and its
+        fitting process), stop the rule-review timer and the stage thread pool, and write
+        pending log entries and cached embeddings. Safe to call more than once.
+        """
+        if self.retrainer is not None:
+            self.retrainer.shutdown()
+            self.retrainer = None
+        self.rule_adapter.stop()
+        if self.stage_executor is not None:
+            self.stage_executor.shutdown(wait=True)
+            self.stage_executor = None
+        if self.logger.sink is not None:
+            self.logger.sink.close()
+        embedding_cache = getattr(self.reflector, "embedding_cache", None)
+        if embedding_cache is not None:
+            embedding_cache.close()
+
+    def detect_adversarial_prompt(self, prompt: TextLike) -> bool:
         """
         Check for known adversarial prompt patterns that attempt to bypass filters.
+        Spacing, homoglyph and leetspeak variants are normalized away (see AdversarialDetector).
 
-        :param prompt: The user input string.
+        :param prompt: The user input string or Prompt.
         :return: True if adversarial features are detected.
         """
-        adversarial_signals = ["ignore previous rules",
-                               "simulate evil mode", "pretend you are unfiltered"]
-        return any(signal in prompt.lower() for signal in adversarial_signals)
+        return self.adversarial_detector.detect(prompt)
 
     def process_input(self, user_input: str, environment: str = "simulated_env", user_role: str = "test_user") -> str:
         """
         Process incoming user input and return an ethical, explainable response.
         """
-        if self.detect_adversarial_prompt(user_input):
-            return self.explain_decision(False, "Adversarial prompt detected.")
+        start = time.perf_counter()
+        key = self.decision_key(user_input, environment, user_role)
+        if key is None:
+            decision = self._decide(self.prepare(user_input, environment, user_role))
+        else:
+            decision = self.decision_cache.get_or_compute(
+                key, lambda: self._decide(self.prepare(user_input, environment, user_role)))
+        response = self._commit(user_input, decision)
+        self.metrics.observe("total", time.perf_counter() - start)
+        return response
+
+    async def aprocess_input(self, user_input: str, environment: str = "simulated_env",
+                             user_role: str = "test_user") -> str:
+        """
+        Asynchronous variant of process_input for concurrent callers.
+
+        The reflector stage goes through the micro-batcher, so prompts arriving together
+        share a single inference call. The remaining stages (planner, meta-monitor, memory,
+        logging, rule reloads) are blocking and run in the default executor, so a slow request
+        does not stall the event loop.
+        """
+        loop = asyncio.get_running_loop()
 
-        goal = self.formulate_goal(user_input)
-        context = self.evaluate_context(user_input, environment, user_role)
+        def prescreen() -> Tuple[Prompt, Optional[Decision], Dict[str, StageOutcome]]:
+            prompt = self.prepare(user_input, environment, user_role)
+            return (prompt,) + self._prescreen(prompt)
 
-        # Step 1: Internal ethical judgment
-        if self.reflector:
-            aligned, reason = self.reflector.judge(user_input, context)
-            if not aligned:
-                return self.explain_decision(False, f"[INTERNAL] {reason}")
+        async def decide() -> Decision:
+            prompt, decision, known = await loop.run_in_executor(None, prescreen)
+            if decision is not None:
+                return decision
+            reflection = None
+            if self.reflector:
+                reflector_start = time.perf_counter()
+                reflection = await self.batcher.judge(self._reflector_input(prompt), prompt.context)
+                elapsed = time.perf_counter() - reflector_start
+                self.metrics.observe("reflector", elapsed)
+                self.scheduler.record("reflector", elapsed, not reflection[0])
+            return await loop.run_in_executor(
+                None, functools.partial(self._decide, prompt, reflection=reflection, known=known))
+
+        start = time.perf_counter()
+        key = self.decision_key(user_input, environment, user_role)
+        if key is None:
+            decision = await decide()
+        else:
+            decision = await self.decision_cache.aget_or_compute(key, decide)
+        response = await loop.run_in_executor(None, self._commit, user_input, decision)
+        self.metrics.observe("total", time.perf_counter() - start)
+        return response
+
+    def process_batch(self, queries: List[Tuple[str, str, str]]) -> List[str]:
+        """
+        Process several (user_input, environment, user_role) queries in one pass.
+
+        Cached decisions and prompts settled by the cheap verdict stages are resolved first; the
+        remaining prompts are judged by the reflector in a single batched call before each
+        continues through the pipeline.
+
+        :param queries: Sequence of (user_input, environment, user_role) tuples.
+        :return: One response string per query, in input order.
+        """
+        decisions: List[Optional[Decision]] = [None] * len(queries)
+        keys = [self.decision_key(*query) for query in queries]
+        pending = []
+        for i, (user_input, environment, user_role) in enumerate(queries):
+            cached = self.decision_cache.get(keys[i]) if keys[i] is not None else None
+            if cached is not None:
+                decisions[i] = cached
+                continue
+            prompt = self.prepare(user_input, environment, user_role)
+            decisions[i], known = self._prescreen(prompt)
+            if decisions[i] is None:
+                pending.append((i, prompt, known))
+
+        start = time.perf_counter()
+        reflections = self.reflect_batch(
+            [self._reflector_input(prompt) for _, prompt, _ in pending],
+            [prompt.context for _, prompt, _ in pending])
+        if pending:
+            elapsed = time.perf_counter() - start
+            self.metrics.observe("reflector_batch", elapsed)
+            for aligned, _ in reflections:
+                self.scheduler.record("reflector", elapsed / len(pending), not aligned)
+        for (i, prompt, known), reflection in zip(pending, reflections):
+            decisions[i] = self._decide(prompt, reflection=reflection, known=known)
+        for i, decision in enumerate(decisions):
+            if keys[i] is not None:
+                self.decision_cache.put(keys[i], decision)
+        return [self._commit(query[0], decision) for query, decision in zip(queries, decisions)]
+
+    def reflect_batch(self, prompts: List[TextLike], contexts: List[Dict[str, Any]]) -> List[Tuple[bool, str]]:
+        """
+        Run the reflector over a batch of prompts, using its vectorized path when available.
+
+        :param prompts: User input strings, or Prompts for reflectors that accept them.
+        :param contexts: Context dictionaries matching each prompt.
+        :return: A list of (aligned, reason) tuples.
+        """
+        if not prompts:
+            return []
+        if not self.reflector:
+            return [(True, "")] * len(prompts)
+        if hasattr(self.reflector, "judge_batch"):
+            return self.reflector.judge_batch(prompts, contexts)
+        return [self.reflector.judge(p, c) for p, c in zip(prompts, contexts)]
+
+    def decision_key(self, user_input: str, environment: str, user_role: str) -> Optional[Tuple]:
+        """
+        Cache key for a query, or None when decisions must not be cached.
+
+        The key holds the exact input (responses echo it) and a version stamp of the rule set,
+        the reflector model and the planner's feedback scores, so any change to those makes
+        earlier entries unreachable. Planners with generate_plan (LLM/adaptive) bypass the cache.
+        """
+        if self.decision_cache is None or hasattr(self.planner, "generate_plan"):
+            return None
+        planner_state = tuple(sorted(getattr(self.planner, "feedback_scores", {}).items()))
+        version = (self.ethics_engine.current_version(), getattr(self.reflector, "version", 0), planner_state)
+        return user_input, environment, user_role, version
+
+    def prepare(self, user_input: str, environment: str, user_role: str) -> Prompt:
+        """Build the request's shared Prompt: input forms, goal and context, computed once."""
+        prompt = Prompt(user_input)
+        return prompt.with_context(self.formulate_goal(user_input),
+                                   self.evaluate_context(prompt, environment, user_role))
+
+    def _reflector_input(self, prompt: Prompt) -> TextLike:
+        """The Prompt itself for reflectors that accept one, otherwise its raw text."""
+        return prompt if getattr(self.reflector, "accepts_prompt", False) else prompt.text
+
+    def _verdict_stages(self, prompt: Prompt, include_reflector: bool = True) -> Dict[str, Any]:
+        """Callables for the independent verdict stages, keyed by stage name."""
+        context = prompt.context
+
+        def moral_reasoner() -> StageOutcome:
+            ok, reason = self.moral_reasoner.judge_action(prompt, context)
+            return StageOutcome(ok, f"[REASONER] {reason}", () if ok else (reason,))
+
+        def ethics() -> StageOutcome:
+            violations = self.ethics_engine.violated_rules(prompt, context)
+            ok, explanation = self.ethics_engine.verdict(violations)
+            return StageOutcome(ok, explanation, tuple(violations))
+
+        def reflector() -> StageOutcome:
+            aligned, reason = self.reflector.judge(self._reflector_input(prompt), context)
+            return StageOutcome(aligned, f"[INTERNAL] {reason}")
+
+        stages = {
+            "adversarial": lambda: StageOutcome(
+                not self.detect_adversarial_prompt(prompt), "Adversarial prompt detected."),
+            "moral_reasoner": moral_reasoner,
+            "ethics": ethics,
+        }
+        if include_reflector and self.reflector:
+            stages["reflector"] = reflector
+        return stages
+
+    def _prescreen(self, prompt: Prompt) -> Tuple[Optional[Decision], Dict[str, StageOutcome]]:
+        """
+        Run the verdict stages that do not need the reflector.
+
+        :return: (final decision if those stages already settle it, otherwise None;
+                  stage outcomes to reuse once the reflector verdict is known).
+        """
+        blocked, outcomes = self.scheduler.run(
+            self._verdict_stages(prompt, include_reflector=False), metrics=self.metrics)
+        if self.reflector and not self.scheduler.settled_without(blocked, "reflector"):
+            return None, outcomes
+        return self._decide(prompt, known=outcomes), outcomes
+
+    def _decide(self, prompt: Prompt, reflection: Optional[Tuple[bool, str]] = None,
+                known: Optional[Dict[str, StageOutcome]] = None) -> Decision:
+        """
+        Run the moderation pipeline. Logging and memory side effects are returned in the
+        Decision rather than applied, see _commit. The verdict stages run in the scheduler's
+        cost-aware order, with the reflector offloaded to self.stage_executor when concurrent
+        stages are enabled; each stage is timed into self.metrics.
+
+        :param prompt: The request's shared Prompt (see prepare).
+        :param reflection: Optional precomputed (aligned, reason) verdict from the reflector,
+                           e.g. produced by a batched call. When omitted the reflector is invoked.
+        :param known: Outcomes of verdict stages that already ran (see _prescreen).
+        """
+        goal, context = prompt.goal, prompt.context
 
-        # Step 1.5: Moral reasoning over interpreted goal
-        moral_ok, moral_reason = self.moral_reasoner.judge_action(
-            goal, context)
-        if not moral_ok:
-            return self.explain_decision(False, f"[REASONER] {moral_reason}")
+        known = dict(known or {})
+        if reflection is not None:
+            aligned, reason = reflection
+            known["reflector"] = StageOutcome(aligned, f"[INTERNAL] {reason}")
+        blocked, outcomes = self.scheduler.run(
+            self._verdict_stages(prompt), known=known, metrics=self.metrics,
+            executor=self.stage_executor, offload=("reflector",))
 
-        # Step 2: External ethical rules
-        permissible, explanation = self.ethics_engine.is_action_permissible(
-            goal, context)
-        self.logger.log_decision(
-            user_input, goal, context, permissible, explanation)
+        # Ethics decisions are logged unless a stage with higher precedence blocked.
+        ethics = outcomes.get("ethics")
+        log_entry = None
+        if ethics is not None and (
+                blocked is None or self.scheduler.rank[blocked] >= self.scheduler.rank["ethics"]):
+            log_entry = LogEntry(goal, context, ethics.ok, ethics.detail)
 
-        if not permissible:
-            return self.explain_decision(False, explanation)
+        if blocked is not None:
+            self.metrics.block(blocked, outcomes[blocked].rules)
+            return Decision(self.explain_decision(False, outcomes[blocked].detail), log_entry)
 
+        timed = self.metrics.timed
         plan = (
-            self.planner.generate_plan(goal, context)[0]
+            timed("planner", self.planner.generate_plan, goal, context)[0]
             if hasattr(self.planner, "generate_plan")
-            else self.planner.create_plan(goal, context)
+            else timed("planner", self.planner.create_plan, goal, context)
         )
 
-        if not self.meta_monitor.verify_plan(plan, goal, context):
-            return self.explain_decision(False, "Plan rejected by meta-monitor.")
+        if not timed("meta_monitor", self.meta_monitor.verify_plan, plan, prompt, context):
+            self.metrics.block("meta_monitor")
+            return Decision(self.explain_decision(False, "Plan rejected by meta-monitor."), log_entry)
 
-        feedback = 0  # Placeholder or simulated input
-        self.planner.update_feedback(goal, feedback)
-        self.memory.reflect_on_interaction(goal, context, plan, feedback)
+        return Decision(self.explain_decision(True, self.execute(plan)), log_entry,
+                        Reflection(goal, context, plan))
 
-        return self.explain_decision(True, self.execute(plan))
+    def _commit(self, user_input: str, decision: Decision) -> str:
+        """Apply a decision's logging, feedback and memory side effects and return its response."""
+        entry = decision.log_entry
+        if entry is not None:
+            self.metrics.timed(
+                "logger", self.logger.log_decision,
+                user_input, entry.goal, dict(entry.context), entry.permissible, entry.explanation)
+        reflection = decision.reflection
+        if reflection is not None:
+            feedback = 0  # Placeholder or simulated input
+            start = time.perf_counter()
+            self.planner.update_feedback(reflection.goal, feedback)
+            self.memory.reflect_on_interaction(
+                reflection.goal, dict(reflection.context), reflection.plan, feedback)
+            self.metrics.observe("memory", time.perf_counter() - start)
+        self.metrics.decision(decision.response.startswith("[APPROVED]"))
+        return decision.response
 
     def formulate_goal(self, user_input: str) -> str:
         """Derive a simplified internal goal representation from raw input."""
         return f"Goal based on: {user_input}"
 
-    def evaluate_context(self, user_input: str, environment: str, user_role: str) -> Dict[str, Any]:
+    def evaluate_context(self, user_input: TextLike, environment: str, user_role: str) -> Dict[str, Any]:
         """Simulate contextual analysis of the user's environment and role."""
         context = {
             "user": user_role,
             "time": "future_time",
             "environment": environment,
-            "input_keywords": user_input.lower().split()
+            "input_keywords": (list(user_input.tokens) if isinstance(user_input, Prompt)
+                               else user_input.lower().split())
         }
         return context
 
@@ -0,0 +1,80 @@
+"""
+KeywordAutomaton
+----------------
+Aho-Corasick multi-pattern matcher shared by the keyword-driven moderation stages. All
+patterns are found in a single pass over the text, so the cost of a scan depends on the text
+length and the number of matches, not on the number of patterns. Matching is plain substring
+matching; callers normalize (e.g. lowercase) patterns and text the same way. Patterns and
+text may also be tuples of tokens, e.g. words, which restricts matches to whole tokens.
+"""
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+from collections import deque
+
+
+class KeywordAutomaton:
+    """
+    Immutable automaton over a fixed set of patterns. Build a new one to change the set.
+    """
+
+    __slots__ = ("patterns", "_goto", "_fail", "_out")
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        """
+        :param patterns: Substrings to search for. Empty and duplicate patterns are ignored.
+        """
+        self.patterns: Tuple[str, ...] = tuple(dict.fromkeys(p for p in patterns if p))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[Tuple[str, ...]] = [()]
+        for pattern in self.patterns:
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = self._goto[node][ch] = len(self._goto)
+                    self._goto.append({})
+                    self._out.append(())
+                node = nxt
+            self._out[node] = (pattern,)
+
+        # Breadth-first: each node's failure link points to the longest proper suffix that is
+        # also a trie path, and its outputs include those of that suffix.
+        self._fail: List[int] = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                if self._out[self._fail[child]]:
+                    self._out[child] += self._out[self._fail[child]]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Yield (end index, pattern) for every occurrence, overlapping ones included."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pattern in out[node]:
+                yield i + 1, pattern
+
+    def find(self, text: str) -> Set[str]:
+        """The distinct patterns that occur in `text`."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
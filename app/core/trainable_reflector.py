@@ -4,51 +4,200 @@ TrainableEthicalReflector
 A learnable classifier model that predicts ethical acceptability of user input.
 Can be trained incrementally using feedback and used as a moderation layer.
 """
-from typing import Dict, Tuple
-from sklearn.linear_model import SGDClassifier
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import LabelEncoder
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+import copy
+import hashlib
+import os
 
+from app.core.prompt import TextLike, text_of
+from app.core.label_store import LABEL_CLASSES, STORE_SUFFIX, ChainedSequence, LabelStore
+
+if TYPE_CHECKING:  # scikit-learn is imported on first training or model load
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import LabelEncoder
+
+MIN_TRAINING_EXAMPLES = 5
+
+
+def build_pipeline(online: bool = False) -> "Pipeline":
+    """
+    Create an untrained text classification pipeline.
+
+    :param online: If True, use a stateless hashing vectorizer so the classifier can be
+                   updated with partial_fit; otherwise use a TF-IDF vocabulary fitted per refit.
+    :return: A scikit-learn Pipeline with a vectorizer step followed by a 'clf' step.
+    """
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.pipeline import Pipeline
+
+    if online:
+        vectorizer = ('hashing', HashingVectorizer(
+            alternate_sign=False, n_features=2 ** 18))
+    else:
+        vectorizer = ('tfidf', TfidfVectorizer())
+    return Pipeline([
+        vectorizer,
+        ('clf', SGDClassifier(loss="log_loss", penalty="l2", max_iter=1000))
+    ])
+
+
+def build_label_encoder(online: bool = False) -> "LabelEncoder":
+    """
+    Create a label encoder; in online mode its classes are fixed to LABEL_CLASSES up front.
+    """
+    from sklearn.preprocessing import LabelEncoder
+
+    label_encoder = LabelEncoder()
+    if online:
+        label_encoder.fit(LABEL_CLASSES)
+    return label_encoder
+
+
+def fit_pipeline(examples: Sequence[str], labels: Sequence[str], online: bool = False) -> Tuple["Pipeline", "LabelEncoder"]:
+    """
+    Train a fresh pipeline and label encoder on the given examples.
+
+    Kept at module level so it can run in a worker process.
+
+    :param examples: Training prompts.
+    :param labels: "safe"/"unsafe" label for each prompt.
+    :param online: Build the hashing-vectorizer pipeline used by online mode.
+    :return: Tuple (fitted pipeline, fitted label encoder).
+    """
+    label_encoder = build_label_encoder(online)
+    if online:
+        valid = [(p, l) for p, l in zip(examples, labels) if l in LABEL_CLASSES]
+        examples = [p for p, _ in valid]
+        y_encoded = label_encoder.transform([l for _, l in valid])
+    else:
+        y_encoded = label_encoder.fit_transform(labels)
+    model = build_pipeline(online)
+    model.fit(examples, y_encoded)
+    return model, label_encoder
+
+
+def corpus_fingerprint(filepath: str, prefix_size: Optional[int] = None) -> Dict:
+    """
+    Fingerprint a label file by content hash, size and row count.
+
+    :param filepath: Label file (JSONL or label store).
+    :param prefix_size: Also hash the first `prefix_size` bytes, so an append-only file can be
+                        recognised as an extension of an earlier fingerprint.
+    :return: Dict with 'sha256', 'size', 'rows' and, if requested, 'prefix_sha256'.
+    """
+    digest = hashlib.sha256()
+    fingerprint = {}
+    size = rows = 0
+    last = b""
+    if prefix_size == 0:
+        fingerprint["prefix_sha256"] = digest.hexdigest()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            if prefix_size and size < prefix_size <= size + len(chunk):
+                cut = prefix_size - size
+                digest.update(chunk[:cut])
+                fingerprint["prefix_sha256"] = digest.hexdigest()
+                digest.update(chunk[cut:])
+            else:
+                digest.update(chunk)
+            rows += chunk.count(b"\n")
+            size += len(chunk)
+            last = chunk[-1:]
+    if last and last != b"\n":
+        rows += 1
+    fingerprint.update({"sha256": digest.hexdigest(), "size": size, "rows": rows})
+    return fingerprint
 
-import joblib
 
 class TrainableEthicalReflector:
     """
     A text classifier that learns to distinguish ethical from unethical prompts.
+
+    In the default batch mode every new label triggers a full refit. In online mode the
+    vectorizer is stateless and the label classes are fixed, so each label is applied with a
+    single SGDClassifier.partial_fit step; `refit_every` optionally schedules a full refit
+    after that many incremental updates.
+
+    The active pipeline and label encoder are held as one tuple and replaced with a single
+    reference assignment (see publish), so judge() always sees a consistent model version
+    and never observes a model that is still being trained.
+
+    With `snapshot_path`, autoloading warm-starts from a saved model whose label-file
+    fingerprint matches instead of refitting (see warm_start).
     """
 
-    def __init__(self, autoload_path: str = None):
-        self.model = Pipeline([
-            ('tfidf', TfidfVectorizer()),
-            ('clf', SGDClassifier(loss="log_loss", penalty="l2", max_iter=1000))
-        ])
-        self.label_encoder = LabelEncoder()
+    accepts_prompt = True  # judge() takes a shared Prompt as well as a string
+
+    def __init__(self, autoload_path: str = None, online: bool = False, refit_every: int = 0,
+                 snapshot_path: str = None):
+        self.online = online
+        self.refit_every = refit_every
+        # The pipeline is built on first training or load, keeping scikit-learn off the import path.
+        self._active = (None, None)
+        self.version = 0
+        self.store = None
         self.examples = []
         self.labels = []
         self.trained = False
+        self.updates_since_refit = 0
 
         if autoload_path:
             try:
-                self.from_jsonl(autoload_path)
+                if snapshot_path:
+                    self.warm_start(autoload_path, snapshot_path)
+                elif autoload_path.endswith(STORE_SUFFIX):
+                    self.from_store(autoload_path)
+                else:
+                    self.from_jsonl(autoload_path)
             except (FileNotFoundError, IOError) as e:
                 print(
                     f"[Reflector] Failed to autoload from {autoload_path}:", e)
 
-    def judge(self, prompt: str, context: Dict) -> Tuple[bool, str]:    # pylint: disable=unused-argument
+    @property
+    def model(self) -> "Pipeline":
+        """The currently published pipeline."""
+        return self._active[0]
+
+    @property
+    def label_encoder(self) -> "LabelEncoder":
+        """The label encoder that belongs to the currently published pipeline."""
+        return self._active[1]
+
+    def publish(self, model: "Pipeline", label_encoder: "LabelEncoder"):
+        """
+        Atomically swap in a new pipeline and label encoder.
+
+        :param model: A fitted pipeline.
+        :param label_encoder: The label encoder used to train it.
+        """
+        self._active = (model, label_encoder)
+        self.version += 1
+
+    def judge(self, prompt: TextLike, context: Dict) -> Tuple[bool, str]:
         """
         Predict whether the input is ethically aligned.
 
-        :param prompt: A user input string.
+        :param prompt: A user input string or Prompt.
         :param context: (Unused) future context info.
         :return: Tuple (is_ethically_acceptable: bool, explanation: str)
         """
+        return self.judge_batch([prompt], [context])[0]
+
+    def judge_batch(self, prompts: List[TextLike], contexts: List[Dict]) -> List[Tuple[bool, str]]:  # pylint: disable=unused-argument
+        """
+        Predict ethical alignment for several prompts with a single model call.
+
+        :param prompts: User input strings or Prompts.
+        :param contexts: (Unused) context info for each prompt.
+        :return: List of (is_ethically_acceptable, explanation) tuples, in input order.
+        """
         if not self.trained:
-            return False, "Model untrained — requires feedback data."
-        X = [prompt]
-        pred = self.model.predict(X)[0]
-        label = self.label_encoder.inverse_transform([pred])[0]
-        return (label == "safe", f"Prediction: {label}")
+            return [(False, "Model untrained — requires feedback data.")] * len(prompts)
+        model, label_encoder = self._active
+        preds = model.predict([text_of(prompt) for prompt in prompts])
+        labels = label_encoder.inverse_transform(preds)
+        return [(label == "safe", f"Prediction: {label}") for label in labels]
 
     def from_jsonl(self, filepath: str):
         """
@@ -56,6 +205,14 @@ class TrainableEthicalReflector:
 
         :param filepath: Path to a file with one JSON object per line, each with 'prompt' and 'label'.
         """
+        self._read_jsonl(filepath)
+        if self.example_count() >= MIN_TRAINING_EXAMPLES:
+            self.refit()
+
+        print(f"[Reflector] Loaded {len(self.examples)} labeled examples.")
+
+    def _read_jsonl(self, filepath: str):
+        """Append the valid examples of a JSONL label file without training."""
         import json
         with open(filepath, 'r', encoding='utf-8') as f:
             for line in f:
@@ -69,21 +226,126 @@ class TrainableEthicalReflector:
                 except json.JSONDecodeError as e:
                     print("[Reflector Load Error]", e)
 
-        if len(self.examples) >= 5:
-            y_encoded = self.label_encoder.fit_transform(self.labels)
-            self.model.fit(self.examples, y_encoded)
+    def from_store(self, filepath: str):
+        """
+        Memory-map a compact label store (see app.core.label_store) and train the model on it.
+        The store's prompts are decoded lazily, so loading does not copy the corpus into lists;
+        examples learned afterwards are kept in `examples`/`labels` and trained on together
+        with the store.
+
+        :param filepath: Path to a label store file.
+        """
+        self.store = LabelStore(filepath)
+        if self.example_count() >= MIN_TRAINING_EXAMPLES:
+            self.refit()
+
+        print(f"[Reflector] Mapped {len(self.store)} labeled examples from {filepath}.")
+
+    def warm_start(self, labels_path: str, snapshot_path: str):
+        """
+        Load labeled examples and reuse a saved model when it was trained on the same corpus.
+
+        The snapshot stores a fingerprint of the label file. If it still matches, the model is
+        loaded memory-mapped (so forked workers share its pages) and no refit happens. If the
+        file has only grown by appended rows and the reflector is in online mode, just the new
+        rows are applied with partial_fit. Anything else triggers a full refit. The snapshot is
+        rewritten whenever the model had to change.
+
+        :param labels_path: JSONL file or label store to train from.
+        :param snapshot_path: Location of the model snapshot.
+        """
+        snapshot = None
+        if os.path.exists(snapshot_path):
+            import joblib
+
+            try:
+                snapshot = joblib.load(snapshot_path, mmap_mode="r")
+            except (OSError, ValueError, EOFError, KeyError) as e:
+                print(f"[Reflector] Ignoring unreadable snapshot {snapshot_path}:", e)
+        saved = None
+        if isinstance(snapshot, dict) and snapshot.get("online") == self.online:
+            saved = snapshot.get("fingerprint")
+
+        fingerprint = corpus_fingerprint(labels_path, prefix_size=saved["size"] if saved else None)
+        if labels_path.endswith(STORE_SUFFIX):
+            self.store = LabelStore(labels_path)
+        else:
+            self._read_jsonl(labels_path)
+
+        if saved and saved["sha256"] == fingerprint["sha256"]:
+            self.publish(snapshot["model"], snapshot["label_encoder"])
+            self.trained = snapshot["trained"]
+            print(f"[Reflector] Warm start from {snapshot_path} "
+                  f"({self.example_count()} labeled examples, no refit).")
+            return
+
+        if (saved and self.online and snapshot["trained"]
+                and saved.get("sha256") == fingerprint.get("prefix_sha256")
+                and not labels_path.endswith(STORE_SUFFIX)):
+            self.publish(snapshot["model"], snapshot["label_encoder"])
             self.trained = True
+            delta = self.examples[saved["examples"]:], self.labels[saved["examples"]:]
+            if delta[0]:
+                self._partial_fit(*delta)  # one copy, one update and one publish for the delta
+            print(f"[Reflector] Warm start from {snapshot_path} with {len(delta[0])} new examples.")
+        elif self.example_count() >= MIN_TRAINING_EXAMPLES:
+            self.refit()
+            print(f"[Reflector] Label corpus changed; refit on {self.example_count()} examples.")
+        else:
+            return
 
-        print(f"[Reflector] Loaded {len(self.examples)} labeled examples.")
+        fingerprint["examples"] = self.example_count()
+        self.save_snapshot(snapshot_path, fingerprint)
+
+    def save_snapshot(self, snapshot_path: str, fingerprint: Dict):
+        """
+        Atomically write the current model with the fingerprint of the corpus it was trained on.
+        The file is written uncompressed so that it can be memory-mapped on load.
+
+        :param snapshot_path: Destination file.
+        :param fingerprint: Result of corpus_fingerprint plus the example count.
+        """
+        import joblib
+
+        model, label_encoder = self._active
+        tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+        joblib.dump({
+            'model': model,
+            'label_encoder': label_encoder,
+            'trained': self.trained,
+            'online': self.online,
+            'fingerprint': fingerprint,
+        }, tmp_path)
+        os.replace(tmp_path, snapshot_path)
+        print(f"[Reflector] Snapshot saved to {snapshot_path}")
+
+    def example_count(self) -> int:
+        """Number of labeled examples, including those in a mapped label store."""
+        return len(self.examples) + (len(self.store) if self.store is not None else 0)
+
+    def training_data(self) -> Tuple[Sequence[str], Sequence[str]]:
+        """
+        Return a snapshot of all training examples and labels, including any mapped label store.
+        """
+        if self.store is None:
+            return list(self.examples), list(self.labels)
+        import numpy as np
+
+        examples = ChainedSequence(self.store.prompts, list(self.examples))
+        labels = np.concatenate([self.store.labels(), np.asarray(self.labels, dtype=str)])
+        return examples, labels
 
     def save_model(self, filepath: str):
         """
         Save the trained model and label encoder to disk.
         """
         if self.trained:
+            import joblib
+
+            model, label_encoder = self._active
             joblib.dump({
-                'model': self.model,
-                'label_encoder': self.label_encoder
+                'model': model,
+                'label_encoder': label_encoder
             }, filepath)
             print(f"[Reflector] Model saved to {filepath}")
 
@@ -91,9 +353,10 @@ class TrainableEthicalReflector:
         """
         Load the model and label encoder from disk.
         """
+        import joblib
+
         data = joblib.load(filepath)
-        self.model = data['model']
-        self.label_encoder = data['label_encoder']
+        self.publish(data['model'], data['label_encoder'])
         self.trained = True
         print(f"[Reflector] Model loaded from {filepath}")
 
@@ -101,12 +364,62 @@ class TrainableEthicalReflector:
         """
         Accept a labeled example. Trigger model training after enough samples.
 
+        In online mode the example is applied incrementally in constant time, with a full
+        refit every `refit_every` updates if configured. Use learn_batch for several labels.
+
         :param prompt: The text input.
         :param label: "safe" or "unsafe"
         """
-        self.examples.append(prompt)
-        self.labels.append(label)
-        if len(self.examples) >= 5:
-            y_encoded = self.label_encoder.fit_transform(self.labels)
-            self.model.fit(self.examples, y_encoded)
+        self.learn_batch([prompt], [label])
+
+    def learn_batch(self, prompts: Sequence[str], labels: Sequence[str]):
+        """
+        Accept several labeled examples at once.
+
+        In batch mode the model is refitted once. In online mode all valid labels are applied
+        with one partial_fit on a single copy of the classifier and published once, so the
+        copy and the update cost are shared by the whole batch.
+
+        :param prompts: The text inputs.
+        :param labels: "safe" or "unsafe" for each prompt.
+        """
+        self.examples.extend(prompts)
+        self.labels.extend(labels)
+
+        if not self.online:
+            if self.example_count() >= MIN_TRAINING_EXAMPLES:
+                self.refit()
+            return
+
+        valid = [(prompt, label) for prompt, label in zip(prompts, labels) if label in LABEL_CLASSES]
+        if valid:
+            self._partial_fit([prompt for prompt, _ in valid], [label for _, label in valid])
+
+        if self.refit_every and self.updates_since_refit >= self.refit_every:
+            self.refit()
+        elif self.example_count() >= MIN_TRAINING_EXAMPLES and self.model is not None:
             self.trained = True
+
+    def _partial_fit(self, prompts: Sequence[str], labels: Sequence[str]):
+        """Apply one online update for a batch of examples to a copy of the model and publish it."""
+        from sklearn.pipeline import Pipeline
+
+        model, label_encoder = self._active
+        if model is None:
+            model, label_encoder = build_pipeline(online=True), build_label_encoder(online=True)
+        # Copy-on-write so concurrent judge() calls keep using the published model.
+        clf = copy.deepcopy(model.named_steps['clf'])
+        clf.partial_fit(
+            model.steps[0][1].transform(prompts),
+            label_encoder.transform(labels),
+            classes=label_encoder.transform(LABEL_CLASSES))
+        self.publish(Pipeline([model.steps[0], ('clf', clf)]), label_encoder)
+        self.updates_since_refit += len(prompts)
+
+    def refit(self):
+        """
+        Retrain the model from scratch on every stored example and publish it.
+        """
+        self.publish(*fit_pipeline(*self.training_data(), self.online))
+        self.updates_since_refit = 0
+        self.trained = True
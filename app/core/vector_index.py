@@ -0,0 +1,202 @@
+"""
+VectorIndex
+-----------
+An append-only similarity index for sentence embeddings. Vectors are L2-normalized once on
+insert, so cosine similarity is a plain dot product, and can be stored as float32, float16 or
+int8 (with a per-vector scale). Appends are amortized O(1). Small indexes are scored exactly;
+once the index grows past a threshold it is partitioned into k-means clusters and queries only
+scan the vectors of the closest clusters.
+"""
+from typing import List, Optional, Tuple
+import numpy as np
+
+DTYPES = ("float32", "float16", "int8")
+_CHUNK_ROWS = 8192
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Return float32 row vectors scaled to unit length."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class VectorIndex:
+    """
+    Dot-product top-k index over normalized vectors with optional quantized storage and an
+    approximate clustered search mode for large example sets.
+    """
+
+    def __init__(self, dim: Optional[int] = None, dtype: str = "float32",
+                 cluster_threshold: int = 20000, n_probe: int = 8):
+        """
+        :param dim: Vector dimensionality; inferred from the first add() if omitted.
+        :param dtype: Storage type: "float32", "float16" or "int8".
+        :param cluster_threshold: Switch to clustered (approximate) search at this many vectors.
+                                  Use 0 to always search exactly.
+        :param n_probe: Number of closest clusters scanned per query in clustered mode.
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {DTYPES}, got {dtype!r}")
+        self.dim = dim
+        self.dtype = dtype
+        self.cluster_threshold = cluster_threshold
+        self.n_probe = n_probe
+        self._size = 0
+        self._data = None
+        self._scales = np.empty(0, dtype=np.float32)
+        self._centroids = None
+        self._clusters: List[List[int]] = []
+        self._clustered_at = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def clustered(self) -> bool:
+        """Whether searches currently use the approximate clustered mode."""
+        return self._centroids is not None
+
+    def add(self, vectors: np.ndarray):
+        """
+        Normalize and append one or more vectors.
+
+        :param vectors: Array of shape (n, dim) or (dim,).
+        """
+        vectors = normalize(vectors)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dimension {self.dim}, got {vectors.shape[1]}")
+        self._reserve(self._size + len(vectors))
+
+        start = self._size
+        rows = slice(start, start + len(vectors))
+        if self.dtype == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self._data[rows] = np.round(vectors / scales[:, None]).astype(np.int8)
+            self._scales[rows] = scales
+        else:
+            self._data[rows] = vectors.astype(self.dtype)
+        self._size += len(vectors)
+
+        if self.clustered:
+            if self._size >= 2 * self._clustered_at:
+                self._build_clusters()
+            else:
+                assignments = np.argmax(vectors @ self._centroids.T, axis=1)
+                for offset, cluster in enumerate(assignments):
+                    self._clusters[cluster].append(start + offset)
+        elif self.cluster_threshold and self._size >= self.cluster_threshold:
+            self._build_clusters()
+
+    def search(self, queries: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k most similar stored vectors for each query.
+
+        :param queries: Array of shape (n, dim) or (dim,).
+        :param k: Number of neighbours to return.
+        :return: (scores, ids), each of shape (n, min(k, len(index))), best first.
+        """
+        queries = normalize(queries)
+        k = min(k, self._size)
+        if k == 0:
+            empty = np.empty((len(queries), 0))
+            return empty.astype(np.float32), empty.astype(np.int64)
+        if not self.clustered:
+            return self._top_k(self._score(queries, np.arange(self._size)), np.arange(self._size), k)
+
+        n_probe = min(self.n_probe, len(self._centroids))
+        probes = np.argpartition(-(queries @ self._centroids.T), n_probe - 1, axis=1)[:, :n_probe]
+        all_scores, all_ids = [], []
+        for query, clusters in zip(queries, probes):
+            ids = np.fromiter(
+                (i for c in clusters for i in self._clusters[c]), dtype=np.int64)
+            if len(ids) < k:
+                ids = np.arange(self._size)
+            scores, top_ids = self._top_k(self._score(query[None, :], ids), ids, k)
+            all_scores.append(scores[0])
+            all_ids.append(top_ids[0])
+        return np.stack(all_scores), np.stack(all_ids)
+
+    def max_scores(self, queries: np.ndarray) -> np.ndarray:
+        """Best similarity per query, or -1.0 for every query when the index is empty."""
+        scores, _ = self.search(queries, k=1)
+        if scores.shape[1] == 0:
+            return np.full(len(scores), -1.0, dtype=np.float32)
+        return scores[:, 0]
+
+    def _reserve(self, size: int):
+        """Grow storage geometrically so appends stay amortized O(1)."""
+        capacity = 0 if self._data is None else len(self._data)
+        if size <= capacity:
+            return
+        new_capacity = max(size, 2 * capacity, 16)
+        data = np.zeros((new_capacity, self.dim), dtype=self.dtype)
+        scales = np.ones(new_capacity, dtype=np.float32)
+        if self._data is not None:
+            data[:self._size] = self._data[:self._size]
+            scales[:self._size] = self._scales[:self._size]
+        self._data, self._scales = data, scales
+
+    def _score(self, queries: np.ndarray, ids: np.ndarray) -> np.ndarray:
+        """Dot products between queries and the stored vectors `ids`, in float32 chunks."""
+        out = np.empty((len(queries), len(ids)), dtype=np.float32)
+        for start in range(0, len(ids), _CHUNK_ROWS):
+            chunk = ids[start:start + _CHUNK_ROWS]
+            block = self._data[chunk].astype(np.float32, copy=False)
+            scores = queries @ block.T
+            if self.dtype == "int8":
+                scores *= self._scales[chunk]
+            out[:, start:start + len(chunk)] = scores
+        return out
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, ids: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if k < scores.shape[1]:
+            part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            part = np.tile(np.arange(scores.shape[1]), (len(scores), 1))
+        part_scores = np.take_along_axis(scores, part, axis=1)
+        order = np.argsort(-part_scores, axis=1)
+        best = np.take_along_axis(part, order, axis=1)
+        return np.take_along_axis(scores, best, axis=1), ids[best]
+
+    def _build_clusters(self, iterations: int = 5, seed: int = 0):
+        """Partition the stored vectors with spherical k-means."""
+        n_clusters = max(1, int(np.sqrt(self._size)))
+        rng = np.random.default_rng(seed)
+        ids = np.arange(self._size)
+        centroids = self._vectors(rng.choice(ids, n_clusters, replace=False))
+        for _ in range(iterations):
+            assignments = self._assign(ids, centroids)
+            sums = np.zeros_like(centroids)
+            for start in range(0, self._size, _CHUNK_ROWS):
+                chunk = ids[start:start + _CHUNK_ROWS]
+                np.add.at(sums, assignments[chunk], self._vectors(chunk))
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = normalize(sums)
+
+        assignments = self._assign(ids, centroids)
+        self._centroids = centroids
+        self._clusters = [[] for _ in range(n_clusters)]
+        for i, cluster in enumerate(assignments):
+            self._clusters[cluster].append(i)
+        self._clustered_at = self._size
+
+    def _vectors(self, ids: np.ndarray) -> np.ndarray:
+        vectors = self._data[ids].astype(np.float32)
+        if self.dtype == "int8":
+            vectors *= self._scales[ids, None]
+        return vectors
+
+    def _assign(self, ids: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        assignments = np.empty(len(ids), dtype=np.int64)
+        for start in range(0, len(ids), _CHUNK_ROWS):
+            chunk = ids[start:start + _CHUNK_ROWS]
+            assignments[start:start + len(chunk)] = np.argmax(
+                self._vectors(chunk) @ centroids.T, axis=1)
+        return assignments
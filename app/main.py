@@ -4,14 +4,36 @@ Main Entrypoint
 Launches the FastAPI application and optionally runs a simulated agent test 
 suite if executed as a script.
 """
+from contextlib import asynccontextmanager
+import os
 from fastapi import FastAPI
 from app.api.routes import moderate_route
 from app.agent import SimulatedAIAgent
 from app.core.system import AbstractAISystem
 from app.core.reflector import EthicalReflector
+from app.core.label_log import LabelLog
+from app.core.profiler import SamplingProfiler
 
-app = FastAPI()
-app.state.ai = AbstractAISystem()
+
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    """
+    Build the moderation system at startup rather than at import, so importing the app stays
+    cheap: training or warm-starting the reflector loads scikit-learn and the label corpus.
+    On shutdown, queued labels and log entries are written and background workers stopped.
+    """
+    application.state.label_log = LabelLog("tools/cli/labels.jsonl")
+    application.state.ai = AbstractAISystem(background_retraining=True, streaming_rule_stats=True)
+    try:
+        yield
+    finally:
+        application.state.ai.close()
+        application.state.label_log.close()
+
+
+app = FastAPI(lifespan=lifespan)
+app.state.profiler = SamplingProfiler(os.getenv("PROFILE_OUTPUT_DIR", "profiles"))
+app.state.profiler.install_signal_handler()
 """
 FastAPI application instance that exposes moderation routes.
 """
@@ -2,8 +2,10 @@
 """
 Tests for RuleAdaptationEngine and feedback-driven learning in SemanticEthicalReflector.
 """
+import time
 import unittest
-from app.core.rule_adaptation import RuleAdaptationEngine
+from app.core.memory import ReflectionMemory
+from app.core.rule_adaptation import RuleAdaptationEngine, StreamingRuleStats
 from app.core.semantic_reflector import SemanticEthicalReflector
 
 class FakeMemory:
@@ -21,6 +23,51 @@ class TestRuleAdaptation(unittest.TestCase):
         rules = adapter.suggest_rule_review(threshold=2)
         self.assertIn("Do not cause harm", rules)
 
+class TestStreamingRuleStats(unittest.TestCase):
+    def test_window_expires_old_events(self):
+        stats = StreamingRuleStats(window_seconds=60, bucket_seconds=10)
+        stats.record(["Do not deceive"], "lab", "guest", now=1000)
+        stats.record(["Do not deceive", "Do not cause harm"], "prod", "admin", now=1030)
+        self.assertEqual(stats.window_counts(now=1040), {"Do not deceive": 2, "Do not cause harm": 1})
+        self.assertEqual(stats.window_counts(now=1075), {"Do not deceive": 1, "Do not cause harm": 1})
+        self.assertEqual(stats.window_counts(now=1200), {})
+
+    def test_counts_decay_by_half_life(self):
+        stats = StreamingRuleStats(half_life_seconds=100)
+        stats.record(["Do not deceive"], "lab", "guest", now=0)
+        stats.record(["Do not deceive"], "lab", "admin", now=100)
+        self.assertAlmostEqual(stats.decayed_counts(now=100)["Do not deceive"], 1.5)
+        by_key = stats.decayed_counts(by="key", now=200)
+        self.assertAlmostEqual(by_key[("Do not deceive", "lab", "guest")], 0.25)
+        self.assertAlmostEqual(by_key[("Do not deceive", "lab", "admin")], 0.5)
+
+    def test_faded_keys_are_evicted_without_reading_decayed_counts(self):
+        stats = StreamingRuleStats(window_seconds=60, bucket_seconds=10, half_life_seconds=100)
+        for i in range(50):
+            stats.record(["Do not deceive"], f"env-{i}", "guest", now=0)
+        self.assertEqual(len(stats._decayed), 50)
+        stats.record(["Do not deceive"], "lab", "guest", now=2000)
+        self.assertEqual(list(stats._decayed), [("Do not deceive", "lab", "guest")])
+
+        stats.window_counts(now=4000)  # the review timer's path
+        self.assertEqual(stats._decayed, {})
+
+    def test_background_review_uses_streaming_counts(self):
+        stats = StreamingRuleStats()
+        memory = ReflectionMemory(None, rule_stats=stats)
+        blocked = {"permissible": False, "violated_rules": ["Do not deceive"], "environment": "lab"}
+        for _ in range(3):
+            memory.reflect_on_interaction("deceive", blocked, "Refuse", -1)
+
+        adapter = RuleAdaptationEngine(memory, stats=stats)
+        adapter.start(interval_seconds=0.01)
+        deadline = time.time() + 2
+        while not adapter.latest_suggestions and time.time() < deadline:
+            time.sleep(0.01)
+        adapter.stop()
+        self.assertEqual(adapter.latest_suggestions, ["Do not deceive"])
+
+
 class TestSemanticLearning(unittest.TestCase):
     def test_learns_from_positive_feedback(self):
         reflector = SemanticEthicalReflector()
@@ -0,0 +1,125 @@
+"""
+Unit tests for ReflectorBatcher micro-batching
+"""
+import asyncio
+import time
+import unittest
+from app.core.batching import ReflectorBatcher
+from app.core.system import AbstractAISystem
+
+
+class RecordingJudge:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, prompts, _contexts):
+        self.calls.append(list(prompts))
+        return [("harm" not in p, f"Verdict for {p}") for p in prompts]
+
+
+class DummyBatchReflector:
+    def judge_batch(self, prompts, _contexts):
+        return [(True, "ok")] * len(prompts)
+
+
+class TestReflectorBatcher(unittest.TestCase):
+    def test_concurrent_requests_share_one_batch(self):
+        judge = RecordingJudge()
+        batcher = ReflectorBatcher(judge, max_batch_size=32, window_ms=20)
+
+        async def run():
+            return await asyncio.gather(*(batcher.judge(f"prompt {i}", {}) for i in range(10)))
+
+        verdicts = asyncio.run(run())
+        self.assertEqual(len(judge.calls), 1)
+        self.assertEqual(len(judge.calls[0]), 10)
+        self.assertEqual(verdicts[3], (True, "Verdict for prompt 3"))
+
+    def test_max_batch_size_splits_batches(self):
+        judge = RecordingJudge()
+        batcher = ReflectorBatcher(judge, max_batch_size=4, window_ms=20)
+
+        async def run():
+            return await asyncio.gather(*(batcher.judge(f"prompt {i}", {}) for i in range(10)))
+
+        asyncio.run(run())
+        self.assertEqual(sorted(len(call) for call in judge.calls), [2, 4, 4])
+        self.assertEqual(sorted(batcher.recent_batch_sizes), [2, 4, 4])
+
+    def test_each_caller_gets_own_verdict(self):
+        batcher = ReflectorBatcher(RecordingJudge(), window_ms=5)
+
+        async def run():
+            return await asyncio.gather(batcher.judge("help", {}), batcher.judge("harm", {}))
+
+        (ok_help, _), (ok_harm, reason) = asyncio.run(run())
+        self.assertTrue(ok_help)
+        self.assertFalse(ok_harm)
+        self.assertIn("harm", reason)
+
+    def test_errors_propagate_to_callers(self):
+        def failing(_prompts, _contexts):
+            raise ValueError("model unavailable")
+
+        batcher = ReflectorBatcher(failing, window_ms=1)
+        with self.assertRaises(ValueError):
+            asyncio.run(batcher.judge("help", {}))
+
+    def test_short_verdict_list_fails_every_caller(self):
+        def short(prompts, _contexts):
+            return [(True, "ok")] * (len(prompts) - 1)
+
+        batcher = ReflectorBatcher(short, window_ms=20)
+
+        async def run():
+            return await asyncio.wait_for(asyncio.gather(
+                *(batcher.judge(f"prompt {i}", {}) for i in range(3)), return_exceptions=True), 2)
+
+        results = asyncio.run(run())
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+
+    def test_async_path_keeps_event_loop_responsive(self):
+        ai = AbstractAISystem(reflector=DummyBatchReflector())
+        original = ai._commit  # pylint: disable=protected-access
+
+        def slow_commit(user_input, decision):
+            time.sleep(0.2)
+            return original(user_input, decision)
+
+        ai._commit = slow_commit  # pylint: disable=protected-access
+
+        async def run():
+            task = asyncio.ensure_future(ai.aprocess_input("Assist with research", "lab", "analyst"))
+            start = time.perf_counter()
+            await asyncio.sleep(0.05)
+            ticked = time.perf_counter() - start
+            return ticked, await task
+
+        ticked, result = asyncio.run(run())
+        self.assertLess(ticked, 0.15)
+        self.assertTrue(result.startswith("[APPROVED]"))
+
+    def test_system_async_path_uses_batcher(self):
+        class BatchReflector:
+            def __init__(self):
+                self.calls = 0
+
+            def judge_batch(self, prompts, _contexts):
+                self.calls += 1
+                return [(True, "ok")] * len(prompts)
+
+        reflector = BatchReflector()
+        ai = AbstractAISystem(reflector=reflector)
+
+        async def run():
+            return await asyncio.gather(
+                *(ai.aprocess_input("Assist with research", "lab", "analyst") for _ in range(5)))
+
+        results = asyncio.run(run())
+        self.assertEqual(reflector.calls, 1)
+        self.assertTrue(all(r.startswith("[APPROVED]") for r in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
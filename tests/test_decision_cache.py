@@ -0,0 +1,83 @@
+"""
+Unit tests for the LRU/TTL DecisionCache
+"""
+import asyncio
+import threading
+import time
+import unittest
+from app.core.decision_cache import DecisionCache
+
+
+class TestDecisionCache(unittest.TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = DecisionCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(len(cache), 2)
+
+    def test_entries_expire(self):
+        cache = DecisionCache(ttl_seconds=0.05)
+        cache.put("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        time.sleep(0.1)
+        self.assertIsNone(cache.get("a"))
+
+    def test_concurrent_misses_compute_once(self):
+        cache = DecisionCache()
+        calls = []
+        started = threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return "decision"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+                   for _ in range(5)]
+        threads[0].start()
+        started.wait(1)
+        for t in threads[1:]:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, ["decision"] * 5)
+        self.assertEqual(cache.stats()["coalesced"], 4)
+
+    def test_errors_propagate_and_are_not_cached(self):
+        cache = DecisionCache()
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_compute("k", fail)
+        self.assertEqual(cache.get_or_compute("k", lambda: "ok"), "ok")
+
+    def test_async_requests_are_coalesced(self):
+        cache = DecisionCache()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "decision"
+
+        async def main():
+            return await asyncio.gather(*(cache.aget_or_compute("k", compute) for _ in range(4)))
+
+        self.assertEqual(asyncio.run(main()), ["decision"] * 4)
+        self.assertEqual(calls, [1])
+        self.assertEqual(asyncio.run(cache.aget_or_compute("k", compute)), "decision")
+        self.assertEqual(calls, [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Unit tests for the LRU EmbeddingCache
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+import numpy as np
+from app.core.embedding_cache import EmbeddingCache
+
+
+class CountingEncoder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(t), t.count("a"), 1.0] for t in texts], dtype=np.float32)
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    def test_repeated_prompts_skip_the_encoder(self):
+        cache, encoder = EmbeddingCache("model"), CountingEncoder()
+        first = cache.encode(["assist", "deceive", "assist"], encoder)
+        second = cache.encode(["deceive", "assist", "protect"], encoder)
+
+        self.assertEqual(encoder.calls, [["assist", "deceive"], ["protect"]])
+        np.testing.assert_array_equal(first[0], first[2])
+        np.testing.assert_array_equal(second[1], first[0])
+        self.assertEqual(cache.stats()["misses"], 4)
+        self.assertEqual(cache.stats()["hits"], 2)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache, encoder = EmbeddingCache("model", max_entries=2), CountingEncoder()
+        cache.encode(["a"], encoder)
+        cache.encode(["b"], encoder)
+        cache.encode(["a"], encoder)
+        cache.encode(["c"], encoder)
+        self.assertEqual(len(cache), 2)
+        cache.encode(["b"], encoder)
+        self.assertEqual(encoder.calls[-1], ["b"])
+        cache.encode(["a"], encoder)
+        self.assertEqual(encoder.calls[-1], ["a"])
+
+    def test_keys_depend_on_model_name(self):
+        self.assertNotEqual(EmbeddingCache("m1").key("x"), EmbeddingCache("m2").key("x"))
+
+    def test_disk_tier_survives_restart(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "embeddings.sqlite")
+            cache = EmbeddingCache("model", disk_path=path)
+            expected = cache.encode(["protect privacy"], CountingEncoder())
+            cache.close()
+
+            restarted, encoder = EmbeddingCache("model", disk_path=path), CountingEncoder()
+            np.testing.assert_array_equal(restarted.encode(["protect privacy"], encoder), expected)
+            self.assertEqual(encoder.calls, [])
+            self.assertEqual(restarted.stats()["disk_hits"], 1)
+            restarted.close()
+
+    def test_disk_writes_are_batched_off_the_request_path(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "embeddings.sqlite")
+            cache = EmbeddingCache("model", disk_path=path, write_delay_ms=60000)
+            encoder = CountingEncoder()
+            cache.encode(["assist"], encoder)
+            cache.encode(["deceive", "protect"], encoder)
+
+            def rows():
+                with sqlite3.connect(path) as db:
+                    return db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+            self.assertEqual(rows(), 0)
+            cache.clear()
+            cache.encode(["assist"], encoder)  # served from the write queue
+            self.assertEqual(len(encoder.calls), 2)
+
+            self.assertTrue(cache.flush(timeout=5))
+            self.assertEqual(rows(), 3)
+            self.assertEqual(cache.stats()["disk_writes"], 3)
+            cache.close()
+
+    def test_disk_tier_evicts_oldest_entries_past_its_cap(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "embeddings.sqlite")
+            cache = EmbeddingCache("model", disk_path=path, disk_max_entries=2)
+            for prompt in ("a", "b", "c"):
+                cache.encode([prompt], CountingEncoder())
+                cache.flush(timeout=5)
+            self.assertEqual(cache.stats()["disk_entries"], 2)
+            self.assertEqual(cache.stats()["disk_evictions"], 1)
+            cache.close()
+
+            restarted, encoder = EmbeddingCache("model", disk_path=path), CountingEncoder()
+            restarted.encode(["a", "b", "c"], encoder)
+            self.assertEqual(encoder.calls, [["a"]])
+            restarted.close()
+
+            smaller = EmbeddingCache("model", disk_path=path, disk_max_entries=1)
+            self.assertEqual(smaller.stats()["disk_entries"], 1)
+            smaller.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
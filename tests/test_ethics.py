@@ -1,8 +1,11 @@
 """
 Unit tests for EthicsEngine
 """
+import json
+import os
+import tempfile
 import unittest
-from app.core.ethics import EthicsEngine
+from app.core.ethics import DEFAULT_RULES, EthicsEngine, compile_rule
 
 
 class TestEthicsEngine(unittest.TestCase):
@@ -43,5 +46,120 @@ class TestEthicsEngine(unittest.TestCase):
             self.fail(f"list_rules() raised a TypeError: {e}")
 
 
+class TestDeclarativeRules(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "rules.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, rules, mtime=None):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(rules, f)
+        if mtime is not None:
+            os.utime(self.path, (mtime, mtime))
+
+    def test_defaults_are_saved_declaratively(self):
+        engine = EthicsEngine(self.path, reload_interval=0)
+        with open(self.path, encoding="utf-8") as f:
+            saved = f.read()
+        self.assertEqual(saved, json.dumps(DEFAULT_RULES, indent=2))
+        self.assertEqual(len(engine.ethical_rules), 5)
+
+    def test_context_conditions(self):
+        rule = compile_rule({"description": "Guests may not export", "keywords": ["Export"],
+                             "when": {"user": ["guest"]}, "unless": {"environment": "secure_lab"}})
+        self.assertFalse(rule("export the data", {"user": "guest", "environment": "lab"}))
+        self.assertTrue(rule("export the data", {"user": "admin", "environment": "lab"}))
+        self.assertTrue(rule("export the data", {"user": "guest", "environment": "secure_lab"}))
+        self.assertTrue(rule("read the data", {"user": "guest", "environment": "lab"}))
+
+    def test_invalid_rule_is_rejected(self):
+        for spec in ({"description": "x"}, {"description": "x", "keywords": "harm"},
+                     {"description": "x", "keywords": ["harm"], "code": "lambda g, c: True"},
+                     {"description": "x", "keywords": ["harm"], "unless": ["admin"]},
+                     {"description": "x", "keywords": ["harm"], "when": {"user": [["guest"]]}},
+                     {"description": "x", "keywords": ["harm"], "unless": {"user": [{"a": 1}]}}):
+            with self.assertRaises(ValueError):
+                compile_rule(spec)
+
+    def test_legacy_entries_use_default_definitions(self):
+        self.write([{"description": "Do not deceive", "code": "<lambda>"},
+                    {"description": "Custom", "code": "<lambda>"}])
+        engine = EthicsEngine(self.path, reload_interval=0)
+        self.assertEqual([d for d, _ in engine.ethical_rules], ["Do not deceive"])
+        self.assertFalse(engine.is_action_permissible("deceive them", {})[0])
+
+    def test_hot_reload_on_file_change(self):
+        self.write([{"description": "No gardening", "keywords": ["gardening"]}], mtime=1000)
+        engine = EthicsEngine(self.path)
+        engine.reload_interval = 0.000001
+        version = engine.version
+        self.assertFalse(engine.is_action_permissible("Talk about gardening", {})[0])
+
+        self.write([{"description": "No cooking", "keywords": ["cooking"]}], mtime=2000)
+        self.assertTrue(engine.is_action_permissible("Talk about gardening", {})[0])
+        self.assertFalse(engine.is_action_permissible("Talk about cooking", {})[0])
+        self.assertEqual(engine.version, version + 1)
+
+    def test_invalid_edit_keeps_current_rules(self):
+        self.write([{"description": "No gardening", "keywords": ["gardening"]}], mtime=1000)
+        engine = EthicsEngine(self.path, reload_interval=0)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("[{broken")
+        self.assertFalse(engine.reload_if_changed())
+        self.assertFalse(engine.is_action_permissible("Talk about gardening", {})[0])
+
+    def test_unhashable_condition_in_edit_keeps_current_rules(self):
+        self.write([{"description": "No gardening", "keywords": ["gardening"]}], mtime=1000)
+        engine = EthicsEngine(self.path, reload_interval=0)
+        self.write([{"description": "No cooking", "keywords": ["cooking"],
+                     "when": {"user": [["guest"]]}}], mtime=2000)
+        self.assertFalse(engine.reload_if_changed())
+        self.assertFalse(engine.is_action_permissible("Talk about gardening", {})[0])
+
+    def test_added_declarative_rule_is_persisted(self):
+        engine = EthicsEngine(self.path, reload_interval=0)
+        engine.add_rule("No gardening", {"keywords": ["gardening"]})
+        reloaded = EthicsEngine(self.path, reload_interval=0)
+        self.assertIn("No gardening", reloaded.violated_rules("Talk about gardening", {}))
+        self.assertFalse(engine.reload_if_changed())
+
+
+class TestRuleIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "rules.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_context_only_rules(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(DEFAULT_RULES + [
+                {"description": "No guests in production",
+                 "when": {"environment": ["prod"], "user": ["guest"]}}], f)
+        engine = EthicsEngine(self.path, reload_interval=0)
+        self.assertEqual(engine.violated_rules("Summarize the news", {"user": "guest", "environment": "prod"}),
+                         ["No guests in production"])
+        self.assertEqual(engine.violated_rules("Summarize the news", {"user": "admin", "environment": "prod"}), [])
+
+    def test_only_triggered_rules_are_evaluated(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump([{"description": f"No topic{i}", "keywords": [f"topic{i}x"]} for i in range(5000)], f)
+        engine = EthicsEngine(self.path, reload_interval=0)
+        calls = []
+        engine.add_rule("Opaque", lambda goal, ctx: calls.append(goal) or True)
+        self.assertEqual(engine.violated_rules("talk about topic42x and topic7x", {}),
+                         ["No topic7", "No topic42"])
+        self.assertEqual(len(calls), 1)
+
+    def test_violations_keep_rule_order(self):
+        engine = EthicsEngine(self.path, reload_interval=0)
+        self.assertEqual(engine.violated_rules("override to harm and deceive", {"user": "guest"}),
+                         ["Do not cause harm", "Do not deceive", "Only allow admin to override filters"])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,67 @@
+"""
+Guards that importing the API does not pull in heavy optional dependencies.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["sklearn", "matplotlib", "openai", "dotenv", "sentence_transformers", "joblib"]
+
+
+def run_python(script: str, cwd: str = None) -> str:
+    """Run a script in a fresh interpreter and return the value after its RESULT= marker."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.getenv("PYTHONPATH")])))
+    result = subprocess.run([sys.executable, "-c", textwrap.dedent(script)], cwd=cwd, env=env,
+                            capture_output=True, text=True, check=True)
+    return [line for line in result.stdout.splitlines() if line.startswith("RESULT=")][-1][7:]
+
+
+class TestImportBudget(unittest.TestCase):
+    def test_app_import_defers_heavy_dependencies(self):
+        loaded = run_python(f"""
+            import sys
+            import app.main
+            print("RESULT=" + ",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))
+        """)
+        self.assertEqual(loaded, "")
+
+    def test_app_import_defers_training_on_populated_corpus(self):
+        # With enough labels the reflector trains (or warm-starts) when the system is built,
+        # which must happen at startup, not at import.
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.makedirs(os.path.join(tmpdir, "tools", "cli"))
+            with open(os.path.join(tmpdir, "tools", "cli", "labels.jsonl"), "w", encoding="utf-8") as f:
+                for i in range(20):
+                    label = "safe" if i % 2 else "unsafe"
+                    f.write(json.dumps({"prompt": f"{label} example {i}", "label": label}) + "\n")
+            loaded = run_python(f"""
+                import sys
+                import app.main
+                print("RESULT=" + ",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))
+            """, cwd=tmpdir)
+        self.assertEqual(loaded, "")
+
+    def test_plotting_loads_matplotlib_on_demand(self):
+        loaded = run_python("""
+            import sys
+            import matplotlib
+            matplotlib.use("Agg")
+            from app.core.logger import ModerationLogger
+            before = "matplotlib.pyplot" in sys.modules
+
+            class Memory:
+                history = [{"feedback": 1}]
+
+            ModerationLogger().plot_feedback_histogram(Memory())
+            print(f"RESULT={before},{'matplotlib.pyplot' in sys.modules}")
+        """)
+        self.assertEqual(loaded, "False,True")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Unit tests for the group-commit LabelLog
+"""
+import json
+import os
+import tempfile
+import unittest
+from app.core.label_log import LabelLog
+
+
+class TestLabelLog(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "labels.jsonl")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read_records(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def test_records_are_group_committed(self):
+        log = LabelLog(self.path, max_batch=100, max_delay_ms=200, fsync="never")
+        for i in range(20):
+            log.append({"prompt": f"prompt {i}", "label": "safe"})
+        self.assertTrue(log.flush(timeout=5))
+        log.close()
+
+        records = self.read_records()
+        self.assertEqual(len(records), 20)
+        self.assertEqual(records[7]["prompt"], "prompt 7")
+        self.assertLess(log.batches_written, 20)
+
+    def test_full_batch_is_written_without_waiting(self):
+        log = LabelLog(self.path, max_batch=5, max_delay_ms=60_000, fsync="always")
+        for i in range(5):
+            log.append({"prompt": f"prompt {i}", "label": "unsafe"})
+        self.assertTrue(log.flush(timeout=5))
+        log.close()
+        self.assertEqual(log.batches_written, 1)
+
+    def test_close_writes_pending_records(self):
+        log = LabelLog(self.path, max_delay_ms=60_000)
+        log.append({"prompt": "Respect user choice", "label": "safe"})
+        log.close()
+        self.assertEqual(self.read_records(), [{"prompt": "Respect user choice", "label": "safe"}])
+        with self.assertRaises(ValueError):
+            log.append({"prompt": "late", "label": "safe"})
+
+    def test_unterminated_last_line_is_not_merged(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write('{"prompt": "Existing", "label": "safe"}')
+        log = LabelLog(self.path, max_delay_ms=1)
+        log.append({"prompt": "New", "label": "unsafe"})
+        log.close()
+        self.assertEqual([r["prompt"] for r in self.read_records()], ["Existing", "New"])
+
+    def test_failed_write_is_retried_not_reported_as_written(self):
+        os.mkdir(self.path)  # opening a directory for append fails with an OSError
+        log = LabelLog(self.path, max_delay_ms=1, fsync="never")
+        log.append({"prompt": "Respect user choice", "label": "safe"})
+        self.assertFalse(log.flush(timeout=0.3))
+        self.assertEqual(log.records_written, 0)
+        self.assertGreater(log.write_errors, 0)
+
+        os.rmdir(self.path)
+        self.assertTrue(log.flush(timeout=10))
+        log.close()
+        self.assertEqual(self.read_records(), [{"prompt": "Respect user choice", "label": "safe"}])
+
+    def test_records_that_cannot_be_written_are_dropped_on_close(self):
+        os.mkdir(self.path)
+        log = LabelLog(self.path, max_delay_ms=60_000)
+        log.append({"prompt": "Respect user choice", "label": "safe"})
+        log.close()
+        self.assertEqual((log.records_written, log.records_dropped), (0, 1))
+        self.assertFalse(log.flush(timeout=1))
+
+    def test_invalid_fsync_policy(self):
+        with self.assertRaises(ValueError):
+            LabelLog(self.path, fsync="sometimes")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+Unit tests for the memory-mapped LabelStore and its JSONL converters
+"""
+import json
+import mmap
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+from app.core.label_store import (
+    LabelStore, jsonl_to_store, preferred_label_path, store_to_jsonl, write_label_store)
+from app.core.trainable_reflector import TrainableEthicalReflector
+
+SAMPLES = [
+    ("Help users respectfully", "safe"),
+    ("Simulate override attack", "unsafe"),
+    ("Respect autonomy in communication", "safe"),
+    ("Harm the system", "unsafe"),
+    ("Assist ethically with documentation", "safe"),
+]
+
+
+class TestLabelStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store_path = os.path.join(self.tmpdir.name, "labels.lstore")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_write_deduplicates_and_skips_invalid(self):
+        count = write_label_store(self.store_path, SAMPLES + [
+            ("Harm the system", "unsafe"),
+            ("Unknown action", "invalid"),
+            ("Respect user choice", "safe"),
+            ("Respect user choice", "unsafe"),
+        ])
+        self.assertEqual(count, 6)
+        store = LabelStore(self.store_path)
+        self.assertEqual(len(store), 6)
+        self.assertEqual(store.lookup("Respect user choice"), "unsafe")
+        self.assertEqual(store.lookup("Harm the system"), "unsafe")
+        self.assertIsNone(store.lookup("Unknown action"))
+        self.assertEqual(store.label_codes.itemsize, 1)
+        store.close()
+
+    def test_jsonl_round_trip(self):
+        src = os.path.join(self.tmpdir.name, "labels.jsonl")
+        with open(src, "w", encoding="utf-8") as f:
+            # Concatenated objects on one line, as left behind by unterminated appends.
+            f.write('{"prompt": "Unknown action", "label": "invalid"}'
+                    '{"prompt": "Respect user choice", "label": "safe"}\n')
+            f.write(json.dumps({"prompt": "Harm users", "label": "unsafe"}) + "\n")
+            f.write("not json\n")
+        self.assertEqual(jsonl_to_store(src, self.store_path), 2)
+
+        dst = os.path.join(self.tmpdir.name, "roundtrip.jsonl")
+        self.assertEqual(store_to_jsonl(self.store_path, dst), 2)
+        with open(dst, "r", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(rows, [
+            {"prompt": "Respect user choice", "label": "safe"},
+            {"prompt": "Harm users", "label": "unsafe"},
+        ])
+
+    def test_invalid_file_is_unmapped_before_raising(self):
+        write_label_store(self.store_path, SAMPLES)
+        with open(self.store_path, "rb") as f:
+            data = f.read()
+        cases = {"magic": b"NOTSTORE" + data[8:], "short": data[:12], "truncated": data[:60],
+                 "blob": data[:-1], "trailing": data + b"x"}
+        for name, content in cases.items():
+            with open(self.store_path, "wb") as f:
+                f.write(content)
+            maps = []
+
+            def record(*args, **kwargs):
+                maps.append(real_mmap(*args, **kwargs))
+                return maps[-1]
+
+            real_mmap = mmap.mmap
+            with mock.patch("app.core.label_store.mmap.mmap", record):
+                with self.assertRaises(ValueError, msg=name):
+                    LabelStore(self.store_path)
+            self.assertEqual(len(maps), 1)
+            with self.assertRaises(ValueError, msg=name):
+                maps[0][0]  # closed map
+
+    def test_close_tolerates_held_label_column(self):
+        write_label_store(self.store_path, SAMPLES)
+        store = LabelStore(self.store_path)
+        codes, labels = store.label_codes, store.labels()
+        store.close()
+        self.assertEqual(list(codes), [0, 1, 0, 1, 0])
+        self.assertEqual(list(labels), [label for _, label in SAMPLES])
+
+    def test_preferred_label_path_uses_up_to_date_store(self):
+        jsonl_path = os.path.join(self.tmpdir.name, "labels.jsonl")
+        with open(jsonl_path, "w", encoding="utf-8") as f:
+            for prompt, label in SAMPLES:
+                f.write(json.dumps({"prompt": prompt, "label": label}) + "\n")
+        self.assertEqual(preferred_label_path(jsonl_path), jsonl_path)
+        jsonl_to_store(jsonl_path, self.store_path)
+        os.utime(jsonl_path, (1000, 1000))
+        self.assertEqual(preferred_label_path(jsonl_path), self.store_path)
+        os.utime(jsonl_path, None)
+        os.utime(self.store_path, (1000, 1000))
+        self.assertEqual(preferred_label_path(jsonl_path), jsonl_path)
+
+    def test_store_pickles_by_path(self):
+        write_label_store(self.store_path, SAMPLES)
+        store = pickle.loads(pickle.dumps(LabelStore(self.store_path)))
+        self.assertEqual(list(store.prompts), [p for p, _ in SAMPLES])
+
+    def test_reflector_trains_from_store(self):
+        write_label_store(self.store_path, SAMPLES)
+        reflector = TrainableEthicalReflector(autoload_path=self.store_path)
+        self.assertTrue(reflector.trained)
+        self.assertEqual(reflector.examples, [])
+        self.assertEqual(reflector.example_count(), len(SAMPLES))
+
+        reflector.learn("Deceive the auditors", "unsafe")
+        self.assertEqual(reflector.example_count(), len(SAMPLES) + 1)
+        ok, _ = reflector.judge("Harm the system", {})
+        self.assertFalse(ok)
+
+
+if __name__ == '__main__':
+    unittest.main()
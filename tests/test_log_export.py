@@ -0,0 +1,116 @@
+"""
+Unit tests for streaming moderation log export
+"""
+import csv
+import datetime
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from app.core.log_export import export_parquet, filter_entries, flatten_entry, iter_csv
+from app.core.log_sink import JsonlLogSink
+from app.core.logger import ModerationLogger
+
+
+def entry(timestamp, permissible, environment, user):
+    return {
+        "timestamp": timestamp,
+        "user_input": f"{environment} request",
+        "goal": "Goal based on: request",
+        "context": {"user": user, "environment": environment, "time": "future_time",
+                    "input_keywords": ["assist", "me"]},
+        "permissible": permissible,
+        "explanation": "ok" if permissible else "Do not deceive",
+    }
+
+
+ENTRIES = [
+    entry("2026-10-17T09:00:00", True, "lab", "guest"),
+    entry("2026-10-17T12:00:00", False, "lab", "admin"),
+    entry("2026-10-18T09:00:00", False, "prod", "guest"),
+]
+
+
+class TestLogExport(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_filters(self):
+        day = list(filter_entries(ENTRIES, start="2026-10-17T00:00:00", end="2026-10-18T00:00:00"))
+        self.assertEqual(len(day), 2)
+        blocked = list(filter_entries(ENTRIES, permissible=False, user_role="guest"))
+        self.assertEqual([e["context"]["environment"] for e in blocked], ["prod"])
+
+    def test_aware_and_naive_timestamps_compare(self):
+        local = datetime.datetime(2026, 10, 17, 12, 0).astimezone()
+        start = local.astimezone(datetime.timezone.utc).isoformat().replace("+00:00", "Z")
+        kept = list(filter_entries(ENTRIES, start=start))
+        self.assertEqual([e["timestamp"] for e in kept], ["2026-10-17T12:00:00", "2026-10-18T09:00:00"])
+        self.assertEqual(len(list(filter_entries(ENTRIES, start="2020-01-01T00:00:00+02:00"))), 3)
+
+    def test_invalid_time_raises_before_iteration(self):
+        with self.assertRaises(ValueError):
+            filter_entries(ENTRIES, start="garbage")
+        bad = dict(ENTRIES[0], timestamp="not a time")
+        self.assertEqual(len(list(filter_entries([bad] + ENTRIES, start="2026-10-17T00:00:00"))), 3)
+
+    def test_context_is_flattened_into_columns(self):
+        row = flatten_entry(ENTRIES[0])
+        self.assertEqual(row["context.environment"], "lab")
+        self.assertEqual(row["context.input_keywords"], "assist me")
+        self.assertNotIn("context", row)
+
+        rows = list(csv.DictReader("".join(iter_csv(ENTRIES)).splitlines()))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1]["context.user"], "admin")
+
+    def test_unknown_context_fields_go_to_extra_column(self):
+        tagged = dict(ENTRIES[0], context=dict(ENTRIES[0]["context"], tenant="acme", trace={"id": 7}))
+        row = flatten_entry(tagged)
+        self.assertNotIn("context.tenant", row)
+        self.assertEqual(json.loads(row["context.extra"]), {"tenant": "acme", "trace": {"id": 7}})
+        self.assertNotIn("context.extra", flatten_entry(ENTRIES[0]))
+
+        rows = list(csv.DictReader("".join(iter_csv([tagged])).splitlines()))
+        self.assertEqual(json.loads(rows[0]["context.extra"])["tenant"], "acme")
+        rows = list(csv.DictReader("".join(iter_csv([tagged], columns=["context.tenant"])).splitlines()))
+        self.assertEqual(rows, [{"context.tenant": "acme"}])
+
+    def test_export_flushes_queued_sink_entries(self):
+        sink = JsonlLogSink(self.tmpdir.name, flush_interval=60)
+        self.addCleanup(sink.close)
+        logger = ModerationLogger(sink=sink, tail_size=1)
+        for e in ENTRIES:
+            logger.log_decision(e["user_input"], e["goal"], e["context"], e["permissible"], e["explanation"])
+        path = os.path.join(self.tmpdir.name, "all.csv")
+        self.assertEqual(logger.export(path), 3)
+
+    def test_export_streams_from_sink_files(self):
+        sink = JsonlLogSink(self.tmpdir.name, compress=True)
+        logger = ModerationLogger(sink=sink, tail_size=1)
+        for e in ENTRIES:
+            logger.log_decision(e["user_input"], e["goal"], e["context"], e["permissible"], e["explanation"])
+        sink.close()
+
+        path = os.path.join(self.tmpdir.name, "blocked.csv")
+        self.assertEqual(logger.export(path, permissible=False), 2)
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([r["context.environment"] for r in rows], ["lab", "prod"])
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow not installed")
+    def test_parquet_export_in_row_groups(self):
+        import pyarrow.parquet as pq
+        path = os.path.join(self.tmpdir.name, "log.parquet")
+        self.assertEqual(export_parquet(iter(ENTRIES), path, chunk_size=2), 3)
+        parquet = pq.ParquetFile(path)
+        self.assertEqual(parquet.metadata.num_row_groups, 2)
+        self.assertEqual(parquet.read().column("context.user").to_pylist(), ["guest", "admin", "guest"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Unit tests for the asynchronous JsonlLogSink
+"""
+import datetime
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from app.core.log_sink import JsonlLogSink
+from app.core.logger import ModerationLogger
+
+
+def read_entries(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestJsonlLogSink(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_entries_are_written_and_rotated_by_size(self):
+        sink = JsonlLogSink(self.tmpdir.name, max_bytes=200)
+        for i in range(20):
+            sink.emit({"user_input": f"prompt {i}", "permissible": True})
+        self.assertTrue(sink.flush(timeout=5))
+        sink.close()
+
+        files = sink.files()
+        self.assertGreater(len(files), 1)
+        entries = [entry for path in files for entry in read_entries(path)]
+        self.assertEqual([e["user_input"] for e in entries], [f"prompt {i}" for i in range(20)])
+
+    def test_sinks_sharing_a_directory_keep_each_others_files(self):
+        sinks = [JsonlLogSink(self.tmpdir.name, max_bytes=120) for _ in range(2)]
+        for i in range(30):
+            for n, sink in enumerate(sinks):
+                sink.emit({"user_input": f"sink {n} prompt {i} é"})
+        for sink in sinks:
+            self.assertTrue(sink.flush(timeout=5))
+            sink.close()
+
+        files = sinks[0].files()
+        entries = [entry["user_input"] for path in files for entry in read_entries(path)]
+        self.assertEqual(len(entries), 60)
+        self.assertEqual(len(set(entries)), 60)
+        line = len(json.dumps({"user_input": "sink 0 prompt 29 é"})) + 1
+        self.assertTrue(all(os.path.getsize(path) < 120 + line for path in files))
+
+    def test_rotation_never_truncates_a_file_created_concurrently(self):
+        now = datetime.datetime.now()
+        taken = []
+        for stamp in {now.strftime("%Y%m%d-%H%M%S"),
+                      (now + datetime.timedelta(seconds=1)).strftime("%Y%m%d-%H%M%S")}:
+            path = os.path.join(self.tmpdir.name, f"moderation-{stamp}-0001.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write('{"user_input": "other worker"}\n')
+            taken.append(path)
+        # Another worker creates the file between the existence check and the open.
+        with mock.patch("os.path.exists", return_value=False):
+            sink = JsonlLogSink(self.tmpdir.name)
+            sink.emit({"user_input": "mine"})
+            self.assertTrue(sink.flush(timeout=5))
+            sink.close()
+        for path in taken:
+            self.assertEqual(read_entries(path), [{"user_input": "other worker"}])
+        entries = [e["user_input"] for path in sink.files() for e in read_entries(path)]
+        self.assertIn("mine", entries)
+
+    def test_compressed_output(self):
+        sink = JsonlLogSink(self.tmpdir.name, compress=True)
+        sink.emit({"user_input": "hello", "context": {"user": "guest"}})
+        sink.close()
+        [path] = sink.files()
+        self.assertTrue(path.endswith(".jsonl.gz"))
+        self.assertEqual(read_entries(path)[0]["context"], {"user": "guest"})
+
+    def test_drop_policy_counts_overflow(self):
+        sink = JsonlLogSink(self.tmpdir.name, max_queue=3, flush_interval=60)
+        results = [sink.emit({"n": i}) for i in range(5)]
+        self.assertEqual(results, [True, True, True, False, False])
+        self.assertEqual(sink.dropped, 2)
+        sink.close()
+        self.assertEqual(sink.written, 3)
+
+    def test_failed_write_counts_dropped_entries(self):
+        sink = JsonlLogSink(self.tmpdir.name, flush_interval=60)
+        with mock.patch.object(sink, "_rotate", side_effect=OSError("disk full")):
+            for i in range(3):
+                sink.emit({"n": i})
+            self.assertTrue(sink.flush(timeout=5))
+        self.assertEqual((sink.written, sink.dropped), (0, 3))
+
+        sink.emit({"n": 3})
+        sink.close()
+        self.assertEqual((sink.written, sink.dropped), (1, 3))
+        self.assertEqual(read_entries(sink.files()[0]), [{"n": 3}])
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            JsonlLogSink(self.tmpdir.name, policy="spill")
+
+    def test_logger_keeps_bounded_tail_with_sink(self):
+        sink = JsonlLogSink(self.tmpdir.name)
+        logger = ModerationLogger(sink=sink, tail_size=2)
+        for i in range(4):
+            logger.log_decision(f"input {i}", "goal", {"user": "guest"}, True, "ok")
+        sink.close()
+        self.assertEqual([e["user_input"] for e in logger.log], ["input 2", "input 3"])
+        self.assertEqual(len(read_entries(sink.files()[0])), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,12 +13,12 @@ class TestMainApp(unittest.TestCase):
         self.assertTrue(callable(app.router.include_router))
 
     def test_app_responds_to_request(self):
-        client = TestClient(app)
-        response = client.post("/moderate", json={
-            "input": "Test ethical query",
-            "environment": "lab",
-            "user_role": "guest"
-        })
+        with TestClient(app) as client:  # runs the lifespan that builds app.state.ai
+            response = client.post("/moderate", json={
+                "input": "Test ethical query",
+                "environment": "lab",
+                "user_role": "guest"
+            })
         self.assertEqual(response.status_code, 200)
         self.assertTrue(response.json()["response"].startswith(
             "[APPROVED") or response.json()["response"].startswith("[BLOCKED"))
@@ -33,5 +33,29 @@ class TestReflectionMemory(unittest.TestCase):
         rules = adapter.suggest_rule_review(threshold=1)
         self.assertIn("Do not override", rules)
 
+    def test_history_is_bounded_and_counters_follow_evictions(self):
+        memory = ReflectionMemory(self.ethics, capacity=3)
+        blocked = {"permissible": False, "violated_rules": ["Do not deceive"]}
+        memory.reflect_on_interaction("deceive", blocked, "Refuse", -1)
+        memory.reflect_on_interaction("deceive", blocked, "Refuse", -1)
+        self.assertEqual(memory.negative_rule_counts["Do not deceive"], 2)
+
+        for _ in range(2):
+            memory.reflect_on_interaction("assist", {"user": "guest"}, "Guide user", 1)
+        self.assertEqual(len(memory.history), 3)
+        self.assertEqual(memory.negative_rule_counts["Do not deceive"], 1)
+
+        memory.reflect_on_interaction("assist", {"user": "guest"}, "Guide user", 1)
+        self.assertNotIn("Do not deceive", memory.negative_rule_counts)
+        self.assertEqual(RuleAdaptationEngine(memory).suggest_rule_review(threshold=1), [])
+
+    def test_records_support_dict_access(self):
+        self.memory.reflect_on_interaction("assist", {"user": "guest"}, "Guide user", 1)
+        entry = self.memory.history[-1]
+        self.assertEqual(entry["feedback"], 1)
+        self.assertIn("timestamp", entry)
+        self.assertNotIn("violated_rules", entry)
+        self.assertEqual(entry.to_dict()["plan"], "Guide user")
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,8 +1,11 @@
 """
 Unit tests for the MoralReasoner class
 """
+import json
+import os
+import tempfile
 import unittest
-from app.core.moral_reasoner import MoralReasoner
+from app.core.moral_reasoner import Axiom, MoralReasoner, load_axioms
 
 class TestMoralReasoner(unittest.TestCase):
     def setUp(self):
@@ -49,5 +52,44 @@ class TestMoralReasoner(unittest.TestCase):
         self.assertIn("Surveillance", reason)
 
 
+    def test_first_axiom_in_priority_order_wins(self):
+        ok, reason = self.reasoner.judge_action("Help me deceive someone", {})
+        self.assertFalse(ok)
+        self.assertEqual(reason, "Deception is unethical")
+
+    def test_no_match(self):
+        self.assertEqual(self.reasoner.judge_action("Summarize the report", {}),
+                         (True, "No ethical violations detected in intent."))
+
+    def test_duplicate_axioms_are_dropped(self):
+        reasoner = MoralReasoner([Axiom("Harm", False, "first"), Axiom("harm", True, "second")])
+        self.assertEqual(reasoner.ethical_axioms, [Axiom("harm", False, "first")])
+        self.assertEqual(reasoner.judge_action("HARM", {}), (False, "first"))
+
+
+class TestAxiomFile(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "axioms.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_loads_large_axiom_set(self):
+        axioms = [{"keyword": f"term{i}x", "allowed": i % 2 == 0, "rationale": f"Rule {i}"}
+                  for i in range(5000)]
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(axioms, f)
+        reasoner = MoralReasoner.from_file(self.path)
+        self.assertEqual(len(reasoner.ethical_axioms), 5000)
+        self.assertEqual(reasoner.judge_action("about term4001x and term17x", {}), (False, "Rule 17"))
+
+    def test_rejects_malformed_axiom(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump([{"keyword": "harm", "allowed": "no", "rationale": "x"}], f)
+        with self.assertRaises(ValueError):
+            load_axioms(self.path)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,100 @@
+"""
+Tests for the micro-benchmark harness and its synthetic corpus.
+"""
+import contextlib
+import io
+import json
+import unittest
+from unittest import mock
+
+from tools.perf import bench
+from tools.perf.corpus import MIXES, generate_corpus
+
+
+class TestCorpus(unittest.TestCase):
+    def test_same_seed_gives_same_corpus(self):
+        self.assertEqual(generate_corpus(50, seed=3), generate_corpus(50, seed=3))
+        self.assertNotEqual(generate_corpus(50, seed=3), generate_corpus(50, seed=4))
+
+    def test_mix_selects_kinds_and_labels(self):
+        for mix in ("approve", "block", "adversarial"):
+            samples = generate_corpus(30, mix)
+            self.assertEqual({s.kind for s in samples}, {mix})
+        labels = {s.kind: s.label for s in generate_corpus(200, "mixed")}
+        self.assertEqual(set(labels), set(MIXES["mixed"]))
+        self.assertEqual(labels["approve"], "safe")
+        self.assertEqual(labels["block"], "unsafe")
+
+    def test_long_prompts_are_padded(self):
+        short = generate_corpus(20, "approve", "short")
+        long = generate_corpus(20, "approve", "long")
+        self.assertTrue(all(len(l.prompt) > len(s.prompt) for s, l in zip(short, long)))
+
+    def test_rejects_unknown_mix(self):
+        with self.assertRaises(ValueError):
+            generate_corpus(5, "hostile")
+
+    def test_adversarial_prompts_are_detected(self):
+        from app.core.adversarial import AdversarialDetector
+        detector = AdversarialDetector()
+        samples = generate_corpus(40, "adversarial", "mixed")
+        self.assertTrue(all(detector.detect(s.prompt) for s in samples))
+        self.assertTrue(any(not s.prompt.isascii() for s in samples))
+
+
+class TestBench(unittest.TestCase):
+    def test_measure_reports_stats(self):
+        stats = bench.measure(lambda x: x * 2, list(range(20)), rounds=2)
+        self.assertEqual(stats["ops"], 40)
+        self.assertLessEqual(stats["min_us"], stats["median_us"])
+        self.assertLessEqual(stats["median_us"], stats["p95_us"])
+        self.assertLessEqual(stats["p95_us"], stats["p99_us"])
+        self.assertGreater(stats["ops_per_sec"], 0)
+
+    def test_compare_flags_regressions_above_threshold(self):
+        baseline = {"results": {"a": {"median_us": 10.0}, "b": {"median_us": 10.0},
+                                "c": {"skipped": "unavailable"}}}
+        report = {"results": {"a": {"median_us": 11.0}, "b": {"median_us": 20.0},
+                              "c": {"median_us": 5.0}, "d": {"median_us": 1.0}}}
+        with contextlib.redirect_stdout(io.StringIO()):
+            regressions = bench.compare(report, baseline, threshold=1.25)
+        self.assertEqual([r[0] for r in regressions], ["b"])
+        self.assertAlmostEqual(regressions[0][3], 2.0)
+
+    def test_run_writes_json_report(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = bench.run(size=10, rounds=1, only=["ethics", "moral_reasoner", "adversarial.", "logger"])
+        self.assertEqual(set(report["results"]), {
+            "ethics.violated_rules", "moral_reasoner.judge_action", "adversarial.detect",
+            "logger.log_decision", "logger.log_decision[sink,enqueue]",
+            "logger.log_decision[sink,64,flushed]"})
+        for name, stats in report["results"].items():
+            self.assertEqual(stats["ops"], 1 if name.endswith("flushed]") else 10)
+        self.assertEqual(report["meta"]["size"], 10)
+        self.assertIn("python", report["meta"])
+        json.dumps(report)
+
+    def test_cache_benchmarks_time_only_hits_or_only_misses(self):
+        from app.core.decision_cache import DecisionCache
+        from_env = DecisionCache.from_env.__func__
+        caches = []
+
+        def record(cls):
+            caches.append(from_env(cls))
+            return caches[-1]
+
+        suite = bench.benchmarks(size=10, seed=0, workdir=".", closers=[])
+        with mock.patch.object(DecisionCache, "from_env", classmethod(record)):
+            for name, expect in (("cache_hit", {"hits": 20, "misses": 0}),
+                                 ("cache_miss", {"hits": 0, "misses": 20})):
+                fn, items = suite["pipeline.process_input[mixed,mixed,%s]" % name]()
+                before = caches[-1].stats()
+                for _ in range(2):
+                    for s in items:
+                        fn(s)
+                after = caches[-1].stats()
+                self.assertEqual({k: after[k] - before[k] for k in expect}, expect, name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Unit tests for the on-demand SamplingProfiler
+"""
+import os
+import signal
+import tempfile
+import threading
+import time
+import unittest
+from app.core.profiler import SamplingProfiler
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_time_bounded_session_writes_collapsed_stacks(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_loop, args=(stop,), name="busy")
+        worker.start()
+        profiler = SamplingProfiler(self.tmpdir.name, interval=0.001)
+        self.assertTrue(profiler.start(seconds=0.2))
+        self.assertFalse(profiler.start(seconds=0.2))
+        time.sleep(0.3)
+        path = profiler.stop()
+        stop.set()
+        worker.join()
+
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        busy = [line for line in lines if line.startswith("thread:busy;")]
+        self.assertTrue(busy)
+        self.assertIn("busy_loop (test_profiler.py:", busy[0])
+        self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in lines))
+
+    def test_request_bounded_session(self):
+        profiler = SamplingProfiler(self.tmpdir.name, interval=0.001)
+        profiler.start(seconds=60, requests=2)
+        profiler.request_finished()
+        self.assertTrue(profiler.active)
+        profiler.request_finished()
+        profiler._thread.join(5)  # pylint: disable=protected-access
+        self.assertFalse(profiler.active)
+        self.assertIsNotNone(profiler.status()["last_output"])
+
+
+    @unittest.skipUnless(hasattr(signal, "SIGUSR2"), "SIGUSR2 not available")
+    def test_signal_while_lock_is_held_does_not_deadlock(self):
+        profiler = SamplingProfiler(self.tmpdir.name, interval=0.001)
+        previous = signal.getsignal(signal.SIGUSR2)
+        try:
+            self.assertTrue(profiler.install_signal_handler(seconds=0.05))
+            with profiler._lock:  # pylint: disable=protected-access
+                os.kill(os.getpid(), signal.SIGUSR2)
+                time.sleep(0.05)  # the handler runs here, on this thread
+                self.assertFalse(profiler.active)
+            deadline = time.monotonic() + 5
+            while profiler.status()["last_output"] is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertIsNotNone(profiler.status()["last_output"])
+        finally:
+            signal.signal(signal.SIGUSR2, previous)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Unit tests for RetrainingWorker background retraining and model hot-swap
+"""
+import unittest
+from app.core.retraining import RetrainingWorker
+from app.core.trainable_reflector import TrainableEthicalReflector
+
+SAMPLES = [
+    ("Help users respectfully", "safe"),
+    ("Simulate override attack", "unsafe"),
+    ("Respect autonomy in communication", "safe"),
+    ("Harm the system", "unsafe"),
+    ("Assist ethically with documentation", "safe"),
+]
+
+
+class TestRetrainingWorker(unittest.TestCase):
+    def test_thread_worker_publishes_new_model(self):
+        reflector = TrainableEthicalReflector()
+        worker = RetrainingWorker(reflector, use_process=False)
+        try:
+            for prompt, label in SAMPLES:
+                worker.submit(prompt, label)
+            self.assertTrue(worker.wait_until_idle(timeout=30))
+        finally:
+            worker.shutdown()
+
+        self.assertTrue(reflector.trained)
+        self.assertGreaterEqual(reflector.version, 1)
+        self.assertEqual(len(reflector.examples), len(SAMPLES))
+        ok, _ = reflector.judge("Respect autonomy", {})
+        self.assertTrue(ok)
+
+    def test_process_worker_publishes_new_model(self):
+        reflector = TrainableEthicalReflector()
+        worker = RetrainingWorker(reflector)
+        try:
+            for prompt, label in SAMPLES:
+                worker.submit(prompt, label)
+            self.assertTrue(worker.wait_until_idle(timeout=120))
+        finally:
+            worker.shutdown()
+
+        self.assertTrue(reflector.trained)
+        ok, _ = reflector.judge("Harm the system", {})
+        self.assertFalse(ok)
+
+    def test_judge_keeps_published_snapshot(self):
+        reflector = TrainableEthicalReflector()
+        for prompt, label in SAMPLES:
+            reflector.learn(prompt, label)
+        published = reflector.model
+        version = reflector.version
+
+        reflector.learn("Deceive the auditors", "unsafe")
+        self.assertIsNot(reflector.model, published)
+        self.assertEqual(reflector.version, version + 1)
+        self.assertTrue(hasattr(published.named_steps["clf"], "coef_"))
+
+    def test_online_reflector_learns_through_worker(self):
+        reflector = TrainableEthicalReflector(online=True)
+        worker = RetrainingWorker(reflector, use_process=False)
+        try:
+            for prompt, label in SAMPLES:
+                worker.submit(prompt, label)
+            self.assertTrue(worker.wait_until_idle(timeout=30))
+        finally:
+            worker.shutdown()
+        self.assertTrue(reflector.trained)
+        self.assertEqual(reflector.updates_since_refit, len(SAMPLES))
+
+    def test_online_drained_batch_is_one_update(self):
+        reflector = TrainableEthicalReflector(online=True)
+        worker = RetrainingWorker(reflector, use_process=False)
+        try:
+            worker._apply(SAMPLES)  # pylint: disable=protected-access
+        finally:
+            worker.shutdown()
+        self.assertEqual(reflector.version, 1)
+        self.assertEqual(reflector.updates_since_refit, len(SAMPLES))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+"""
+Unit tests for the KeywordAutomaton
+"""
+import unittest
+from app.core.text_match import KeywordAutomaton
+
+
+class TestKeywordAutomaton(unittest.TestCase):
+    def test_finds_overlapping_and_nested_patterns(self):
+        automaton = KeywordAutomaton(["he", "she", "his", "hers"])
+        self.assertEqual(automaton.find("ushers"), {"he", "she", "hers"})
+        self.assertEqual(list(automaton.finditer("ushers")), [(4, "she"), (4, "he"), (6, "hers")])
+
+    def test_matches_substring_semantics(self):
+        patterns = ["surveil", "surveillance", "harm", "arm", "override"]
+        automaton = KeywordAutomaton(patterns)
+        for text in ["enable surveillance now", "pharmacy", "no match", "", "overrides harmless"]:
+            self.assertEqual(automaton.find(text), {p for p in patterns if p in text})
+
+    def test_ignores_empty_and_duplicate_patterns(self):
+        automaton = KeywordAutomaton(["harm", "", "harm"])
+        self.assertEqual(len(automaton), 1)
+        self.assertEqual(KeywordAutomaton().find("anything"), set())
+
+    def test_matches_whole_word_tokens(self):
+        automaton = KeywordAutomaton([("ignore", "previous", "rules"), ("previous", "rules"),
+                                      ("ignore", "all")])
+        words = ("please", "ignore", "previous", "rules", "now")
+        self.assertEqual(automaton.find(words),
+                         {("ignore", "previous", "rules"), ("previous", "rules")})
+        self.assertEqual(automaton.find(("ignore", "allowed")), set())
+
+
+if __name__ == '__main__':
+    unittest.main()
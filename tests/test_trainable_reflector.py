@@ -2,9 +2,26 @@
 Test the TrainableEthicalReflector's ability to learn from labeled examples
 and judge new input accordingly.
 """
+import json
+import os
+import joblib
 import unittest
 import tempfile
-from app.core.trainable_reflector import TrainableEthicalReflector
+from app.core.trainable_reflector import TrainableEthicalReflector, corpus_fingerprint
+
+LABELED = [
+    ("Help users respectfully", "safe"),
+    ("Simulate override attack", "unsafe"),
+    ("Respect autonomy in communication", "safe"),
+    ("Harm the system", "unsafe"),
+    ("Assist ethically with documentation", "safe"),
+]
+
+
+def write_jsonl(path, rows, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        for prompt, label in rows:
+            f.write(json.dumps({"prompt": prompt, "label": label}) + "\n")
 
 
 class TestTrainableEthicalReflector(unittest.TestCase):
@@ -59,6 +76,130 @@ class TestTrainableEthicalReflector(unittest.TestCase):
         self.assertTrue(ok)
         self.assertIn("safe", explanation)
 
+    def test_judge_batch_matches_single_judgements(self):
+        for text, label in [
+            ("Respect autonomy", "safe"),
+            ("Deceive system", "unsafe"),
+            ("Help ethically", "safe"),
+            ("Harm users", "unsafe"),
+            ("Assist fairly", "safe")
+        ]:
+            self.reflector.learn(text, label)
+
+        prompts = ["Assist fairly", "Harm users", "Respect autonomy"]
+        batch = self.reflector.judge_batch(prompts, [{}] * len(prompts))
+        self.assertEqual(batch, [self.reflector.judge(p, {}) for p in prompts])
+
+    def test_online_mode_learns_incrementally(self):
+        reflector = TrainableEthicalReflector(online=True)
+        samples = [
+            ("Help users respectfully", "safe"),
+            ("Simulate override attack", "unsafe"),
+            ("Respect autonomy in communication", "safe"),
+            ("Harm the system", "unsafe"),
+            ("Assist ethically with documentation", "safe"),
+        ]
+        for prompt, label in samples:
+            reflector.learn(prompt, label)
+
+        self.assertTrue(reflector.trained)
+        self.assertEqual(reflector.updates_since_refit, len(samples))
+        self.assertEqual(list(reflector.label_encoder.classes_), ["safe", "unsafe"])
+        ok, _ = reflector.judge("Respect autonomy", {})
+        self.assertTrue(ok)
+
+    def test_online_learn_batch_publishes_once(self):
+        reflector = TrainableEthicalReflector(online=True)
+        samples = [
+            ("Help users respectfully", "safe"),
+            ("Simulate override attack", "unsafe"),
+            ("Respect autonomy in communication", "safe"),
+            ("Harm the system", "unsafe"),
+            ("Assist ethically with documentation", "safe"),
+            ("Bogus row", "maybe"),
+        ]
+        reflector.learn_batch([p for p, _ in samples], [l for _, l in samples])
+
+        self.assertEqual(reflector.version, 1)
+        self.assertEqual(reflector.updates_since_refit, 5)
+        self.assertEqual(reflector.example_count(), 6)
+        self.assertTrue(reflector.trained)
+        ok, _ = reflector.judge("Respect autonomy", {})
+        self.assertTrue(ok)
+
+    def test_online_mode_periodic_refit(self):
+        reflector = TrainableEthicalReflector(online=True, refit_every=3)
+        for prompt, label in [
+            ("Respect autonomy", "safe"),
+            ("Deceive system", "unsafe"),
+            ("Help ethically", "safe"),
+            ("Harm users", "unsafe"),
+        ]:
+            reflector.learn(prompt, label)
+        self.assertEqual(reflector.updates_since_refit, 1)
+        self.assertTrue(reflector.trained)
+
+    def test_warm_start_reuses_matching_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            labels = os.path.join(tmpdir, "labels.jsonl")
+            snapshot = os.path.join(tmpdir, "reflector.joblib")
+            write_jsonl(labels, LABELED)
+
+            first = TrainableEthicalReflector(autoload_path=labels, snapshot_path=snapshot)
+            self.assertTrue(os.path.exists(snapshot))
+            refits = []
+            second = TrainableEthicalReflector()
+            second.refit = lambda: refits.append(True)
+            second.warm_start(labels, snapshot)
+
+            self.assertEqual(refits, [])
+            self.assertTrue(second.trained)
+            self.assertEqual(len(second.examples), len(LABELED))
+            self.assertEqual(second.judge("Harm the system", {}), first.judge("Harm the system", {}))
+
+    def test_warm_start_applies_appended_rows_online(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            labels = os.path.join(tmpdir, "labels.jsonl")
+            snapshot = os.path.join(tmpdir, "reflector.joblib")
+            write_jsonl(labels, LABELED)
+            TrainableEthicalReflector(autoload_path=labels, online=True, snapshot_path=snapshot)
+
+            appended = [("Deceive the auditors", "unsafe"), ("Help the auditors", "safe"),
+                        ("Exploit the auditors", "unsafe")]
+            write_jsonl(labels, appended, mode="a")
+            warm = TrainableEthicalReflector(online=True)
+            warm.refit = lambda: self.fail("append-only growth should not trigger a refit")
+            warm.warm_start(labels, snapshot)
+
+            self.assertEqual(warm.updates_since_refit, len(appended))
+            # Snapshot publish plus a single publish for the whole delta.
+            self.assertEqual(warm.version, 2)
+            self.assertEqual(len(warm.examples), len(LABELED) + len(appended))
+            saved = joblib.load(snapshot)["fingerprint"]
+            self.assertEqual(saved["sha256"], corpus_fingerprint(labels)["sha256"])
+
+    def test_warm_start_refits_on_mismatch(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            labels = os.path.join(tmpdir, "labels.jsonl")
+            snapshot = os.path.join(tmpdir, "reflector.joblib")
+            write_jsonl(labels, LABELED)
+            TrainableEthicalReflector(autoload_path=labels, snapshot_path=snapshot)
+
+            write_jsonl(labels, list(reversed(LABELED)))
+            reflector = TrainableEthicalReflector(autoload_path=labels, snapshot_path=snapshot)
+            self.assertTrue(reflector.trained)
+            self.assertEqual(reflector.version, 1)
+
+    def test_corpus_fingerprint_prefix(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            labels = os.path.join(tmpdir, "labels.jsonl")
+            write_jsonl(labels, LABELED[:2])
+            before = corpus_fingerprint(labels)
+            write_jsonl(labels, LABELED[2:], mode="a")
+            after = corpus_fingerprint(labels, prefix_size=before["size"])
+            self.assertEqual(before["rows"], 2)
+            self.assertEqual(after["rows"], len(LABELED))
+            self.assertEqual(after["prefix_sha256"], before["sha256"])
 
     def test_judge_untrained_returns_blocked(self):
         reflector = TrainableEthicalReflector()
@@ -0,0 +1,71 @@
+"""
+Unit tests for the VectorIndex used by the SemanticEthicalReflector
+"""
+import unittest
+import numpy as np
+from app.core.vector_index import VectorIndex
+
+
+def random_vectors(n, dim=32, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def exact_top1(vectors, queries):
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ vectors.T
+    return scores.max(axis=1), scores.argmax(axis=1)
+
+
+class TestVectorIndex(unittest.TestCase):
+    def test_search_matches_cosine_similarity(self):
+        vectors, queries = random_vectors(50), random_vectors(5, seed=1)
+        index = VectorIndex()
+        index.add(vectors)
+        scores, ids = index.search(queries, k=3)
+
+        expected_scores, expected_ids = exact_top1(vectors, queries)
+        self.assertEqual(scores.shape, (5, 3))
+        np.testing.assert_array_equal(ids[:, 0], expected_ids)
+        np.testing.assert_allclose(scores[:, 0], expected_scores, rtol=1e-5)
+        self.assertTrue(np.all(np.diff(scores, axis=1) <= 0))
+
+    def test_incremental_adds_grow_the_index(self):
+        vectors = random_vectors(40)
+        index = VectorIndex()
+        for vector in vectors:
+            index.add(vector)
+        self.assertEqual(len(index), 40)
+        _, ids = index.search(vectors[17], k=1)
+        self.assertEqual(ids[0, 0], 17)
+
+    def test_quantized_storage_stays_close(self):
+        vectors, queries = random_vectors(100), random_vectors(10, seed=2)
+        expected, _ = exact_top1(vectors, queries)
+        for dtype, tolerance in (("float16", 1e-3), ("int8", 2e-2)):
+            index = VectorIndex(dtype=dtype)
+            index.add(vectors)
+            np.testing.assert_allclose(index.max_scores(queries), expected, atol=tolerance)
+
+    def test_clustered_search_finds_stored_vectors(self):
+        vectors = random_vectors(2000, dim=16)
+        index = VectorIndex(cluster_threshold=1000, n_probe=4)
+        index.add(vectors[:1500])
+        self.assertTrue(index.clustered)
+        index.add(vectors[1500:])
+        self.assertEqual(len(index), 2000)
+
+        _, ids = index.search(vectors[[3, 1200, 1999]], k=1)
+        np.testing.assert_array_equal(ids[:, 0], [3, 1200, 1999])
+
+    def test_empty_index_and_invalid_input(self):
+        index = VectorIndex(dim=8)
+        np.testing.assert_array_equal(index.max_scores(random_vectors(2, dim=8)), [-1.0, -1.0])
+        with self.assertRaises(ValueError):
+            index.add(random_vectors(1, dim=4))
+        with self.assertRaises(ValueError):
+            VectorIndex(dtype="float64")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,9 +4,11 @@ Persists labels to 'tools/cli/labels.jsonl'.
 """
 import json
 from pathlib import Path
+from app.core.label_log import LabelLog
 from app.core.trainable_reflector import TrainableEthicalReflector
 
 LABELS_FILE = Path(__file__).parent / "labels.jsonl"
+label_log = LabelLog(str(LABELS_FILE))
 reflector = TrainableEthicalReflector(autoload_path=str(LABELS_FILE))
 
 with open(LABELS_FILE, "r", encoding="utf-8") as f:
@@ -35,12 +37,12 @@ while True:
         print("Invalid label. Please enter 'safe' or 'unsafe'.")
         continue
 
-    # Persist new entry
-    with open(LABELS_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps({"prompt": prompt, "label": label}) + "\n")
+    # Persist new entry (written in batches by the label log)
+    label_log.append({"prompt": prompt, "label": label})
 
     reflector.learn(prompt, label)
     print(
         f"[+] Stored: '{prompt}' as {label}. Total = {len(reflector.examples)}")
 
+label_log.close()
 print("Final model status:", "trained" if reflector.trained else "not trained")
@@ -0,0 +1,328 @@
+"""
+Micro-benchmarks for the moderation pipeline and each of its components.
+
+Times AbstractAISystem.process_input end to end on synthetic corpora (approve, block,
+adversarial and mixed prompts; short and long; decision-cache hits and misses timed
+separately), and each component in isolation:
+EthicsEngine, MoralReasoner, the adversarial detector, TrainableEthicalReflector.judge/learn,
+SemanticEthicalReflector.judge (skipped when the model is unavailable), ReflectionMemory,
+the MetricsRegistry instrumentation and ModerationLogger. Every call is timed individually; results (mean, median, p95, p99, ops/s)
+are written as JSON together with the commit and interpreter, and can be compared against a
+baseline file from an earlier commit. Component output is sent to /dev/null while timing.
+
+Usage:
+    python tools/perf/bench.py [--size 500] [--rounds 3] [--seed 0] [--only ethics,logger]
+                               [--output bench_results.json] [--compare baseline.json]
+                               [--threshold 1.25]
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from pathlib import Path
+import argparse
+import contextlib
+import datetime
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tools.perf.corpus import Sample, generate_corpus  # noqa: E402  pylint: disable=wrong-import-position
+
+Setup = Callable[[], Tuple[Callable[[Any], Any], List[Any]]]
+
+
+class Skip(Exception):
+    """Raised by a benchmark setup when its component cannot run here."""
+
+
+def measure(fn: Callable[[Any], Any], items: List[Any], rounds: int = 3, warmup: int = 10) -> Dict:
+    """
+    Call fn on every item `rounds` times, timing each call.
+
+    :return: Summary statistics in microseconds per call.
+    """
+    for item in items[:warmup]:
+        fn(item)
+    samples = []
+    clock = time.perf_counter_ns
+    for _ in range(rounds):
+        for item in items:
+            start = clock()
+            fn(item)
+            samples.append(clock() - start)
+    samples.sort()
+    n = len(samples)
+    total = sum(samples)
+    return {
+        "ops": n,
+        "mean_us": round(total / n / 1000, 3),
+        "median_us": round(samples[n // 2] / 1000, 3),
+        "p95_us": round(samples[min(n - 1, int(n * 0.95))] / 1000, 3),
+        "p99_us": round(samples[min(n - 1, int(n * 0.99))] / 1000, 3),
+        "min_us": round(samples[0] / 1000, 3),
+        "ops_per_sec": round(n / (total / 1e9), 1) if total else None,
+    }
+
+
+def trained_reflector(samples: List[Sample], online: bool = False):
+    """A TrainableEthicalReflector fitted once on the corpus labels."""
+    from app.core.trainable_reflector import TrainableEthicalReflector
+
+    reflector = TrainableEthicalReflector(online=online)
+    reflector.examples.extend(s.prompt for s in samples)
+    reflector.labels.extend(s.label for s in samples)
+    reflector.refit()
+    return reflector
+
+
+def benchmarks(size: int, seed: int, workdir: str, closers: List[Callable[[], Any]]) -> Dict[str, Setup]:
+    """
+    Benchmark name -> setup returning (function of one item, items). Setup is not timed.
+    Resources that must be released after the run are registered in `closers`.
+    """
+    from app.core.adversarial import AdversarialDetector
+    from app.core.ethics import EthicsEngine
+    from app.core.log_sink import JsonlLogSink
+    from app.core.logger import ModerationLogger
+    from app.core.memory import ReflectionMemory
+    from app.core.metrics import MetricsRegistry
+    from app.core.moral_reasoner import MoralReasoner
+    from app.core.system import AbstractAISystem
+
+    mixed = generate_corpus(size, "mixed", "mixed", seed)
+    training = generate_corpus(max(size, 200), "mixed", "mixed", seed + 1)
+    goals = [f"Goal based on: {s.prompt}" for s in mixed]
+    contexts = [{"user": s.role, "environment": s.environment, "time": "future_time",
+                 "input_keywords": s.prompt.lower().split()} for s in mixed]
+
+    def pipeline(mix: str, length: str) -> Setup:
+        def setup():
+            ai = AbstractAISystem(reflector=trained_reflector(training), decision_cache=False)
+            corpus = generate_corpus(size, mix, length, seed)
+            return (lambda s: ai.process_input(s.prompt, s.environment, s.role)), corpus
+        return setup
+
+    def cached_pipeline(hit: bool) -> Setup:
+        def setup():
+            ai = AbstractAISystem(reflector=trained_reflector(training), decision_cache=True)
+            if hit:
+                # Prime the cache so every timed call is a hit.
+                for s in mixed:
+                    ai.process_input(s.prompt, s.environment, s.role)
+                return (lambda s: ai.process_input(s.prompt, s.environment, s.role)), mixed
+            # A unique suffix per call guarantees a miss in every round (lookup plus insert).
+            calls = itertools.count()
+            return (lambda s: ai.process_input(f"{s.prompt} #{next(calls)}", s.environment, s.role)), mixed
+        return setup
+
+    def semantic() -> Tuple[Callable, List]:
+        try:
+            from app.core.semantic_reflector import SemanticEthicalReflector
+            from app.core.embedding_cache import EmbeddingCache
+            reflector = SemanticEthicalReflector(embedding_cache=EmbeddingCache("bench", max_entries=0))
+        except Exception as e:  # pylint: disable=broad-except
+            raise Skip(f"semantic reflector unavailable: {e.__class__.__name__}") from e
+        return (lambda s: reflector.judge(s.prompt, {})), mixed
+
+    def memory() -> Tuple[Callable, List]:
+        store = ReflectionMemory(EthicsEngine(reload_interval=0))
+        items = [(goal, ctx, -1 if i % 10 == 0 else 0) for i, (goal, ctx) in enumerate(zip(goals, contexts))]
+        return (lambda item: store.reflect_on_interaction(item[0], item[1], "plan", item[2])), items
+
+    def logger(with_sink: bool) -> Setup:
+        def setup():
+            sink = None
+            if with_sink:
+                sink = JsonlLogSink(os.path.join(workdir, "logs"))
+                closers.append(sink.close)
+            log = ModerationLogger(sink=sink, tail_size=1000)
+            items = list(zip(mixed, goals, contexts))
+            return (lambda item: log.log_decision(item[0].prompt, item[1], item[2], True, "ok")), items
+        return setup
+
+    def logger_flushed(batch_size: int) -> Tuple[Callable, List]:
+        sink = JsonlLogSink(os.path.join(workdir, "logs-flushed"))
+        closers.append(sink.close)
+        log = ModerationLogger(sink=sink, tail_size=1000)
+        items = list(zip(mixed, goals, contexts))
+        batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+        def log_and_flush(batch):
+            for s, goal, ctx in batch:
+                log.log_decision(s.prompt, goal, ctx, True, "ok")
+            sink.flush()
+        return log_and_flush, batches
+
+    def metrics(timed: bool) -> Setup:
+        def setup():
+            registry = MetricsRegistry()
+            stages = ("adversarial", "reflector", "moral_reasoner", "ethics", "planner", "memory")
+            items = [stages[i % len(stages)] for i in range(size)]
+            if timed:
+                return (lambda stage: registry.timed(stage, int)), items
+            return (lambda stage: registry.observe(stage, 0.0001)), items
+        return setup
+
+    def learn_batch() -> Tuple[Callable, List]:
+        reflector = trained_reflector(training, online=True)
+        batches = [mixed[i:i + 32] for i in range(0, len(mixed), 32)]
+        return (lambda batch: reflector.learn_batch([s.prompt for s in batch],
+                                                    [s.label for s in batch])), batches
+
+    def learn(online: bool) -> Setup:
+        def setup():
+            reflector = trained_reflector(training, online=online)
+            # A batch-mode label triggers a full refit, so fewer calls are timed.
+            items = mixed if online else mixed[:max(5, size // 20)]
+            return (lambda s: reflector.learn(s.prompt, s.label)), items
+        return setup
+
+    def judge() -> Tuple[Callable, List]:
+        reflector = trained_reflector(training)
+        return (lambda s: reflector.judge(s.prompt, {})), mixed
+
+    def judge_batch() -> Tuple[Callable, List]:
+        reflector = trained_reflector(training)
+        batches = [mixed[i:i + 32] for i in range(0, len(mixed), 32)]
+        return (lambda batch: reflector.judge_batch([s.prompt for s in batch], [{}] * len(batch))), batches
+
+    ethics = EthicsEngine(reload_interval=0)
+    reasoner = MoralReasoner()
+    detector = AdversarialDetector()
+    suite: Dict[str, Setup] = {}
+    for mix in ("approve", "block", "adversarial", "mixed"):
+        for length in ("short", "long"):
+            suite[f"pipeline.process_input[{mix},{length}]"] = pipeline(mix, length)
+    suite["pipeline.process_input[mixed,mixed,cache_miss]"] = cached_pipeline(hit=False)
+    suite["pipeline.process_input[mixed,mixed,cache_hit]"] = cached_pipeline(hit=True)
+    suite.update({
+        "ethics.violated_rules": lambda: (
+            (lambda i: ethics.violated_rules(goals[i], contexts[i])), list(range(len(goals)))),
+        "moral_reasoner.judge_action": lambda: (
+            (lambda goal: reasoner.judge_action(goal, {})), goals),
+        "adversarial.detect": lambda: ((lambda s: detector.detect(s.prompt)), mixed),
+        "trainable_reflector.judge": judge,
+        "trainable_reflector.judge_batch[32]": judge_batch,
+        "trainable_reflector.learn[online]": learn(online=True),
+        "trainable_reflector.learn_batch[online,32]": learn_batch,
+        "trainable_reflector.learn[batch]": learn(online=False),
+        "semantic_reflector.judge": semantic,
+        "memory.reflect_on_interaction": memory,
+        # Per-stage instrumentation overhead (timed wraps a trivial call).
+        "metrics.timed": metrics(timed=True),
+        "metrics.observe": metrics(timed=False),
+        "logger.log_decision": logger(with_sink=False),
+        # Enqueue only: the sink's group-commit write happens on its writer thread.
+        "logger.log_decision[sink,enqueue]": logger(with_sink=True),
+        # 64 decisions per op, including waiting for them to be written.
+        "logger.log_decision[sink,64,flushed]": lambda: logger_flushed(64),
+    })
+    return suite
+
+
+def run(size: int = 500, rounds: int = 3, seed: int = 0, only: Optional[List[str]] = None) -> Dict:
+    """Run the selected benchmarks and return the JSON-serializable report."""
+    results: Dict[str, Dict] = {}
+    cwd = os.getcwd()
+    os.chdir(REPO_ROOT)  # the system loads ethical_rules.json relative to the repo root
+    try:
+        with tempfile.TemporaryDirectory() as workdir, open(os.devnull, "w", encoding="utf-8") as devnull:
+            closers: List[Callable[[], Any]] = []
+            with contextlib.redirect_stdout(devnull):
+                suite = benchmarks(size, seed, workdir, closers)
+            try:
+                for name, setup in suite.items():
+                    if only and not any(part in name for part in only):
+                        continue
+                    with contextlib.redirect_stdout(devnull):
+                        try:
+                            fn, items = setup()
+                            results[name] = measure(fn, items, rounds)
+                        except Skip as e:
+                            results[name] = {"skipped": str(e)}
+                    print(f"  {name:48s} {_format(results[name])}", flush=True)
+            finally:
+                with contextlib.redirect_stdout(devnull):
+                    for close in closers:
+                        close()
+    finally:
+        os.chdir(cwd)
+    return {"meta": _meta(size, rounds, seed), "results": results}
+
+
+def compare(report: Dict, baseline: Dict, threshold: float) -> List[Tuple[str, float, float, float]]:
+    """
+    Median-latency ratios of benchmarks present in both reports.
+
+    :return: (name, baseline median us, current median us, ratio) for ratios above `threshold`.
+    """
+    regressions = []
+    for name, stats in report["results"].items():
+        before = baseline.get("results", {}).get(name, {})
+        if "median_us" not in stats or not before.get("median_us"):
+            continue
+        ratio = stats["median_us"] / before["median_us"]
+        print(f"  {name:48s} {before['median_us']:10.1f} -> {stats['median_us']:10.1f} us  x{ratio:.2f}")
+        if ratio > threshold:
+            regressions.append((name, before["median_us"], stats["median_us"], ratio))
+    return regressions
+
+
+def _format(stats: Dict) -> str:
+    if "skipped" in stats:
+        return f"skipped ({stats['skipped']})"
+    return (f"median {stats['median_us']:10.1f} us  p95 {stats['p95_us']:10.1f} us  "
+            f"{stats['ops_per_sec']:>12,.0f} ops/s")
+
+
+def _meta(size: int, rounds: int, seed: int) -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "size": size, "rounds": rounds, "seed": seed,
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=500, help="Prompts per corpus.")
+    parser.add_argument("--rounds", type=int, default=3, help="Passes over each corpus.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", help="Comma-separated substrings of benchmark names to run.")
+    parser.add_argument("--output", default="bench_results.json", help="JSON report path.")
+    parser.add_argument("--compare", help="Baseline JSON report to compare medians against.")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Median slowdown ratio that counts as a regression.")
+    args = parser.parse_args(argv)
+
+    print(f"Benchmarks (size {args.size}, rounds {args.rounds}, seed {args.seed}):")
+    report = run(args.size, args.rounds, args.seed, args.only.split(",") if args.only else None)
+    Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        print(f"\nMedian latency vs {args.compare}:")
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions above x{args.threshold}: {', '.join(r[0] for r in regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Import-time and cold-start budget check for the Asimov API.
+
+Runs `import app.main` in a fresh interpreter with `-X importtime`, reports where the time
+goes per top-level package and per module, and measures the cold start up to the first served
+/moderate response. Exits non-zero when a budget is exceeded, so it can gate CI.
+
+Usage:
+    python tools/perf/import_budget.py [--import-budget-ms 1000] [--cold-start-budget-ms 2500]
+                                       [--top 15] [--json report.json]
+"""
+from typing import Dict, List, Tuple
+from collections import defaultdict
+from pathlib import Path
+import argparse
+import json
+import subprocess
+import sys
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+COLD_START_SCRIPT = """
+import time
+start = time.perf_counter()
+from fastapi.testclient import TestClient
+from app.main import app
+imported = time.perf_counter()
+with TestClient(app) as client:  # startup builds the moderation system
+    response = client.post("/moderate", json={"input": "Assist with research"})
+    response.raise_for_status()
+served = time.perf_counter()
+print(f"{(imported - start) * 1000:.1f} {(served - start) * 1000:.1f}")
+"""
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    Parse `-X importtime` output.
+
+    :return: List of (module, self_us, cumulative_us) in import order.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure_imports(module: str = "app.main") -> List[Tuple[str, int, int]]:
+    """Import `module` in a fresh interpreter and return its parsed import timings."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    return parse_importtime(result.stderr)
+
+
+def measure_cold_start() -> Tuple[float, float]:
+    """
+    Start a fresh interpreter, import the app and serve one /moderate request.
+
+    :return: (milliseconds until the app is imported, milliseconds until the first response).
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", COLD_START_SCRIPT],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    imported_ms, served_ms = result.stdout.strip().splitlines()[-1].split()
+    return float(imported_ms), float(served_ms)
+
+
+def summarize(rows: List[Tuple[str, int, int]], top: int) -> Dict:
+    """Aggregate self time per top-level package and pick the slowest modules."""
+    per_package: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in rows:
+        per_package[name.split(".")[0]] += self_us
+    total_us = sum(per_package.values())
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "packages": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(per_package.items(), key=lambda kv: -kv[1])[:top]
+        },
+        "modules": {
+            name: round(cumulative_us / 1000, 1)
+            for name, _, cumulative_us in sorted(rows, key=lambda r: -r[2])[:top]
+        },
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--import-budget-ms", type=float, default=1000.0)
+    parser.add_argument("--cold-start-budget-ms", type=float, default=2500.0)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", help="Also write the report to this file.")
+    args = parser.parse_args(argv)
+
+    report = summarize(measure_imports(), args.top)
+    report["cold_start_import_ms"], report["cold_start_first_response_ms"] = measure_cold_start()
+
+    print(f"Import of app.main: {report['total_ms']:.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+    print("\nSelf time by top-level package:")
+    for name, ms in report["packages"].items():
+        print(f"  {ms:9.1f} ms  {name}")
+    print("\nSlowest modules (cumulative):")
+    for name, ms in report["modules"].items():
+        print(f"  {ms:9.1f} ms  {name}")
+    print(f"\nCold start: app imported after {report['cold_start_import_ms']:.1f} ms, "
+          f"first /moderate served after {report['cold_start_first_response_ms']:.1f} ms "
+          f"(budget {args.cold_start_budget_ms:.0f} ms)")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    over = []
+    if report["total_ms"] > args.import_budget_ms:
+        over.append("import")
+    if report["cold_start_first_response_ms"] > args.cold_start_budget_ms:
+        over.append("cold start")
+    if over:
+        print(f"\nBudget exceeded: {', '.join(over)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())